@@ -0,0 +1,404 @@
+"""Mergeable streaming accumulators.
+
+Every accumulator has ``update(chunk)``, which folds in a DataFrame chunk, and
+``merge(other)``, which folds in another accumulator of the same kind built
+over rows that come after this one's. Both work in place and return
+``self``. Merging is associative, so chunks can be accumulated separately,
+in any number of workers, and combined afterwards with the same result
+as a sequential pass. Ties (equal maxima, equal top-N values) resolve to the
+earliest row, as they do in pandas, as long as merges keep the row order.
+"""
+import numpy as np
+import pandas as pd
+
+
+class Moments:
+    """Count, means and co-moments of numeric columns.
+
+    Each chunk's mean and centred co-moment matrix are combined with the
+    running ones by the parallel form of Welford's update (Chan et al.), so
+    the variance and covariance are computed without the cancellation of the
+    sum-of-squares formula. The diagonal of the co-moment matrix is each
+    column's Welford M2.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.count = 0
+        self.mean = np.zeros(len(self.columns))
+        self.comoment = np.zeros((len(self.columns), len(self.columns)))
+
+    def update(self, chunk):
+        values = chunk[self.columns].to_numpy(dtype=np.float64)
+        if not len(values):
+            return self
+        partial = Moments(self.columns)
+        partial.count = len(values)
+        partial.mean = values.mean(axis=0)
+        centred = values - partial.mean
+        partial.comoment = centred.T @ centred
+        return self.merge(partial)
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / count)
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * (self.count * other.count / count)
+        self.count = count
+        return self
+
+    def means(self):
+        return pd.Series(self.mean, index=self.columns)
+
+    def covariance(self, ddof=1):
+        return pd.DataFrame(self.comoment / (self.count - ddof), index=self.columns, columns=self.columns)
+
+    def std(self, ddof=1):
+        return pd.Series(np.sqrt(np.diag(self.comoment) / (self.count - ddof)), index=self.columns)
+
+    def correlation(self):
+        std = np.sqrt(np.diag(self.comoment))
+        return pd.DataFrame(self.comoment / np.outer(std, std), index=self.columns, columns=self.columns)
+
+
+class Sums:
+    """Column totals: exact for integer columns, compensated for float ones.
+
+    Integer columns are summed in int64. Float columns are summed per chunk by
+    NumPy (pairwise) and the chunk totals are added with Neumaier's
+    compensated summation, so rounding error does not grow with the number
+    of chunks.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.totals = {}
+        self.compensation = {}
+
+    def update(self, chunk):
+        for column in self.columns:
+            values = chunk[column].to_numpy()
+            if np.issubdtype(values.dtype, np.integer):
+                self._add(column, int(values.sum(dtype=np.int64)), 0.0)
+            else:
+                self._add(column, float(values.sum(dtype=np.float64)), 0.0)
+        return self
+
+    def _add(self, column, value, compensation):
+        if column not in self.totals:
+            self.totals[column], self.compensation[column] = value, compensation
+            return
+        total = self.totals[column]
+        if isinstance(total, int) and isinstance(value, int):
+            self.totals[column] = total + value
+            return
+        added = total + value
+        if abs(total) >= abs(value):
+            compensation += (total - added) + value
+        else:
+            compensation += (value - added) + total
+        self.totals[column] = added
+        self.compensation[column] += compensation
+
+    def merge(self, other):
+        for column, value in other.totals.items():
+            self._add(column, value, other.compensation[column])
+        return self
+
+    def total(self, column):
+        total = self.totals.get(column, 0)
+        return total if isinstance(total, int) else total + self.compensation[column]
+
+
+class Extremes:
+    """Minimum and maximum of ``column`` and the first row holding each."""
+
+    def __init__(self, column):
+        self.column = column
+        self.min_row = None
+        self.max_row = None
+
+    def update(self, chunk):
+        if not len(chunk):
+            return self
+        values = chunk[self.column]
+        partial = Extremes(self.column)
+        partial.min_row = chunk.loc[values.idxmin()]
+        partial.max_row = chunk.loc[values.idxmax()]
+        return self.merge(partial)
+
+    def merge(self, other):
+        if other.max_row is None:
+            return self
+        if self.max_row is None or other.max_row[self.column] > self.max_row[self.column]:
+            self.max_row = other.max_row
+        if self.min_row is None or other.min_row[self.column] < self.min_row[self.column]:
+            self.min_row = other.min_row
+        return self
+
+    @property
+    def min(self):
+        return self.min_row[self.column]
+
+    @property
+    def max(self):
+        return self.max_row[self.column]
+
+
+class Threshold:
+    """Number of rows where ``op(chunk[column], value)`` holds."""
+
+    def __init__(self, column, op, value):
+        self.column = column
+        self.op = op
+        self.value = value
+        self.count = 0
+
+    def update(self, chunk):
+        self.count += int(self.op(chunk[self.column], self.value).sum())
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        return self
+
+
+class GroupSums:
+    """Per-group row counts and column sums, grouped by ``key``."""
+
+    def __init__(self, key, columns):
+        self.key = key
+        self.columns = list(columns)
+        self.sums = None
+        self.counts = None
+
+    def update(self, chunk):
+        groups = chunk.groupby(self.key, observed=True)
+        partial = GroupSums(self.key, self.columns)
+        partial.sums = groups[self.columns].sum()
+        partial.counts = groups.size()
+        return self.merge(partial)
+
+    def merge(self, other):
+        if other.sums is None:
+            return self
+        if self.sums is None:
+            self.sums, self.counts = other.sums, other.counts
+            return self
+        dtypes = {column: np.result_type(self.sums[column].dtype, other.sums[column].dtype)
+                  for column in self.columns}
+        self.sums = self.sums.add(other.sums, fill_value=0).astype(dtypes)
+        self.counts = self.counts.add(other.counts, fill_value=0).astype(np.int64)
+        return self
+
+    def means(self, column):
+        return self.sums[column] / self.counts
+
+
+class TopN:
+    """The ``n`` rows with the largest (or smallest) values of ``column``."""
+
+    def __init__(self, column, n, largest=True):
+        self.column = column
+        self.n = n
+        self.largest = largest
+        self.rows = None
+
+    def _select(self, frame):
+        if self.largest:
+            return frame.nlargest(self.n, self.column)
+        return frame.nsmallest(self.n, self.column)
+
+    def update(self, chunk):
+        return self.merge_rows(self._select(chunk))
+
+    def merge_rows(self, rows):
+        self.rows = rows if self.rows is None else self._select(pd.concat([self.rows, rows]))
+        return self
+
+    def merge(self, other):
+        return self if other.rows is None else self.merge_rows(other.rows)
+
+
+class ValueCounts:
+    """Exact value counts of ``column``.
+
+    Memory grows with the number of distinct values, so this is only for
+    low-cardinality columns; use ``QuantileSketch`` for the others.
+    """
+
+    def __init__(self, column):
+        self.column = column
+        self.counts = pd.Series(dtype=np.int64)
+
+    def update(self, chunk):
+        partial = ValueCounts(self.column)
+        partial.counts = chunk[self.column].value_counts(sort=False)
+        return self.merge(partial)
+
+    def merge(self, other):
+        self.counts = self.counts.add(other.counts, fill_value=0).astype(np.int64)
+        return self
+
+    def quantile(self, q):
+        """Quantile (or array of quantiles) with linear interpolation, as
+        ``Series.quantile`` computes it."""
+        counts = self.counts.sort_index()
+        cumulative = counts.cumsum().to_numpy()
+        values = counts.index.to_numpy(dtype=np.float64)
+        position = q * (cumulative[-1] - 1)
+        lower = values[np.searchsorted(cumulative, np.floor(position), side='right')]
+        upper = values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+        return lower + (upper - lower) * (position - np.floor(position))
+
+
+class QuantileSketch:
+    """Approximate quantiles of ``column`` in bounded memory (a KLL sketch).
+
+    Values are kept in levels of compactors, where an item at level ``h``
+    stands for ``2**h`` rows. When a level outgrows its capacity it is
+    sorted and every other item, starting at a random offset, moves up a
+    level. The sketch holds O(k) items whatever the row count, and sketches
+    merge level by level. With the default ``k=200`` the rank of a returned
+    quantile is within about 1.7% of the row count with high probability
+    (Karnin, Lang and Liberty, 2016). Until the first compaction it is
+    exact and interpolates like ``Series.quantile``.
+    """
+
+    def __init__(self, column, k=200, seed=None):
+        self.column = column
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            odd = len(items) % 2
+            promoted = items[odd + self.rng.integers(2)::2]
+            self.levels[level] = items[:odd]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # Adding a level lowers the capacity of every level below it.
+            level = 0
+
+    def update(self, chunk):
+        values = chunk[self.column].to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    @property
+    def size(self):
+        """Number of items held."""
+        return sum(len(items) for items in self.levels)
+
+    def quantile(self, q):
+        """Quantile (or array of quantiles) of the rows seen so far."""
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], q)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, weights = items[order], weights[order]
+        # Each item covers the ranks from its predecessor's to its own
+        # cumulative weight; place it in the middle of that span.
+        midpoints = np.cumsum(weights) - weights / 2
+        return np.interp(np.asarray(q) * self.count, midpoints, items)
+
+
+class Sample:
+    """A uniform random sample of at most ``size`` rows (bottom-k sampling).
+
+    Each row gets a random key and the rows with the ``size`` smallest keys
+    are kept; the union of two such samples cut to ``size`` is again one.
+    Accumulators updated in different processes need different seeds.
+    """
+
+    def __init__(self, columns, size, seed=None):
+        self.columns = list(columns)
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.rows = None
+
+    def update(self, chunk):
+        keyed = chunk[self.columns].assign(_key=self.rng.random(len(chunk)))
+        return self.merge_rows(keyed.nsmallest(self.size, '_key'))
+
+    def merge_rows(self, rows):
+        self.rows = rows if self.rows is None else pd.concat([self.rows, rows]).nsmallest(self.size, '_key')
+        return self
+
+    def merge(self, other):
+        return self if other.rows is None else self.merge_rows(other.rows)
+
+    def frame(self):
+        return self.rows.drop(columns='_key').sort_index()
+
+
+class Histogram2D:
+    """Row counts in fixed-width bins of two columns.
+
+    Bins are ``floor(value / width)`` for integer or float values, so no range
+    is needed up front, and only occupied bins are stored.
+    """
+
+    def __init__(self, x, y, x_width, y_width):
+        self.x = x
+        self.y = y
+        self.x_width = x_width
+        self.y_width = y_width
+        self.counts = pd.Series(dtype=np.int64)
+
+    def update(self, chunk):
+        bins = pd.DataFrame({
+            'x': np.floor(chunk[self.x].to_numpy(dtype=np.float64) / self.x_width).astype(np.int64),
+            'y': np.floor(chunk[self.y].to_numpy(dtype=np.float64) / self.y_width).astype(np.int64),
+        })
+        partial = Histogram2D(self.x, self.y, self.x_width, self.y_width)
+        partial.counts = bins.value_counts(sort=False)
+        return self.merge(partial)
+
+    def merge(self, other):
+        if not len(other.counts):
+            return self
+        if not len(self.counts):
+            self.counts = other.counts
+            return self
+        self.counts = self.counts.add(other.counts, fill_value=0).astype(np.int64)
+        return self
+
+    def grid(self):
+        """Bin edges along x and y and the dense count matrix, indexed ``[y, x]``."""
+        xs = self.counts.index.get_level_values('x')
+        ys = self.counts.index.get_level_values('y')
+        x0, y0 = xs.min(), ys.min()
+        matrix = np.zeros((ys.max() - y0 + 1, xs.max() - x0 + 1), dtype=np.int64)
+        matrix[ys - y0, xs - x0] = self.counts.to_numpy()
+        x_edges = np.arange(x0, xs.max() + 2) * self.x_width
+        y_edges = np.arange(y0, ys.max() + 2) * self.y_width
+        return x_edges, y_edges, matrix
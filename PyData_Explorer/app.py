@@ -1,163 +1,175 @@
-import pandas as pd
+import argparse
+import time
+
+import matplotlib
 import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
-
-np.random.seed(42)
-data = {
-    'Product': ['Laptop', 'Phone', 'Tablet', 'Monitor', 'Keyboard', 
-                'Mouse', 'Headphones', 'Speaker', 'Webcam', 'Charger'],
-    'Sales': np.random.randint(50, 500, 10),
-    'Revenue': np.random.randint(5000, 50000, 10),
-    'Rating': np.random.uniform(3.5, 5.0, 10).round(2),
-    'Stock': np.random.randint(10, 200, 10),
-    'Category': ['Electronics', 'Electronics', 'Electronics', 'Electronics', 
-                 'Accessories', 'Accessories', 'Audio', 'Audio', 'Video', 'Accessories']
-}
-df = pd.DataFrame(data)
-
-print("=" * 60)
-print("BASIC DATA ANALYSIS WITH PANDAS")
-print("=" * 60)
-
-print("\n1. First 5 rows of the dataset:")
-print(df.head())
-
-print("\n2. Dataset Information:")
-print(df.info())
-
-print("\n3. Statistical Summary:")
-print(df.describe())
-
-print("\n4. Average Values:")
-print(f"   Average Sales: {df['Sales'].mean():.2f}")
-print(f"   Average Revenue: ${df['Revenue'].mean():.2f}")
-print(f"   Average Rating: {df['Rating'].mean():.2f}")
-print(f"   Average Stock: {df['Stock'].mean():.2f}")
-
-# 5. Group by analysis
-print("\n5. Average Revenue by Category:")
-category_stats = df.groupby('Category')['Revenue'].agg(['mean', 'sum', 'count'])
-print(category_stats)
-
-# 6. Find top performers
-print("\n6. Top 3 Products by Revenue:")
-top_products = df.nlargest(3, 'Revenue')[['Product', 'Revenue', 'Sales']]
-print(top_products)
-
-print("\n7. Correlation Matrix:")
-correlation = df[['Sales', 'Revenue', 'Rating', 'Stock']].corr()
-print(correlation)
-
-print("\n" + "=" * 60)
-print("CREATING VISUALIZATIONS")
-print("=" * 60)
-
-fig = plt.figure(figsize=(16, 12))
-
-ax1 = plt.subplot(2, 3, 1)
-colors = plt.cm.viridis(np.linspace(0, 1, len(df)))
-ax1.bar(df['Product'], df['Revenue'], color=colors, edgecolor='black', linewidth=1.2)
-ax1.set_xlabel('Product', fontsize=11, fontweight='bold')
-ax1.set_ylabel('Revenue ($)', fontsize=11, fontweight='bold')
-ax1.set_title('Revenue by Product', fontsize=13, fontweight='bold', pad=15)
-ax1.tick_params(axis='x', rotation=45)
-ax1.grid(axis='y', alpha=0.3, linestyle='--')
-plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha='right')
-
-ax2 = plt.subplot(2, 3, 2)
-scatter = ax2.scatter(df['Sales'], df['Revenue'], s=df['Rating']*100, 
-                     c=df['Stock'], cmap='coolwarm', alpha=0.7, 
-                     edgecolors='black', linewidth=1.5)
-ax2.set_xlabel('Sales (Units)', fontsize=11, fontweight='bold')
-ax2.set_ylabel('Revenue ($)', fontsize=11, fontweight='bold')
-ax2.set_title('Sales vs Revenue\n(Size=Rating, Color=Stock)', fontsize=13, fontweight='bold', pad=15)
-ax2.grid(True, alpha=0.3, linestyle='--')
-cbar = plt.colorbar(scatter, ax=ax2)
-cbar.set_label('Stock Level', fontsize=10)
-
-# 3. HEATMAP: Correlation Matrix
-ax3 = plt.subplot(2, 3, 3)
-sns.heatmap(correlation, annot=True, fmt='.2f', cmap='RdYlGn', 
-            center=0, square=True, linewidths=2, cbar_kws={"shrink": 0.8},
-            ax=ax3)
-ax3.set_title('Correlation Heatmap', fontsize=13, fontweight='bold', pad=15)
-
-# 4. HORIZONTAL BAR CHART: Average Revenue by Category
-ax4 = plt.subplot(2, 3, 4)
-category_avg = df.groupby('Category')['Revenue'].mean().sort_values()
-colors_cat = plt.cm.plasma(np.linspace(0, 1, len(category_avg)))
-ax4.barh(category_avg.index, category_avg.values, color=colors_cat, 
-         edgecolor='black', linewidth=1.2)
-ax4.set_xlabel('Average Revenue ($)', fontsize=11, fontweight='bold')
-ax4.set_ylabel('Category', fontsize=11, fontweight='bold')
-ax4.set_title('Average Revenue by Category', fontsize=13, fontweight='bold', pad=15)
-ax4.grid(axis='x', alpha=0.3, linestyle='--')
-
-# 5. PIE CHART: Sales Distribution by Category
-ax5 = plt.subplot(2, 3, 5)
-category_sales = df.groupby('Category')['Sales'].sum()
-colors_pie = plt.cm.Set3(np.linspace(0, 1, len(category_sales)))
-wedges, texts, autotexts = ax5.pie(category_sales.values, labels=category_sales.index, 
-                                     autopct='%1.1f%%', startangle=90, colors=colors_pie,
-                                     explode=[0.05]*len(category_sales), shadow=True)
-for autotext in autotexts:
-    autotext.set_color('white')
-    autotext.set_fontweight('bold')
-ax5.set_title('Sales Distribution by Category', fontsize=13, fontweight='bold', pad=15)
-
-# 6. LINE PLOT: Rating Trends
-ax6 = plt.subplot(2, 3, 6)
-df_sorted = df.sort_values('Rating')
-ax6.plot(range(len(df_sorted)), df_sorted['Rating'].values, 
-         marker='o', linewidth=2.5, markersize=8, color='#2E86AB',
-         markerfacecolor='#A23B72', markeredgecolor='black', markeredgewidth=1.5)
-ax6.fill_between(range(len(df_sorted)), df_sorted['Rating'].values, 
-                 alpha=0.3, color='#2E86AB')
-ax6.set_xlabel('Product Index (sorted by rating)', fontsize=11, fontweight='bold')
-ax6.set_ylabel('Rating', fontsize=11, fontweight='bold')
-ax6.set_title('Product Ratings Distribution', fontsize=13, fontweight='bold', pad=15)
-ax6.grid(True, alpha=0.3, linestyle='--')
-ax6.set_ylim(3, 5.5)
-
-plt.tight_layout()
-plt.savefig('data_analysis_visualizations.png', dpi=300, bbox_inches='tight')
-print("\n✓ Visualizations saved as 'data_analysis_visualizations.png'")
-plt.show()
-
-print("\n" + "=" * 60)
-print("KEY INSIGHTS AND OBSERVATIONS")
-print("=" * 60)
-
-print(f"""
+
+import datasource
+from charts import chart_data, draw_figure, render_charts
+from parallel import summarize_files
+from summary import summarize
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Summarize and chart sales data.')
+    parser.add_argument('--input', nargs='+', metavar='PATH',
+                        help='CSV or Parquet files, globs or directories of partitions to analyse '
+                             '(default: built-in demo data)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processes summarizing input files, and rendering --headless charts, '
+                             'in parallel (default: %(default)s)')
+    parser.add_argument('--chunksize', type=int, default=datasource.DEFAULT_CHUNKSIZE,
+                        help='rows read per chunk (default: %(default)s)')
+    parser.add_argument('--cache', metavar='DIR',
+                        help='parse each input once into memory-mapped column files in DIR and '
+                             'read them from there on later runs')
+    parser.add_argument('--headless', action='store_true',
+                        help='render each chart to its own file with the Agg backend instead of showing a window')
+    parser.add_argument('--output-dir', default='charts',
+                        help='directory for --headless charts (default: %(default)s)')
+    parser.add_argument('--format', default='png', choices=['png', 'svg', 'pdf', 'jpg'],
+                        help='image format of saved charts (default: %(default)s)')
+    parser.add_argument('--dpi', type=int, default=300, help='resolution of saved charts (default: %(default)s)')
+    parser.add_argument('--generate', type=int, metavar='ROWS',
+                        help='write ROWS synthetic records to each --input path and exit')
+    return parser.parse_args()
+
+
+def print_report(summary):
+    print("=" * 60)
+    print("BASIC DATA ANALYSIS WITH PANDAS")
+    print("=" * 60)
+
+    print("\n1. First 5 rows of the dataset:")
+    print(summary.head)
+
+    print("\n2. Dataset Information:")
+    print(summary.info())
+
+    print("\n3. Statistical Summary:")
+    print(summary.describe())
+
+    means = summary.means()
+    print("\n4. Average Values:")
+    print(f"   Average Sales: {means['Sales']:.2f}")
+    print(f"   Average Revenue: ${means['Revenue']:.2f}")
+    print(f"   Average Rating: {means['Rating']:.2f}")
+    print(f"   Average Stock: {means['Stock']:.2f}")
+
+    # 5. Group by analysis
+    print("\n5. Average Revenue by Category:")
+    print(summary.category_stats())
+
+    # 6. Find top performers
+    print("\n6. Top 3 Products by Revenue:")
+    print(summary.top_revenue.rows[['Product', 'Revenue', 'Sales']])
+
+    print("\n7. Correlation Matrix:")
+    print(summary.correlation())
+
+
+def plot(summary, path='data_analysis_visualizations.png', dpi=300):
+    print("\n" + "=" * 60)
+    print("CREATING VISUALIZATIONS")
+    print("=" * 60)
+
+    fig = plt.figure(figsize=(16, 12))
+    timings = draw_figure(fig, chart_data(summary))
+    plt.tight_layout()
+    start = time.perf_counter()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    timings['save'] = time.perf_counter() - start
+    print(f"\n✓ Visualizations saved as '{path}'")
+    for name, seconds in timings.items():
+        print(f"   {name}: {seconds * 1000:.0f} ms")
+    plt.show()
+
+
+def render(summary, directory, format, dpi, workers):
+    print("\n" + "=" * 60)
+    print("RENDERING CHARTS")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    charts = render_charts(chart_data(summary), directory, format, dpi, workers)
+    print()
+    for name, (path, seconds) in charts.items():
+        print(f"✓ {name}: '{path}' ({seconds * 1000:.0f} ms)")
+    print(f"   {len(charts)} charts in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def print_insights(summary):
+    correlation = summary.correlation()
+    category_avg = summary.category_stats()['mean']
+    revenue = summary.extremes['Revenue']
+    top_sales = summary.extremes['Sales'].max_row
+    top_rating = summary.extremes['Rating'].max_row
+    totals = summary.totals
+    means = summary.means()
+
+    print("\n" + "=" * 60)
+    print("KEY INSIGHTS AND OBSERVATIONS")
+    print("=" * 60)
+
+    print(f"""
 1. REVENUE ANALYSIS:
-   - Highest revenue product: {df.loc[df['Revenue'].idxmax(), 'Product']} (${df['Revenue'].max():,.2f})
-   - Lowest revenue product: {df.loc[df['Revenue'].idxmin(), 'Product']} (${df['Revenue'].min():,.2f})
-   - Total revenue across all products: ${df['Revenue'].sum():,.2f}
+   - Highest revenue product: {revenue.max_row['Product']} (${revenue.max:,.2f})
+   - Lowest revenue product: {revenue.min_row['Product']} (${revenue.min:,.2f})
+   - Total revenue across all products: ${totals.total('Revenue'):,.2f}
 
 2. SALES PERFORMANCE:
-   - Total units sold: {df['Sales'].sum()} units
-   - Best-selling product: {df.loc[df['Sales'].idxmax(), 'Product']} ({df['Sales'].max()} units)
-   - Average sales per product: {df['Sales'].mean():.1f} units
+   - Total units sold: {totals.total('Sales')} units
+   - Best-selling product: {top_sales['Product']} ({top_sales['Sales']} units)
+   - Average sales per product: {means['Sales']:.1f} units
 
 3. CUSTOMER SATISFACTION:
-   - Average product rating: {df['Rating'].mean():.2f}/5.00
-   - Highest rated: {df.loc[df['Rating'].idxmax(), 'Product']} ({df['Rating'].max():.2f})
-   - Products rated above 4.5: {len(df[df['Rating'] > 4.5])}
+   - Average product rating: {means['Rating']:.2f}/5.00
+   - Highest rated: {top_rating['Product']} ({top_rating['Rating']:.2f})
+   - Products rated above 4.5: {summary.rating_above_4_5.count}
 
 4. INVENTORY STATUS:
-   - Total stock available: {df['Stock'].sum()} units
-   - Products with low stock (<50 units): {len(df[df['Stock'] < 50])}
+   - Total stock available: {totals.total('Stock')} units
+   - Products with low stock (<50 units): {summary.low_stock.count}
 
 5. CORRELATION INSIGHTS:
    - Sales-Revenue correlation: {correlation.loc['Sales', 'Revenue']:.2f}
    {'Strong positive correlation suggests higher sales drive revenue' if correlation.loc['Sales', 'Revenue'] > 0.7 else 'Moderate correlation between sales and revenue'}
-   
+
 6. CATEGORY PERFORMANCE:
    - Most profitable category: {category_avg.idxmax()}
-   - Category with most products: {df['Category'].value_counts().idxmax()}
+   - Category with most products: {summary.categories.counts.idxmax()}
 """)
 
-print("=" * 60)
-print("ANALYSIS COMPLETE")
-print("=" * 60)
\ No newline at end of file
+    print("=" * 60)
+    print("ANALYSIS COMPLETE")
+    print("=" * 60)
+
+
+def main():
+    args = parse_args()
+    if args.headless:
+        matplotlib.use('Agg')
+    if args.generate:
+        if not args.input:
+            raise SystemExit('--generate needs --input to name the file to write')
+        for seed, path in enumerate(args.input):
+            datasource.generate(path, args.generate, seed=seed, chunksize=args.chunksize)
+            print(f"Wrote {args.generate} rows to '{path}'")
+        return
+
+    if args.input:
+        summary, scaling = summarize_files(datasource.expand_inputs(args.input), args.workers,
+                                           args.chunksize, args.cache)
+        print(scaling.report())
+    else:
+        summary = summarize(datasource.load_chunks())
+    print_report(summary)
+    if args.headless:
+        render(summary, args.output_dir, args.format, args.dpi, args.workers)
+    else:
+        plot(summary, f'data_analysis_visualizations.{args.format}', args.dpi)
+    print_insights(summary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""On-disk columnar cache of ingested sources.
+
+A source file is parsed once and each column is written to its own raw
+NumPy array file (``<column>.bin``, described by ``meta.json``) in a cache
+entry named after the source's absolute path. Categorical columns are
+stored as integer codes plus a list of categories. Later runs memory-map
+the column files and slice chunks straight out of them, so nothing is
+parsed and only the pages a chunk touches are read. An entry is rebuilt
+when the source's mtime or size changes.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from datasource import DEFAULT_CHUNKSIZE, DTYPES, read_chunks
+
+META = 'meta.json'
+CODE_DTYPE = 'int32'
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return {'source': os.path.abspath(path), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _sort_codes(filename, known, rows, chunksize):
+    """Renumber codes assigned in first-seen order to sorted category order,
+    matching the categories ``read_csv`` infers."""
+    order = {category: i for i, category in enumerate(sorted(known))}
+    mapping = np.array([order[category] for category in known], dtype=CODE_DTYPE)
+    if not rows or (mapping == np.arange(len(mapping))).all():
+        return
+    codes = np.memmap(filename, dtype=CODE_DTYPE, mode='r+', shape=(rows,))
+    for start in range(0, rows, chunksize):
+        codes[start:start + chunksize] = mapping[codes[start:start + chunksize]]
+    codes.flush()
+    del codes
+
+
+class ColumnCache:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def entry(self, path):
+        key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f'{os.path.basename(path)}-{key}')
+
+    def meta(self, path):
+        """The entry's metadata if it is current for ``path``, else None."""
+        try:
+            with open(os.path.join(self.entry(path), META)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        signature = _signature(path)
+        if any(meta.get(name) != value for name, value in signature.items()):
+            return None
+        return meta
+
+    def ingest(self, path, chunksize=DEFAULT_CHUNKSIZE):
+        """Parse ``path`` into a fresh cache entry and return its metadata."""
+        entry = self.entry(path)
+        tmp = f'{entry}.tmp{os.getpid()}'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        signature = _signature(path)
+        categories = {column: {} for column, dtype in DTYPES.items() if dtype == 'category'}
+        files = {column: open(os.path.join(tmp, f'{column}.bin'), 'wb') for column in DTYPES}
+        rows = 0
+        try:
+            for chunk in read_chunks(path, chunksize):
+                for column, f in files.items():
+                    values = chunk[column]
+                    if column in categories:
+                        known = categories[column]
+                        for category in values.cat.categories:
+                            known.setdefault(category, len(known))
+                        mapping = np.array([known[c] for c in values.cat.categories],
+                                           dtype=CODE_DTYPE)
+                        data = mapping[values.cat.codes.to_numpy()]
+                    else:
+                        data = values.to_numpy(dtype=DTYPES[column])
+                    f.write(np.ascontiguousarray(data).tobytes())
+                rows += len(chunk)
+        finally:
+            for f in files.values():
+                f.close()
+        for column, known in categories.items():
+            _sort_codes(os.path.join(tmp, f'{column}.bin'), known, rows, chunksize)
+        meta = {
+            **signature,
+            'rows': rows,
+            'dtypes': DTYPES,
+            'categories': {column: sorted(known) for column, known in categories.items()},
+        }
+        with open(os.path.join(tmp, META), 'w') as f:
+            json.dump(meta, f)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        return meta
+
+    def columns(self, path, chunksize=DEFAULT_CHUNKSIZE):
+        """Memory-mapped columns of ``path``, ingesting it first if needed."""
+        meta = self.meta(path) or self.ingest(path, chunksize)
+        entry = self.entry(path)
+        rows = meta['rows']
+        columns = {}
+        for column, dtype in meta['dtypes'].items():
+            stored = CODE_DTYPE if dtype == 'category' else dtype
+            filename = os.path.join(entry, f'{column}.bin')
+            if rows:
+                columns[column] = np.memmap(filename, dtype=stored, mode='r', shape=(rows,))
+            else:
+                columns[column] = np.empty(0, stored)
+        return meta, columns
+
+    def read_chunks(self, path, chunksize=DEFAULT_CHUNKSIZE):
+        """Yield chunks of ``path`` from the cache, like ``datasource.read_chunks``."""
+        meta, columns = self.columns(path, chunksize)
+        categories = {column: pd.Index(values) for column, values in meta['categories'].items()}
+        for start in range(0, meta['rows'], chunksize):
+            stop = min(start + chunksize, meta['rows'])
+            data = {}
+            for column, values in columns.items():
+                if column in categories:
+                    data[column] = pd.Categorical.from_codes(values[start:stop],
+                                                             categories=categories[column])
+                else:
+                    data[column] = values[start:stop]
+            yield pd.DataFrame(data, index=pd.RangeIndex(start, stop), copy=False)
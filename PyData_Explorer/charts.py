@@ -0,0 +1,166 @@
+"""The explorer's charts.
+
+``chart_data`` reduces a summary to the few values each chart plots, so a
+chart costs the same for ten rows or a billion: the Sales vs Revenue scatter
+becomes a 2-D histogram over every row once there are more rows than the
+summary samples, and the rating curve is drawn from exact quantiles at a
+fixed number of points. Each chart is drawn by its own function onto an
+``Axes``, either into the combined interactive figure (``draw_figure``) or
+into a separate file per chart (``render_charts``), which uses plain
+``Figure`` objects on the Agg canvas and never touches pyplot, so it works
+headless and can run charts in parallel processes.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import numpy as np
+import seaborn as sns
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+
+RATING_POINTS = 200
+
+
+def chart_data(summary):
+    """The values every chart needs, as small picklable objects."""
+    sample = summary.sample.frame()
+    complete = len(sample) == summary.rows
+    data = {
+        'revenue_by_product': summary.product_revenue(),
+        'correlation_heatmap': summary.correlation(),
+        'category_revenue': summary.category_stats()['mean'].sort_values(),
+        'category_sales': summary.category_sales(),
+    }
+    if complete:
+        data['sales_vs_revenue'] = {'points': sample}
+    else:
+        data['sales_vs_revenue'] = {'grid': summary.sales_revenue.grid()}
+    if complete and summary.rows <= RATING_POINTS:
+        data['rating_distribution'] = {'ranks': np.arange(summary.rows), 'ratings': np.sort(sample['Rating'].values)}
+    else:
+        ranks = np.linspace(0, summary.rows - 1, RATING_POINTS)
+        data['rating_distribution'] = {
+            'ranks': ranks,
+            'ratings': summary.value_counts['Rating'].quantile(ranks / (summary.rows - 1)),
+        }
+    return data
+
+
+def revenue_by_product(ax, product_revenue):
+    colors = matplotlib.colormaps['viridis'](np.linspace(0, 1, len(product_revenue)))
+    ax.bar(product_revenue.index.astype(str), product_revenue.values, color=colors, edgecolor='black', linewidth=1.2)
+    ax.set_xlabel('Product', fontsize=11, fontweight='bold')
+    ax.set_ylabel('Revenue ($)', fontsize=11, fontweight='bold')
+    ax.set_title('Revenue by Product', fontsize=13, fontweight='bold', pad=15)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_horizontalalignment('right')
+
+
+def sales_vs_revenue(ax, data):
+    if 'points' in data:
+        points = data['points']
+        mappable = ax.scatter(points['Sales'], points['Revenue'], s=points['Rating']*100,
+                              c=points['Stock'], cmap='coolwarm', alpha=0.7,
+                              edgecolors='black', linewidth=1.5)
+        title, label = 'Sales vs Revenue\n(Size=Rating, Color=Stock)', 'Stock Level'
+        ax.grid(True, alpha=0.3, linestyle='--')
+    else:
+        x_edges, y_edges, counts = data['grid']
+        mappable = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts, 0), cmap='viridis',
+                                 norm=LogNorm(vmin=1, vmax=max(counts.max(), 1)))
+        title, label = 'Sales vs Revenue\n(products per bin)', 'Products'
+    ax.set_xlabel('Sales (Units)', fontsize=11, fontweight='bold')
+    ax.set_ylabel('Revenue ($)', fontsize=11, fontweight='bold')
+    ax.set_title(title, fontsize=13, fontweight='bold', pad=15)
+    cbar = ax.figure.colorbar(mappable, ax=ax)
+    cbar.set_label(label, fontsize=10)
+
+
+def correlation_heatmap(ax, correlation):
+    sns.heatmap(correlation, annot=True, fmt='.2f', cmap='RdYlGn',
+                center=0, square=True, linewidths=2, cbar_kws={"shrink": 0.8},
+                ax=ax)
+    ax.set_title('Correlation Heatmap', fontsize=13, fontweight='bold', pad=15)
+
+
+def category_revenue(ax, category_avg):
+    colors_cat = matplotlib.colormaps['plasma'](np.linspace(0, 1, len(category_avg)))
+    ax.barh(category_avg.index.astype(str), category_avg.values, color=colors_cat,
+            edgecolor='black', linewidth=1.2)
+    ax.set_xlabel('Average Revenue ($)', fontsize=11, fontweight='bold')
+    ax.set_ylabel('Category', fontsize=11, fontweight='bold')
+    ax.set_title('Average Revenue by Category', fontsize=13, fontweight='bold', pad=15)
+    ax.grid(axis='x', alpha=0.3, linestyle='--')
+
+
+def category_sales(ax, category_sales):
+    colors_pie = matplotlib.colormaps['Set3'](np.linspace(0, 1, len(category_sales)))
+    wedges, texts, autotexts = ax.pie(category_sales.values, labels=category_sales.index.astype(str),
+                                      autopct='%1.1f%%', startangle=90, colors=colors_pie,
+                                      explode=[0.05]*len(category_sales), shadow=True)
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+    ax.set_title('Sales Distribution by Category', fontsize=13, fontweight='bold', pad=15)
+
+
+def rating_distribution(ax, data):
+    ranks, ratings = data['ranks'], data['ratings']
+    markers = {'marker': 'o', 'markersize': 8, 'markerfacecolor': '#A23B72',
+               'markeredgecolor': 'black', 'markeredgewidth': 1.5} if len(ranks) <= 50 else {}
+    ax.plot(ranks, ratings, linewidth=2.5, color='#2E86AB', **markers)
+    ax.fill_between(ranks, ratings, alpha=0.3, color='#2E86AB')
+    ax.set_xlabel('Product Index (sorted by rating)', fontsize=11, fontweight='bold')
+    ax.set_ylabel('Rating', fontsize=11, fontweight='bold')
+    ax.set_title('Product Ratings Distribution', fontsize=13, fontweight='bold', pad=15)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.set_ylim(3, 5.5)
+
+
+CHARTS = {
+    'revenue_by_product': revenue_by_product,
+    'sales_vs_revenue': sales_vs_revenue,
+    'correlation_heatmap': correlation_heatmap,
+    'category_revenue': category_revenue,
+    'category_sales': category_sales,
+    'rating_distribution': rating_distribution,
+}
+
+
+def draw_figure(fig, data):
+    """Draw every chart into a 2x3 grid on ``fig``; return seconds per chart."""
+    timings = {}
+    for position, (name, draw) in enumerate(CHARTS.items(), 1):
+        start = time.perf_counter()
+        draw(fig.add_subplot(2, 3, position), data[name])
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def render_chart(name, data, path, dpi=100, format=None):
+    """Draw and save one chart on its own Agg figure; return the seconds it took."""
+    start = time.perf_counter()
+    with matplotlib.style.context('fast'):
+        fig = Figure(figsize=(8, 6))
+        CHARTS[name](fig.add_subplot(), data)
+        fig.tight_layout()
+        fig.savefig(path, dpi=dpi, format=format)
+    return time.perf_counter() - start
+
+
+def render_charts(data, directory, format='png', dpi=100, workers=1):
+    """Save each chart to ``directory/<name>.<format>``; return ``{name: (path, seconds)}``."""
+    os.makedirs(directory, exist_ok=True)
+    names = list(CHARTS)
+    paths = [os.path.join(directory, f'{name}.{format}') for name in names]
+    args = ([data[name] for name in names], paths, [dpi] * len(names), [format] * len(names))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(names))) as pool:
+            seconds = list(pool.map(render_chart, names, *args))
+    else:
+        seconds = list(map(render_chart, names, *args))
+    return {name: (path, elapsed) for name, path, elapsed in zip(names, paths, seconds)}
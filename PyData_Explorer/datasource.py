@@ -0,0 +1,122 @@
+"""Data sources for the explorer.
+
+Sales data is read in chunks with narrow dtypes so that files far larger
+than memory can be summarized: ``Product`` and ``Category`` are categoricals,
+counts are int32, ratings float32 and revenue, which is money and may have
+cents, float64. CSV is read with pandas; Parquet is read batch by batch with
+pyarrow (``pip install pyarrow``).
+"""
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+DTYPES = {
+    'Product': 'category',
+    'Sales': 'int32',
+    'Revenue': 'float64',
+    'Rating': 'float32',
+    'Stock': 'int32',
+    'Category': 'category',
+}
+COLUMNS = list(DTYPES)
+NUMERIC_COLUMNS = ['Sales', 'Revenue', 'Rating', 'Stock']
+
+DEFAULT_CHUNKSIZE = 1_000_000
+
+PRODUCTS = ['Laptop', 'Phone', 'Tablet', 'Monitor', 'Keyboard',
+            'Mouse', 'Headphones', 'Speaker', 'Webcam', 'Charger']
+CATEGORIES = ['Electronics', 'Electronics', 'Electronics', 'Electronics',
+              'Accessories', 'Accessories', 'Audio', 'Audio', 'Video', 'Accessories']
+
+
+def sample_data():
+    """The built-in ten-product demo dataset."""
+    np.random.seed(42)
+    data = {
+        'Product': PRODUCTS,
+        'Sales': np.random.randint(50, 500, 10),
+        'Revenue': np.random.randint(5000, 50000, 10),
+        'Rating': np.random.uniform(3.5, 5.0, 10).round(2),
+        'Stock': np.random.randint(10, 200, 10),
+        'Category': CATEGORIES,
+    }
+    return pd.DataFrame(data).astype(DTYPES)
+
+
+def generate(path, rows, seed=0, chunksize=DEFAULT_CHUNKSIZE):
+    """Write ``rows`` synthetic sales records to a CSV or Parquet file."""
+    rng = np.random.default_rng(seed)
+    products = np.array(PRODUCTS)
+    categories = np.array(CATEGORIES)
+    writer = None
+    try:
+        for start in range(0, rows, chunksize):
+            size = min(chunksize, rows - start)
+            index = rng.integers(0, len(PRODUCTS), size)
+            chunk = pd.DataFrame({
+                'Product': products[index],
+                'Sales': rng.integers(50, 500, size),
+                'Revenue': rng.integers(500_000, 5_000_000, size) / 100,
+                'Rating': rng.uniform(3.5, 5.0, size).round(2),
+                'Stock': rng.integers(10, 200, size),
+                'Category': categories[index],
+            }).astype(DTYPES)
+            if _is_parquet(path):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+
+def expand_inputs(patterns):
+    """Files named by ``patterns``: paths, glob patterns or directories, in sorted order."""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(
+                os.path.join(pattern, name) for name in os.listdir(pattern)
+                if _is_parquet(name) or name.lower().endswith('.csv')
+            )
+        else:
+            matches = sorted(glob.glob(pattern)) or [pattern]
+        paths.extend(matches)
+    return paths
+
+
+def read_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield DataFrames of at most ``chunksize`` rows with the explorer's dtypes."""
+    if _is_parquet(path):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit('Reading Parquet needs pyarrow: pip install pyarrow')
+        parquet = pq.ParquetFile(path)
+        start = 0
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=COLUMNS):
+            chunk = batch.to_pandas().astype(DTYPES)
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+    else:
+        yield from pd.read_csv(path, usecols=COLUMNS, dtype=DTYPES, chunksize=chunksize)
+
+
+def load_chunks(path=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Chunks of ``path``, or the demo dataset as a single chunk."""
+    if path is None:
+        return iter([sample_data()])
+    return read_chunks(path, chunksize)
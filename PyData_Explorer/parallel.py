@@ -0,0 +1,70 @@
+"""Summarize partitioned input files in parallel.
+
+Each file is summarized in a worker process and the resulting summaries
+are merged in file order, so the report is the same for any number of
+workers. Every file's sample gets its own seed, derived from its position.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import ColumnCache
+from datasource import DEFAULT_CHUNKSIZE, read_chunks
+from summary import Summary, summarize
+
+
+def summarize_file(path, chunksize=DEFAULT_CHUNKSIZE, seed=0, cache_dir=None):
+    """Summarize one file, through the column cache in ``cache_dir`` if given;
+    return the summary and the CPU seconds it took."""
+    start = time.process_time()
+    chunks = ColumnCache(cache_dir).read_chunks(path, chunksize) if cache_dir else read_chunks(path, chunksize)
+    summary = summarize(chunks, seed)
+    return summary, time.process_time() - start
+
+
+class Scaling:
+    """Timings of one parallel run.
+
+    The CPU time summed over files is what one process would need, so its
+    ratio to the elapsed time is the speedup over a serial run (ignoring
+    the serial run's own I/O waits).
+    """
+
+    def __init__(self, workers, files, wall_seconds, cpu_seconds):
+        self.workers = workers
+        self.files = files
+        self.wall_seconds = wall_seconds
+        self.cpu_seconds = cpu_seconds
+
+    @property
+    def speedup(self):
+        return sum(self.cpu_seconds) / self.wall_seconds
+
+    @property
+    def efficiency(self):
+        """Speedup per worker; 1.0 means every worker was busy the whole run."""
+        return self.speedup / min(self.workers, self.files)
+
+    def report(self):
+        return (f'{self.files} file(s) on {self.workers} worker(s): '
+                f'{self.wall_seconds:.2f}s elapsed, {sum(self.cpu_seconds):.2f}s CPU, '
+                f'slowest file {max(self.cpu_seconds):.2f}s CPU, '
+                f'speedup {self.speedup:.2f}x, efficiency {self.efficiency:.0%}')
+
+
+def summarize_files(paths, workers=1, chunksize=DEFAULT_CHUNKSIZE, cache_dir=None):
+    """Summarize ``paths`` on ``workers`` processes; return the summary and its ``Scaling``."""
+    start = time.perf_counter()
+    seeds = range(len(paths))
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            results = list(pool.map(summarize_file, paths, [chunksize] * len(paths), seeds,
+                                    [cache_dir] * len(paths)))
+    else:
+        results = [summarize_file(path, chunksize, seed, cache_dir) for path, seed in zip(paths, seeds)]
+    # Merging compacts the sketches with the target's generator; seed it
+    # apart from the files' seeds so the result is reproducible.
+    summary = Summary(seed=len(paths))
+    for partial, _ in results:
+        summary.merge(partial)
+    scaling = Scaling(workers, len(paths), time.perf_counter() - start, [seconds for _, seconds in results])
+    return summary, scaling
@@ -0,0 +1,150 @@
+"""Single-pass summary of a sales dataset.
+
+A ``Summary`` holds one accumulator (see ``accumulators``) for every value
+the explorer's report, charts and insights need, and updates all of them
+from each chunk as it is read, so the data is scanned once whatever its
+size. Summaries of separate chunks or files can be merged in row order,
+which gives the same result as summarizing them in sequence, except for
+the Sales and Revenue quartiles: those come from quantile sketches, whose
+estimates depend on how the rows were split but stay within the sketch's
+error bound. All state is bounded by the chunk size, the sample size and
+the number of distinct categories, products, ratings, stock levels and
+occupied Sales/Revenue histogram bins.
+"""
+import operator
+
+import pandas as pd
+
+from accumulators import (
+    Extremes, GroupSums, Histogram2D, Moments, QuantileSketch, Sample, Sums, Threshold, TopN,
+    ValueCounts,
+)
+from datasource import NUMERIC_COLUMNS
+
+SAMPLE_SIZE = 10_000
+TOP_N = 3
+HEAD_ROWS = 5
+SALES_BIN = 10
+REVENUE_BIN = 1_000
+EXACT_QUANTILE_COLUMNS = ['Rating', 'Stock']
+
+
+class Summary:
+    def __init__(self, seed=None):
+        self.head = None
+        self.dtypes = None
+        self.non_null = None
+        self.memory_bytes = 0
+        self.moments = Moments(NUMERIC_COLUMNS)
+        self.totals = Sums(['Sales', 'Revenue', 'Stock'])
+        self.extremes = {column: Extremes(column) for column in NUMERIC_COLUMNS}
+        # Exact counts only where the values are few; sketches elsewhere.
+        self.value_counts = {column: ValueCounts(column) for column in EXACT_QUANTILE_COLUMNS}
+        self.sketches = {column: QuantileSketch(column, seed=seed) for column in NUMERIC_COLUMNS
+                         if column not in EXACT_QUANTILE_COLUMNS}
+        self.categories = GroupSums('Category', ['Revenue', 'Sales'])
+        self.products = GroupSums('Product', ['Revenue'])
+        self.top_revenue = TopN('Revenue', TOP_N)
+        self.rating_above_4_5 = Threshold('Rating', operator.gt, 4.5)
+        self.low_stock = Threshold('Stock', operator.lt, 50)
+        self.sample = Sample(NUMERIC_COLUMNS, SAMPLE_SIZE, seed)
+        self.sales_revenue = Histogram2D('Sales', 'Revenue', SALES_BIN, REVENUE_BIN)
+
+    def _accumulators(self):
+        yield self.moments
+        yield self.totals
+        yield from self.extremes.values()
+        yield from self.value_counts.values()
+        yield from self.sketches.values()
+        yield from (self.categories, self.products, self.top_revenue,
+                    self.rating_above_4_5, self.low_stock, self.sample, self.sales_revenue)
+
+    def update(self, chunk):
+        """Fold one chunk into every accumulator."""
+        if not len(chunk):
+            return self
+        self._merge_info(chunk.head(HEAD_ROWS), chunk.dtypes, chunk.notna().sum(),
+                         int(chunk.memory_usage(deep=True).sum()))
+        for accumulator in self._accumulators():
+            accumulator.update(chunk)
+        return self
+
+    def merge(self, other):
+        """Fold in the summary of the rows that follow this one's."""
+        if other.head is None:
+            return self
+        self._merge_info(other.head, other.dtypes, other.non_null, other.memory_bytes)
+        for mine, theirs in zip(self._accumulators(), other._accumulators()):
+            mine.merge(theirs)
+        return self
+
+    def _merge_info(self, head, dtypes, non_null, memory_bytes):
+        if self.head is None:
+            self.head, self.dtypes, self.non_null = head, dtypes, non_null
+        else:
+            if len(self.head) < HEAD_ROWS:
+                self.head = pd.concat([self.head, head]).head(HEAD_ROWS)
+            self.non_null = self.non_null + non_null
+        self.memory_bytes = max(self.memory_bytes, memory_bytes)
+
+    # Report values
+
+    @property
+    def rows(self):
+        return self.moments.count
+
+    def means(self):
+        return self.moments.means()
+
+    def correlation(self):
+        return self.moments.correlation()
+
+    def quantile(self, column, q):
+        """Exact for Rating and Stock, from a KLL sketch (rank error about
+        1.7% of the rows) for Sales and Revenue."""
+        if column in self.value_counts:
+            return self.value_counts[column].quantile(q)
+        return self.sketches[column].quantile(q)
+
+    def describe(self):
+        """The numeric columns' statistics in the layout of ``DataFrame.describe``."""
+        stats = {
+            'count': pd.Series(float(self.rows), index=NUMERIC_COLUMNS),
+            'mean': self.moments.means(),
+            'std': self.moments.std(),
+        }
+        stats['min'] = pd.Series({c: float(self.extremes[c].min) for c in NUMERIC_COLUMNS})
+        for q in (0.25, 0.5, 0.75):
+            stats[f'{q:.0%}'] = pd.Series({c: float(self.quantile(c, q)) for c in NUMERIC_COLUMNS})
+        stats['max'] = pd.Series({c: float(self.extremes[c].max) for c in NUMERIC_COLUMNS})
+        return pd.DataFrame(stats).T
+
+    def category_stats(self):
+        categories = self.categories
+        return pd.DataFrame({
+            'mean': categories.means('Revenue'),
+            'sum': categories.sums['Revenue'],
+            'count': categories.counts,
+        }).rename_axis('Category')
+
+    def category_sales(self):
+        return self.categories.sums['Sales'].rename_axis('Category')
+
+    def product_revenue(self):
+        return self.products.sums['Revenue']
+
+    def info(self):
+        lines = [f'{self.rows} rows, {len(self.dtypes)} columns',
+                 f'{"Column":<10} {"Non-Null":>12} {"Dtype":<10}']
+        for column, dtype in self.dtypes.items():
+            lines.append(f'{column:<10} {int(self.non_null[column]):>12} {str(dtype):<10}')
+        lines.append(f'largest chunk in memory: {self.memory_bytes / 1024:.1f} KB')
+        return '\n'.join(lines)
+
+
+def summarize(chunks, seed=0):
+    """Summarize an iterable of chunks in one pass."""
+    summary = Summary(seed)
+    for chunk in chunks:
+        summary.update(chunk)
+    return summary
@@ -0,0 +1,264 @@
+"""Tests for the explorer's data sources and streaming summary.
+
+Run from this directory with ``python -m unittest tests``. Summaries built
+chunk by chunk are checked against pandas run on the whole frame.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import datasource
+from accumulators import Moments, QuantileSketch, ValueCounts
+from cache import ColumnCache
+from charts import CHARTS, RATING_POINTS, chart_data, render_charts
+from datasource import DTYPES, NUMERIC_COLUMNS
+from parallel import summarize_files
+from summary import Summary, summarize
+
+ROWS = 20_000
+CHUNKSIZE = 3_000
+SKETCHED = ['Sales', 'Revenue']
+RANK_ERROR = 0.02
+
+
+def rank_error(values, estimate, q):
+    """How far ``estimate``'s rank among ``values`` is from ``q``, as a fraction."""
+    below, at_most = (values < estimate).mean(), (values <= estimate).mean()
+    return 0 if below <= q <= at_most else min(abs(below - q), abs(at_most - q))
+
+
+class SummaryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmp, 'sales.csv')
+        datasource.generate(cls.path, ROWS, seed=1)
+        cls.df = pd.read_csv(cls.path).astype(DTYPES)
+        cls.summary = summarize(datasource.read_chunks(cls.path, CHUNKSIZE))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_describe_matches_pandas(self):
+        described = self.summary.describe()
+        expected = self.df[NUMERIC_COLUMNS].describe()
+        quartiles = ['25%', '50%', '75%']
+        pd.testing.assert_frame_equal(described.drop(index=quartiles), expected.drop(index=quartiles),
+                                      check_dtype=False, rtol=1e-6)
+        pd.testing.assert_frame_equal(described.loc[quartiles, ['Rating', 'Stock']],
+                                      expected.loc[quartiles, ['Rating', 'Stock']], check_dtype=False, rtol=1e-6)
+        for column in SKETCHED:
+            for q, name in zip((0.25, 0.5, 0.75), quartiles):
+                self.assertLess(rank_error(self.df[column], described.loc[name, column], q), RANK_ERROR)
+
+    def test_moments_match_pandas(self):
+        numeric = self.df[NUMERIC_COLUMNS].astype(np.float64)
+        pd.testing.assert_series_equal(self.summary.means(), numeric.mean())
+        pd.testing.assert_frame_equal(self.summary.moments.covariance(), numeric.cov())
+        pd.testing.assert_frame_equal(self.summary.correlation(), numeric.corr())
+
+    def test_totals_extremes_and_thresholds_match_pandas(self):
+        df = self.df
+        totals = self.summary.totals
+        for column in ('Sales', 'Stock'):
+            self.assertEqual(totals.total(column), df[column].sum())
+        self.assertAlmostEqual(totals.total('Revenue'), df['Revenue'].sum(), places=4)
+        for column in ('Sales', 'Revenue', 'Rating'):
+            extremes = self.summary.extremes[column]
+            pd.testing.assert_series_equal(extremes.max_row, df.loc[df[column].idxmax()])
+            pd.testing.assert_series_equal(extremes.min_row, df.loc[df[column].idxmin()])
+        self.assertEqual(self.summary.rating_above_4_5.count, len(df[df['Rating'] > 4.5]))
+        self.assertEqual(self.summary.low_stock.count, len(df[df['Stock'] < 50]))
+
+    def test_groups_and_top_rows_match_pandas(self):
+        df = self.df
+        expected = df.groupby('Category', observed=True)['Revenue'].agg(['mean', 'sum', 'count'])
+        pd.testing.assert_frame_equal(self.summary.category_stats(), expected, check_dtype=False)
+        pd.testing.assert_series_equal(self.summary.category_sales(),
+                                       df.groupby('Category', observed=True)['Sales'].sum(), check_dtype=False)
+        pd.testing.assert_series_equal(self.summary.product_revenue(),
+                                       df.groupby('Product', observed=True)['Revenue'].sum(), check_dtype=False)
+        pd.testing.assert_frame_equal(self.summary.top_revenue.rows, df.nlargest(3, 'Revenue'))
+        self.assertEqual(self.summary.categories.counts.idxmax(), df['Category'].value_counts().idxmax())
+
+    def test_head_and_info(self):
+        pd.testing.assert_frame_equal(self.summary.head, self.df.head())
+        self.assertEqual(self.summary.rows, ROWS)
+        self.assertIn(f'{ROWS} rows, 6 columns', self.summary.info())
+
+    def test_merging_partitions_matches_one_pass(self):
+        chunks = list(datasource.read_chunks(self.path, CHUNKSIZE))
+        partials = [summarize(chunks[:2], seed=1), summarize(chunks[2:5], seed=2), summarize(chunks[5:], seed=3)]
+        merged = partials[0].merge(partials[1].merge(partials[2]))
+        pd.testing.assert_frame_equal(merged.describe().drop(columns=SKETCHED),
+                                      self.summary.describe().drop(columns=SKETCHED))
+        for column in SKETCHED:
+            self.assertLess(rank_error(self.df[column], merged.quantile(column, 0.5), 0.5), RANK_ERROR)
+        pd.testing.assert_frame_equal(merged.correlation(), self.summary.correlation())
+        pd.testing.assert_frame_equal(merged.category_stats(), self.summary.category_stats())
+        pd.testing.assert_frame_equal(merged.top_revenue.rows, self.summary.top_revenue.rows)
+        self.assertEqual(merged.low_stock.count, self.summary.low_stock.count)
+        self.assertEqual(len(merged.sample.frame()), len(self.summary.sample.frame()))
+
+    def test_ties_resolve_to_first_row_across_chunks(self):
+        df = self.df.head(6).copy()
+        df['Sales'] = 100
+        summary = Summary()
+        for start in range(0, 6, 2):
+            summary.update(df.iloc[start:start + 2])
+        self.assertEqual(summary.extremes['Sales'].max_row.name, 0)
+        self.assertEqual(summary.extremes['Sales'].min_row.name, 0)
+
+    def test_charts_are_drawn_from_aggregates(self):
+        data = chart_data(self.summary)
+        x_edges, y_edges, counts = data['sales_vs_revenue']['grid']
+        self.assertEqual(counts.sum(), ROWS)
+        self.assertEqual(counts.shape, (len(y_edges) - 1, len(x_edges) - 1))
+        expected = ((self.df['Sales'] >= x_edges[0]) & (self.df['Sales'] < x_edges[1])
+                    & (self.df['Revenue'] >= y_edges[0]) & (self.df['Revenue'] < y_edges[1])).sum()
+        self.assertEqual(counts[0, 0], expected)
+        ratings = data['rating_distribution']['ratings']
+        self.assertEqual(len(ratings), RATING_POINTS)
+        self.assertAlmostEqual(ratings[-1], self.df['Rating'].max(), places=5)
+
+        charts = render_charts(data, os.path.join(self.tmp, 'charts'), format='svg', dpi=50)
+        self.assertEqual(list(charts), list(CHARTS))
+        for path, seconds in charts.values():
+            self.assertTrue(os.path.getsize(path))
+
+    def test_demo_data(self):
+        df = datasource.sample_data()
+        summary = summarize(datasource.load_chunks())
+        self.assertEqual(summary.extremes['Revenue'].max_row['Product'], df.loc[df['Revenue'].idxmax(), 'Product'])
+        pd.testing.assert_frame_equal(summary.sample.frame(), df[NUMERIC_COLUMNS])
+
+
+class DecimalRevenueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'sales.csv')
+        with open(self.path, 'w') as f:
+            f.write('Product,Sales,Revenue,Rating,Stock,Category\n'
+                    'Laptop,10,1999.99,4.5,20,Electronics\n'
+                    'Mouse,25,249.75,4.1,80,Accessories\n'
+                    'Phone,12,1999.99,4.8,15,Electronics\n'
+                    'Cable,40,0.10,3.9,300,Accessories\n'
+                    'Speaker,7,350.20,4.2,45,Audio\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_cents_are_kept(self):
+        df = pd.read_csv(self.path)
+        summary = summarize(datasource.read_chunks(self.path, 2))
+        self.assertEqual(summary.dtypes['Revenue'], np.float64)
+        self.assertAlmostEqual(summary.totals.total('Revenue'), 4600.03, places=9)
+        expected = df.groupby('Category')['Revenue'].agg(['mean', 'sum', 'count'])
+        pd.testing.assert_frame_equal(summary.category_stats(), expected, check_dtype=False,
+                                      check_index_type=False, check_categorical=False)
+        self.assertEqual(summary.top_revenue.rows['Revenue'].tolist(), [1999.99, 1999.99, 350.20])
+        self.assertEqual(summary.extremes['Revenue'].min_row['Product'], 'Cable')
+        x_edges, y_edges, counts = summary.sales_revenue.grid()
+        self.assertEqual(counts.sum(), len(df))
+        self.assertEqual(y_edges[0], 0)
+
+
+class ParallelTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.paths = [os.path.join(self.tmp, f'day{day}.csv') for day in range(3)]
+        for seed, path in enumerate(self.paths):
+            datasource.generate(path, 2_000, seed=seed)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_workers_do_not_change_the_result(self):
+        serial, _ = summarize_files(self.paths, workers=1, chunksize=700)
+        parallel, scaling = summarize_files(self.paths, workers=2, chunksize=700)
+        df = pd.concat(pd.read_csv(path) for path in self.paths)
+        self.assertEqual(parallel.rows, len(df))
+        pd.testing.assert_frame_equal(parallel.correlation(), df[NUMERIC_COLUMNS].corr())
+        pd.testing.assert_frame_equal(parallel.describe(), serial.describe())
+        pd.testing.assert_frame_equal(parallel.category_stats(), serial.category_stats())
+        pd.testing.assert_frame_equal(parallel.sample.frame(), serial.sample.frame())
+        self.assertEqual(scaling.files, 3)
+        self.assertIn('efficiency', scaling.report())
+
+    def test_expand_inputs(self):
+        self.assertEqual(datasource.expand_inputs([self.tmp]), self.paths)
+        self.assertEqual(datasource.expand_inputs([os.path.join(self.tmp, 'day*.csv')]), self.paths)
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'sales.parquet')
+        datasource.generate(self.path, 5_000, seed=3)
+        self.cache = ColumnCache(os.path.join(self.tmp, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_cached_chunks_match_source(self):
+        for _ in range(2):
+            cached = list(self.cache.read_chunks(self.path, 1_200))
+            self.assertEqual([len(chunk) for chunk in cached], [1_200] * 4 + [200])
+            pd.testing.assert_frame_equal(pd.concat(cached), pd.concat(datasource.read_chunks(self.path, 1_200)))
+        _, columns = self.cache.columns(self.path)
+        self.assertIsInstance(columns['Revenue'], np.memmap)
+
+    def test_entry_is_reused_until_source_changes(self):
+        self.cache.columns(self.path)
+        with mock.patch.object(self.cache, 'ingest', side_effect=AssertionError('re-ingested')):
+            self.cache.columns(self.path)
+        datasource.generate(self.path, 100, seed=4)
+        self.assertIsNone(self.cache.meta(self.path))
+        self.assertEqual(sum(len(chunk) for chunk in self.cache.read_chunks(self.path)), 100)
+
+
+class AccumulatorTest(unittest.TestCase):
+    def test_moments_are_stable_for_large_offsets(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({'x': 1e9 + rng.random(10_000)})
+        moments = Moments(['x'])
+        for start in range(0, len(df), 1_000):
+            moments.update(df.iloc[start:start + 1_000])
+        self.assertAlmostEqual(moments.std()['x'], df['x'].std(), places=6)
+
+    def test_quantile_sketch_is_bounded_and_accurate(self):
+        rng = np.random.default_rng(0)
+        values = pd.Series(rng.lognormal(8, 1, 200_000))
+        parts = []
+        for start in range(0, len(values), 25_000):
+            parts.append(QuantileSketch('x', seed=start).update(values.iloc[start:start + 25_000].to_frame('x')))
+        sketch = parts[0]
+        for part in parts[1:]:
+            sketch.merge(part)
+        self.assertEqual(sketch.count, len(values))
+        self.assertLess(sketch.size, 3 * sketch.k)
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            self.assertLess(rank_error(values, sketch.quantile(q), q), RANK_ERROR)
+
+    def test_quantile_sketch_is_exact_before_compacting(self):
+        series = pd.Series([5.0, 1.0, 3.0, 2.0])
+        sketch = QuantileSketch('x').update(series.to_frame('x'))
+        for q in (0, 0.25, 0.5, 0.9, 1):
+            self.assertAlmostEqual(sketch.quantile(q), series.quantile(q))
+
+    def test_quantiles_match_pandas(self):
+        rng = np.random.default_rng(0)
+        series = pd.Series(rng.integers(0, 50, 1_001))
+        counts = ValueCounts('x').update(series.iloc[:400].to_frame('x')).update(series.iloc[400:].to_frame('x'))
+        for q in (0, 0.1, 0.25, 0.5, 0.75, 0.99, 1):
+            self.assertAlmostEqual(counts.quantile(q), series.quantile(q))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Micro-benchmarks for the sentiment service.
+
+Covers single-text latency, batch throughput across batch sizes and text
+lengths for each scorer, cold vs hot result-cache scoring, and the cost of
+rendering result.html. Results can be saved as a baseline and later runs
+compared against it, failing if anything got slower than allowed.
+
+    python benchmarks/bench_scoring.py --save baseline.json
+    python benchmarks/bench_scoring.py --compare baseline.json --max-regression 0.25
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sentimentanalyzer.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.template.loader import render_to_string  # noqa: E402
+
+from sentiment import cache, scoring  # noqa: E402
+from sentiment.engine import get_engine  # noqa: E402
+
+WORDS = (
+    'the food was great but service slow and the room very clean although '
+    'staff seemed rude not bad overall really enjoyed it terrible parking '
+    'would definitely come back pretty good value awful noise lovely view'
+).split()
+LENGTHS = {'short': 8, 'medium': 40, 'long': 200}
+
+
+def make_texts(count, words, seed=0):
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(WORDS) for _ in range(words)) for _ in range(count)]
+
+
+def measure(fn, repeat, setup=None):
+    """Median wall time of ``fn()`` over ``repeat`` runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run(args):
+    results = []
+
+    def record(name, seconds, items=1):
+        results.append({'name': name, 'seconds': seconds, 'items_per_sec': items / seconds})
+        print(f'{name:<40} {seconds * 1000:>10.3f} ms {items / seconds:>14,.0f} /s')
+
+    for name in args.scorers:
+        scoring.warm_up(name)
+        text = make_texts(1, LENGTHS['medium'])[0]
+        record(f'single/{name}', measure(lambda: scoring.score_text(text, name), args.repeat * 20))
+
+    for name in args.scorers:
+        for length, words in LENGTHS.items():
+            for size in args.sizes:
+                texts = make_texts(size, words)
+                record(f'batch/{name}/{length}/{size}',
+                       measure(lambda: scoring.score_many(texts, name), args.repeat), size)
+
+    texts = make_texts(args.cache_size, LENGTHS['medium'])
+    result_cache = cache.get_result_cache()
+    record(f'cache/cold/{args.cache_size}',
+           measure(lambda: cache.score_many(texts), args.repeat, setup=result_cache.clear), args.cache_size)
+    cache.score_many(texts)
+    record(f'cache/hot/{args.cache_size}',
+           measure(lambda: cache.score_many(texts), args.repeat), args.cache_size)
+    result_cache.clear()
+
+    context = {'text': texts[0], 'result': scoring.LABELS['positive'], 'polarity': 0.5, 'subjectivity': 0.5}
+    render_to_string('result.html', context)
+    record('render/result.html', measure(lambda: render_to_string('result.html', context), args.repeat * 20))
+
+    get_engine().shutdown()
+    return results
+
+
+def compare(results, baseline_path, max_regression):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {r['name']: r for r in json.load(f)}
+    regressions = []
+    for result in results:
+        before = baseline.get(result['name'])
+        if before is None:
+            continue
+        change = result['seconds'] / before['seconds'] - 1
+        if change > max_regression:
+            regressions.append((result['name'], change))
+    for name, change in regressions:
+        print(f'REGRESSION {name}: {change:+.0%}')
+    return not regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scorers', nargs='+', default=sorted(scoring.SCORERS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1, 100, 1000, 10000])
+    parser.add_argument('--cache-size', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', help='Write results to this JSON file.')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against.')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='Allowed slowdown versus the baseline (default: 0.25 = 25%%).')
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
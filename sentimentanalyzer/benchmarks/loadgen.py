@@ -0,0 +1,128 @@
+"""Closed-loop load generator for the sentiment service.
+
+Starts ``manage.py runserver`` on a free local port (or targets ``--url``),
+sends requests from a pool of concurrent clients and reports throughput and
+p50/p95/p99 latency.
+
+    python benchmarks/loadgen.py --requests 2000 --concurrency 16 --batch 50
+    python benchmarks/loadgen.py --url http://127.0.0.1:8000 --endpoint /api/score/async/
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = [
+    'The food was absolutely amazing and the staff were friendly.',
+    'Terrible service, cold food, never coming back!',
+    'It was okay, nothing special.',
+    'Highly recommended!',
+    'The plot was predictable and boring, but the acting was great.',
+    'Worst experience ever :(',
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port):
+    process = subprocess.Popen(
+        [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload',
+         '--settings', 'benchmarks.loadgen_settings'],
+        cwd=PROJECT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError('runserver exited before accepting connections')
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError('runserver did not start within 30s')
+
+
+def send(url, body):
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        status = exc.code
+    except OSError:
+        status = None
+    return time.perf_counter() - start, status
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Base URL of a running server (default: start runserver).')
+    parser.add_argument('--endpoint', default='/api/score/')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--batch', type=int, default=1, help='Texts per request.')
+    parser.add_argument('--unique', action='store_true', help='Make every text unique to defeat the cache.')
+    args = parser.parse_args()
+
+    process = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        process = start_server(port)
+        base_url = f'http://127.0.0.1:{port}'
+    url = base_url.rstrip('/') + args.endpoint
+
+    rng = random.Random(0)
+    bodies = []
+    for i in range(args.requests):
+        texts = [rng.choice(SAMPLES) + (f' #{i}-{j}' if args.unique else '') for j in range(args.batch)]
+        bodies.append(json.dumps(texts).encode('utf-8'))
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            outcomes = list(executor.map(lambda body: send(url, body), bodies))
+        elapsed = time.perf_counter() - started
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latencies = sorted(latency for latency, _ in outcomes)
+    statuses = {}
+    for _, status in outcomes:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    print(f'{url}: {args.requests} requests x {args.batch} texts, concurrency {args.concurrency}')
+    print(f'  throughput  {args.requests / elapsed:,.1f} req/s  {args.requests * args.batch / elapsed:,.0f} texts/s')
+    print(f'  latency ms  mean {statistics.mean(latencies) * 1000:.1f}  '
+          f'p50 {percentile(latencies, 50) * 1000:.1f}  '
+          f'p95 {percentile(latencies, 95) * 1000:.1f}  '
+          f'p99 {percentile(latencies, 99) * 1000:.1f}  '
+          f'max {latencies[-1] * 1000:.1f}')
+    print(f'  status      {", ".join(f"{status}: {count}" for status, count in sorted(statuses.items(), key=str))}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+"""Settings for the runserver instance started by benchmarks/loadgen.py."""
+from sentimentanalyzer.settings import *  # noqa: F401,F403
+
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+
+# The load test measures scoring, not SQLite writes into db.sqlite3.
+SENTIMENT_STORE_RESULTS = False
@@ -0,0 +1,79 @@
+"""Measure worker cold-start cost with and without the scorer warm-up.
+
+Each sample runs in a fresh interpreter and reports how long Django takes
+to boot (settings, apps, SentimentConfig.ready()) and how long the first
+and second /api/score/ requests take afterwards.
+
+    python benchmarks/startup.py --repeat 5 --scorer textblob
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child():
+    started = time.perf_counter()
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sentimentanalyzer.settings')
+    from django.core.wsgi import get_wsgi_application
+    get_wsgi_application()
+    booted = time.perf_counter()
+
+    from django.conf import settings
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    settings.SENTIMENT_STORE_RESULTS = False
+    client = Client()
+    latencies = []
+    for text in ('What a great product', 'Terrible support'):
+        start = time.perf_counter()
+        response = client.post('/api/score/', json.dumps([text]), content_type='application/json')
+        b''.join(response.streaming_content)
+        latencies.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        'boot': booted - started,
+        'first_request': latencies[0],
+        'second_request': latencies[1],
+    }))
+
+
+def sample(warmup, scorer):
+    env = dict(os.environ, SENTIMENT_WARMUP='1' if warmup else '0', SENTIMENT_POOL_SIZE='1',
+               SENTIMENT_SCORER=scorer)
+    output = subprocess.run(
+        [sys.executable, __file__, '--child'], env=env, cwd=PROJECT_DIR,
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scorer', default='textblob')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    print(f'{"mode":<10} {"boot ms":>10} {"1st req ms":>12} {"2nd req ms":>12} {"boot+1st ms":>12}')
+    for warmup in (False, True):
+        runs = [sample(warmup, args.scorer) for _ in range(args.repeat)]
+        boot = statistics.median(r['boot'] for r in runs) * 1000
+        first = statistics.median(r['first_request'] for r in runs) * 1000
+        second = statistics.median(r['second_request'] for r in runs) * 1000
+        mode = 'warm-up' if warmup else 'lazy'
+        print(f'{mode:<10} {boot:>10.1f} {first:>12.1f} {second:>12.1f} {boot + first:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
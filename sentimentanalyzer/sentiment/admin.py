@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import SentimentResult
+
+
+@admin.register(SentimentResult)
+class SentimentResultAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'label', 'polarity', 'subjectivity', 'scorer', 'text_hash')
+    list_filter = ('label', 'scorer')
+    date_hierarchy = 'created_at'
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class SentimentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sentiment'
+
+    def ready(self):
+        # Opt-in: load the scorer and its lexicon before the worker accepts
+        # traffic rather than on the first request.
+        if settings.SENTIMENT_WARMUP:
+            from .scoring import warm_up
+            warm_up(settings.SENTIMENT_SCORER)
@@ -0,0 +1,143 @@
+"""Batch input parsing and chunked scoring for the JSON API."""
+import json
+from itertools import islice
+
+from django.conf import settings
+
+from . import cache, metrics
+from .engine import get_engine
+from .models import SentimentResult
+
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+class BatchError(ValueError):
+    """Raised when a batch request body cannot be parsed."""
+
+
+def make_item(index, value, text_field='text', id_field='id'):
+    """Normalise one decoded JSON value (or CSV row) into an item dict."""
+    if isinstance(value, str):
+        return {'index': index, 'text': value}
+    if isinstance(value, dict) and isinstance(value.get(text_field), str):
+        item = {'index': index, 'text': value[text_field]}
+        if id_field in value:
+            item['id'] = value[id_field]
+        return item
+    return {'index': index, 'error': f'Item must be a string or an object with a "{text_field}" string.'}
+
+
+def iter_items(request):
+    """Yield items from a JSON array or NDJSON request body.
+
+    JSON arrays are validated up front and raise ``BatchError``. NDJSON is
+    read line by line so large uploads are never held in memory; a bad line
+    becomes an error item instead of failing the whole batch.
+    """
+    content_type = request.content_type or ''
+    if content_type in NDJSON_CONTENT_TYPES:
+        return iter_ndjson(request)
+
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        raise BatchError('Request body must be a JSON array or NDJSON.')
+    if isinstance(payload, dict) and 'texts' in payload:
+        payload = payload['texts']
+    if not isinstance(payload, list):
+        raise BatchError('Request body must be a JSON array of texts.')
+    return (make_item(index, value) for index, value in enumerate(payload))
+
+
+def iter_ndjson(stream, text_field='text', id_field='id'):
+    """Yield items from an iterable of NDJSON lines, one line at a time."""
+    index = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except (ValueError, UnicodeDecodeError):
+            yield {'index': index, 'error': 'Invalid JSON line.'}
+        else:
+            yield make_item(index, value, text_field, id_field)
+        index += 1
+
+
+def chunked(iterable, size):
+    """Yield lists of up to ``size`` items from ``iterable``."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def item_texts(chunk):
+    """Texts of the items in a chunk that parsed successfully."""
+    return [item['text'] for item in chunk if 'error' not in item]
+
+
+def merge_results(chunk, scores):
+    """Combine a chunk's items with the scores of its valid items."""
+    scores = iter(scores)
+    results = []
+    for item in chunk:
+        result = {'index': item['index']}
+        if 'id' in item:
+            result['id'] = item['id']
+        if 'error' in item:
+            result['error'] = item['error']
+        else:
+            result.update(next(scores))
+        results.append(result)
+    return results
+
+
+def score_chunk(chunk):
+    """Score the valid items of a chunk in one pass and return result dicts."""
+    return merge_results(chunk, cache.score_many(item_texts(chunk)))
+
+
+def save_chunk(chunk, results, scorer=None):
+    """Persist the successfully scored items of a chunk in bulk."""
+    scored = [(item, result) for item, result in zip(chunk, results) if 'error' not in result]
+    if not scored:
+        return
+    with metrics.phase('persist'):
+        SentimentResult.objects.record(
+            [cache.text_hash(item['text']) for item, _ in scored],
+            [result for _, result in scored],
+            scorer=scorer or get_engine().scorer,
+            batch_size=settings.SENTIMENT_STORE_BATCH_SIZE,
+        )
+
+
+def render(results):
+    with metrics.phase('serialize'):
+        return ''.join(json.dumps(result) + '\n' for result in results)
+
+
+def stream_scores(items):
+    """Score items chunk by chunk, yielding one NDJSON chunk at a time."""
+    for chunk in chunked(items, settings.SENTIMENT_BATCH_SIZE):
+        results = score_chunk(chunk)
+        if settings.SENTIMENT_STORE_RESULTS:
+            save_chunk(chunk, results)
+        yield render(results)
+
+
+def score_request(request):
+    """Parse and score a whole batch request without touching the database.
+
+    Returns ``(chunk, results)`` pairs so the caller can persist them from a
+    thread that owns a database connection.
+    """
+    return [(chunk, score_chunk(chunk)) for chunk in chunked(iter_items(request), settings.SENTIMENT_BATCH_SIZE)]
+
+
+def save_scored(scored):
+    for chunk, results in scored:
+        save_chunk(chunk, results)
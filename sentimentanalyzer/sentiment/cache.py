@@ -0,0 +1,165 @@
+"""Content-addressed cache of sentiment results.
+
+Results are stored in the Django cache named by ``SENTIMENT_CACHE_ALIAS``
+under the scorer name and a hash of the normalised text, so repeated inputs
+skip TextBlob. A process-local LRU index bounds the number of entries
+regardless of which cache backend is configured, and counts hits, misses
+and evictions.
+"""
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+from .engine import get_engine
+
+KEY_PREFIX = 'sentiment:v1:'
+
+
+def normalize(text):
+    """Normalise text so trivially different inputs share a cache entry."""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def text_hash(text):
+    """SHA-256 hex digest of the normalised text."""
+    return hashlib.sha256(normalize(text).encode('utf-8')).hexdigest()
+
+
+def cache_key(text, scorer):
+    return f'{KEY_PREFIX}{scorer}:{text_hash(text)}'
+
+
+class ResultCache:
+    """Size-bounded LRU cache of scores on top of a Django cache backend."""
+
+    def __init__(self, alias=None, max_entries=None):
+        self.alias = alias or settings.SENTIMENT_CACHE_ALIAS
+        self.max_entries = max_entries or settings.SENTIMENT_CACHE_MAX_ENTRIES
+        self._index = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def get_many(self, keys):
+        """Return cached results for ``keys`` as a list, None for misses.
+
+        Hits join the LRU index, so the index is trimmed here as well as in
+        ``set_many``; an entry written by another process counts once it is read.
+        """
+        found = self.backend.get_many(set(keys))
+        with self._lock:
+            for key in keys:
+                if key in found:
+                    self.hits += 1
+                    self._index[key] = None
+                    self._index.move_to_end(key)
+                else:
+                    self.misses += 1
+            evicted = self._evict()
+        if evicted:
+            self.backend.delete_many(evicted)
+        return [found.get(key) for key in keys]
+
+    def set_many(self, entries):
+        """Store a key -> result mapping, evicting least recently used entries."""
+        entries = dict(entries)
+        with self._lock:
+            for key in entries:
+                self._index[key] = None
+                self._index.move_to_end(key)
+            evicted = self._evict()
+            for key in evicted:
+                entries.pop(key, None)
+        if entries:
+            self.backend.set_many(entries, timeout=None)
+        if evicted:
+            self.backend.delete_many(evicted)
+
+    def _evict(self):
+        """Trim the index to ``max_entries``; return the evicted keys. Hold the lock."""
+        evicted = []
+        while len(self._index) > self.max_entries:
+            key, _ = self._index.popitem(last=False)
+            evicted.append(key)
+        self.evictions += len(evicted)
+        return evicted
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._index),
+                'max_entries': self.max_entries,
+            }
+
+    def clear(self):
+        with self._lock:
+            self.backend.delete_many(list(self._index))
+            self._index.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Return the process-wide ResultCache, creating it on first use."""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache()
+    return _result_cache
+
+
+def score_many(texts):
+    """Score texts through the result cache, scoring each distinct miss once."""
+    result_cache = get_result_cache()
+    engine = get_engine()
+    keys = [cache_key(text, engine.scorer) for text in texts]
+    with metrics.phase('cache'):
+        results = result_cache.get_many(keys)
+    pending = OrderedDict()
+    for key, text, result in zip(keys, texts, results):
+        if result is None:
+            pending.setdefault(key, text)
+    if pending:
+        scored = dict(zip(pending, engine.score_many(list(pending.values()))))
+        with metrics.phase('cache'):
+            result_cache.set_many(scored)
+        results = [result if result is not None else scored[key]
+                   for key, result in zip(keys, results)]
+    return results
+
+
+def _cache_events():
+    stats = get_result_cache().stats()
+    return {('hit',): stats['hits'], ('miss',): stats['misses'], ('eviction',): stats['evictions']}
+
+
+metrics.REGISTRY.register(metrics.FunctionMetric(
+    'sentiment_cache_events_total', 'Result cache lookups and evictions.', _cache_events, ('event',), kind='counter',
+))
+metrics.REGISTRY.register(metrics.FunctionMetric(
+    'sentiment_cache_entries', 'Entries tracked by the result cache LRU index.',
+    lambda: get_result_cache().stats()['size'],
+))
+
+
+def score_text(text):
+    return score_many([text])[0]
@@ -0,0 +1,98 @@
+"""Process-pool scoring engine.
+
+TextBlob scoring is pure Python and CPU-bound, so a single worker process
+only ever uses one core. The engine shards large batches across a warm
+``ProcessPoolExecutor`` that is started once per worker process, and scores
+small batches inline where pickling overhead would outweigh the gain.
+Metrics recorded in a worker stay in that worker's registry, so each shard
+returns its phase timings and the engine records them, and the texts
+scored, in the calling process.
+"""
+import math
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+
+from . import metrics, scoring
+
+
+def _warm_up(scorer):
+    """Run in each pool worker so the lexicon is loaded before real work."""
+    scoring.warm_up(scorer)
+    return True
+
+
+def _score_shard(texts, scorer):
+    """Run in a pool worker; return the shard's results and phase timings."""
+    with metrics.recording() as phases:
+        results = scoring.score_many(texts, scorer)
+    return results, phases
+
+
+class ScoringEngine:
+    """Scores batches inline or across a pool of worker processes."""
+
+    def __init__(self, pool_size=None, threshold=None, shards_per_worker=None, scorer=None):
+        self.scorer = scorer or settings.SENTIMENT_SCORER
+        self.pool_size = settings.SENTIMENT_POOL_SIZE if pool_size is None else pool_size
+        self.threshold = settings.SENTIMENT_POOL_THRESHOLD if threshold is None else threshold
+        self.shards_per_worker = shards_per_worker or settings.SENTIMENT_POOL_SHARDS_PER_WORKER
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.pool_size > 1
+
+    def start(self):
+        """Start the pool and load the lexicon in every worker."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._executor is None:
+                executor = ProcessPoolExecutor(max_workers=self.pool_size)
+                for future in [executor.submit(_warm_up, self.scorer) for _ in range(self.pool_size)]:
+                    future.result()
+                self._executor = executor
+        return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def shards(self, texts):
+        """Split texts into contiguous shards, a few per worker."""
+        count = min(len(texts), self.pool_size * self.shards_per_worker)
+        size = math.ceil(len(texts) / count)
+        return [texts[i:i + size] for i in range(0, len(texts), size)]
+
+    def score_many(self, texts):
+        """Score texts in input order, using the pool for large batches."""
+        texts = list(texts)
+        if not self.enabled or len(texts) < self.threshold:
+            return scoring.score_many(texts, self.scorer)
+        executor = self.start()
+        results = []
+        for shard, phases in executor.map(partial(_score_shard, scorer=self.scorer), self.shards(texts)):
+            results.extend(shard)
+            metrics.observe_phases(phases)
+        metrics.TEXTS_SCORED.inc(len(texts), scorer=self.scorer)
+        return results
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Return the process-wide ScoringEngine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ScoringEngine()
+    return _engine
@@ -0,0 +1,189 @@
+"""Vectorized lexicon scorer.
+
+Reimplements TextBlob's PatternAnalyzer rules (modifiers such as "very
+good", negation such as "not good", exclamation boosts and emoticons) as
+array operations. The pattern lexicon is compiled once into a token-id
+dictionary and per-id NumPy arrays; a batch is then tokenized into one flat
+id array and scored with lookups, cumulative maxima and bincount reductions
+instead of a per-token Python state machine.
+
+Scores match the TextBlob backend within ``TOLERANCE`` on ordinary review
+text. Known divergences are tokenizer edge cases (abbreviations, ellipses,
+contractions) and the sarcasm marker "(!)".
+"""
+import re
+
+import numpy as np
+
+from . import metrics
+from .scoring import BaseScorer
+
+TOLERANCE = 0.05
+
+NEGATIONS = ('no', 'not', 'never')
+EXCLAMATION = '!'
+BOOST = 1.25
+NEGATED_FACTOR = -0.5
+
+# Reserved ids for tokens missing from the lexicon, split by the length
+# rules PatternAnalyzer uses to decide whether a word breaks a modifier
+# ("really is a good") or a negation ("not a good") chain.
+UNKNOWN_CHAR, UNKNOWN_SHORT, UNKNOWN_LONG = 0, 1, 2
+
+
+class LexiconScorer(BaseScorer):
+    """Scores batches with vectorized lookups into the pattern lexicon."""
+
+    name = 'lexicon'
+
+    def __init__(self):
+        from textblob._text import EMOTICONS
+        from textblob.en import sentiment as pattern_sentiment
+
+        if not len(pattern_sentiment):
+            pattern_sentiment.load()
+
+        words = ['', '', '']
+        polarity, subjectivity, intensity = [0.0] * 3, [0.0] * 3, [1.0] * 3
+        known, modifier = [False] * 3, [False] * 3
+
+        def add(word, p, s, i, is_known=True, is_modifier=False):
+            self.vocab[word] = len(words)
+            words.append(word)
+            polarity.append(p)
+            subjectivity.append(s)
+            intensity.append(i)
+            known.append(is_known)
+            modifier.append(is_modifier)
+
+        self.vocab = {}
+        for word, senses in dict.items(pattern_sentiment):
+            p, s, i = senses[None]
+            add(word, p, s, i, is_modifier='RB' in senses)
+        emoticons = []
+        for (_, p), forms in EMOTICONS.items():
+            for form in forms:
+                form = form.lower()
+                if form not in self.vocab:
+                    add(form, p, 1.0, 1.0)
+                    emoticons.append(form)
+        for word in NEGATIONS + (EXCLAMATION,):
+            if word not in self.vocab:
+                add(word, 0.0, 0.0, 1.0, is_known=False)
+
+        self.polarity = np.array(polarity)
+        self.subjectivity = np.array(subjectivity)
+        self.intensity = np.array(intensity)
+        self.known = np.array(known)
+        self.modifier = np.array(modifier)
+        self.ly_modifier = self.modifier & np.array([word.endswith('ly') for word in words])
+        lengths = np.array([len(word) for word in words])
+        stripped = np.array([len(word.strip("'")) for word in words])
+        lengths[:3] = (1, 2, 3)
+        stripped[:3] = (1, 2, 3)
+        # Words that end a pending modifier / negation when not in the lexicon.
+        self.breaks_modifier = self.known | (lengths > 2)
+        self.breaks_negation = self.known | (stripped > 1)
+        self.negation = np.zeros(len(words), dtype=bool)
+        self.negation[[self.vocab[word] for word in NEGATIONS]] = True
+        self.exclamation_id = self.vocab[EXCLAMATION]
+
+        emoticon_pattern = '|'.join(re.escape(e) for e in sorted(emoticons, key=len, reverse=True))
+        self.token_re = re.compile(r"(?:%s)(?!\w)|\w+(?:[-.&/]\w+)*|\S" % emoticon_pattern)
+
+    def token_id(self, token):
+        token_id = self.vocab.get(token)
+        if token_id is None:
+            length = len(token)
+            return UNKNOWN_LONG if length > 2 else UNKNOWN_SHORT if length == 2 else UNKNOWN_CHAR
+        return token_id
+
+    def tokenize(self, texts):
+        """Return flat token ids and the document index of each token."""
+        vocab_ids = []
+        lengths = []
+        token_id = self.token_id
+        findall = self.token_re.findall
+        for text in texts:
+            ids = [token_id(token) for token in findall(text.lower())]
+            vocab_ids.extend(ids)
+            lengths.append(len(ids))
+        ids = np.array(vocab_ids, dtype=np.int32)
+        docs = np.repeat(np.arange(len(texts), dtype=np.int32), lengths)
+        return ids, docs
+
+    @staticmethod
+    def _previous(mask, docs):
+        """Index of the previous True position in the same document, or -1."""
+        positions = np.arange(len(mask))
+        last = np.maximum.accumulate(np.where(mask, positions, -1))
+        previous = np.empty_like(last)
+        previous[0] = -1
+        previous[1:] = last[:-1]
+        previous[(previous >= 0) & (docs[np.maximum(previous, 0)] != docs)] = -1
+        return previous
+
+    def score_batch(self, texts):
+        with metrics.phase('tokenize'):
+            ids, docs = self.tokenize(texts)
+        with metrics.phase('score'):
+            return self._score(ids, docs, len(texts))
+
+    def _score(self, ids, docs, count):
+        if not len(ids):
+            return [(0.0, 0.0)] * count
+
+        known = self.known[ids]
+        p = self.polarity[ids]
+        s = self.subjectivity[ids]
+
+        # Negation: the nearest preceding word that would have cleared a
+        # pending negation is itself a negation.
+        prev_neg = self._previous(self.breaks_negation[ids], docs)
+        negated = known & (prev_neg >= 0) & self.negation[ids[np.maximum(prev_neg, 0)]]
+
+        # Modifiers: a known word whose nearest preceding non-small word is a
+        # known adverb merges with it ("very good"); the adverb's own
+        # assessment is dropped and its intensity scales the word. Only
+        # "-ly" adverbs reach across a negation ("really not good").
+        negation_word = self.negation[ids] & self.breaks_modifier[ids]
+        prev_mod = self._previous(self.breaks_modifier[ids] & ~negation_word, docs)
+        has_mod = known & (prev_mod >= 0)
+        mod_index = np.maximum(prev_mod, 0)
+        has_mod &= known[mod_index] & self.modifier[ids[mod_index]]
+        crosses_negation = self._previous(negation_word, docs) > prev_mod
+        has_mod &= ~crosses_negation | self.ly_modifier[ids[mod_index]]
+        heads = np.flatnonzero(has_mod)
+        mods = prev_mod[heads]
+
+        mod_intensity = self.intensity[ids[mods]]
+        mod_intensity = np.where(negated[mods], 1.0 / mod_intensity, mod_intensity)
+        p[heads] = np.clip(p[heads] * mod_intensity, -1.0, 1.0)
+        s[heads] = np.clip(s[heads] * mod_intensity, -1.0, 1.0)
+        merged = np.zeros(len(ids), dtype=bool)
+        merged[mods] = True
+
+        # A negation anywhere in a modifier chain negates the whole chunk.
+        chunk_negated = negated.copy()
+        for _ in range(len(heads)):
+            spread = chunk_negated[heads] | chunk_negated[mods]
+            if np.array_equal(spread, chunk_negated[heads]):
+                break
+            chunk_negated[heads] = spread
+
+        # Each "!" boosts the latest assessment, unless that assessment was
+        # later folded into a modifier chunk.
+        bangs = np.flatnonzero(ids == self.exclamation_id)
+        if len(bangs):
+            owner = self._previous(known, docs)[bangs]
+            owner = owner[owner >= 0]
+            owner = owner[~merged[owner]]
+            boosts = np.bincount(owner, minlength=len(ids))
+            p = np.clip(p * BOOST ** boosts, -1.0, 1.0)
+
+        p = np.where(chunk_negated, p * NEGATED_FACTOR, p)
+        assessed = known & ~merged
+        totals = np.maximum(np.bincount(docs[assessed], minlength=count), 1)
+        polarity = np.bincount(docs[assessed], weights=p[assessed], minlength=count) / totals
+        subjectivity = np.bincount(docs[assessed], weights=s[assessed], minlength=count) / totals
+        return list(zip(polarity.tolist(), subjectivity.tolist()))
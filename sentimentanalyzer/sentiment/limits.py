@@ -0,0 +1,79 @@
+"""Admission control for the async scoring views.
+
+At most ``SENTIMENT_MAX_INFLIGHT`` scoring jobs run at once and at most
+``SENTIMENT_MAX_QUEUE`` more wait for a slot. Anything beyond that is
+rejected straight away so load spikes turn into fast 429 responses instead
+of unbounded queueing.
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+
+from . import metrics
+
+
+class Overloaded(Exception):
+    """Raised when every scoring slot is busy and the wait queue is full."""
+
+
+class ConcurrencyLimiter:
+    """Semaphore with a bounded number of waiters."""
+
+    def __init__(self, max_inflight=None, max_queue=None):
+        self.max_inflight = max_inflight or settings.SENTIMENT_MAX_INFLIGHT
+        self.max_queue = settings.SENTIMENT_MAX_QUEUE if max_queue is None else max_queue
+        self.waiting = 0
+        self.inflight = 0
+        self._loop = None
+        self._semaphore = None
+
+    def _get_semaphore(self):
+        # asyncio primitives belong to one event loop; rebuild if it changed.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_inflight)
+            self.waiting = 0
+            self.inflight = 0
+        return self._semaphore
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a scoring slot for the duration of the block."""
+        semaphore = self._get_semaphore()
+        if semaphore.locked() and self.waiting >= self.max_queue:
+            metrics.REJECTED.inc()
+            raise Overloaded()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.inflight += 1
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            semaphore.release()
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Return the process-wide ConcurrencyLimiter, creating it on first use."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = ConcurrencyLimiter()
+    return _limiter
+
+
+metrics.REGISTRY.register(metrics.FunctionMetric(
+    'sentiment_async_jobs', 'Async scoring jobs running or waiting for a slot.',
+    lambda: {('running',): get_limiter().inflight, ('waiting',): get_limiter().waiting}, ('state',),
+))
@@ -0,0 +1,196 @@
+"""Score a CSV, NDJSON or plain-text file offline.
+
+Input is streamed through a generator pipeline (read -> chunk -> score ->
+write), so memory stays flat whatever the file size. Results are appended
+to the output after every chunk and a checkpoint records how far the run
+got, so an interrupted run can pick up where it stopped with ``--resume``.
+
+With ``--store``, each chunk's rows are inserted and the checkpoint is
+replaced inside one transaction, so a resumed run never inserts a chunk
+twice. The one remaining window is a crash after the checkpoint file has
+been replaced but before the transaction commits: that chunk stays in the
+output file but its rows are missing from the database.
+"""
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from sentiment import batch, scoring
+
+FORMATS = ('csv', 'ndjson', 'txt')
+CSV_COLUMNS = ('index', 'id', 'polarity', 'subjectivity', 'label', 'error')
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.ndjson', '.jsonl', '.json'):
+        return 'ndjson'
+    return 'txt'
+
+
+def read_items(path, fmt, field, id_field):
+    """Yield items from the input file one row at a time."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            if reader.fieldnames is None or field not in reader.fieldnames:
+                raise CommandError(f'CSV input has no "{field}" column.')
+            for index, row in enumerate(reader):
+                yield batch.make_item(index, row, field, id_field)
+        elif fmt == 'ndjson':
+            yield from batch.iter_ndjson(f, field, id_field)
+        else:
+            for index, line in enumerate(f):
+                yield {'index': index, 'text': line.rstrip('\r\n')}
+
+
+def score_chunks(chunks, scorer, workers):
+    """Yield (chunk, scores) pairs in input order.
+
+    With several workers, chunks are scored in a process pool with at most
+    two chunks per worker in flight, which keeps memory bounded.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield chunk, scoring.score_many(batch.item_texts(chunk), scorer)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(scoring.score_many, batch.item_texts(chunk), scorer)))
+            if len(pending) >= workers * 2:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+
+class NdjsonWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, results):
+        self.f.write(batch.render(results))
+
+
+class CsvWriter:
+    def __init__(self, f):
+        self.writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+        if f.tell() == 0:
+            self.writer.writeheader()
+
+    def write(self, results):
+        self.writer.writerows(results)
+
+
+class Command(BaseCommand):
+    help = 'Score a CSV, NDJSON or text file in chunks, writing results incrementally.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='File to score.')
+        parser.add_argument('-o', '--output',
+                            help='Output file; .csv writes CSV, anything else NDJSON. '
+                                 'Defaults to <input>.scores.ndjson.')
+        parser.add_argument('--format', choices=FORMATS, help='Input format (default: from the extension).')
+        parser.add_argument('--field', default='text', help='CSV column or JSON field holding the text.')
+        parser.add_argument('--id-field', default='id', help='CSV column or JSON field copied to the output.')
+        parser.add_argument('--chunk-size', type=int, default=settings.SENTIMENT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=1, help='Scoring processes (default: 1, inline).')
+        parser.add_argument('--scorer', default=settings.SENTIMENT_SCORER, choices=sorted(scoring.SCORERS))
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <output>.checkpoint).')
+        parser.add_argument('--resume', action='store_true', help='Continue from the checkpoint if there is one.')
+        parser.add_argument('--store', action='store_true', help='Also save results as SentimentResult rows.')
+        parser.add_argument('--progress-every', type=float, default=5.0,
+                            help='Seconds between progress reports (default: 5).')
+
+    def handle(self, *args, **options):
+        path = options['input']
+        if not os.path.isfile(path):
+            raise CommandError(f'No such file: {path}')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        fmt = options['format'] or detect_format(path)
+        output = options['output'] or f'{path}.scores.ndjson'
+        checkpoint_path = options['checkpoint'] or f'{output}.checkpoint'
+        scorer = options['scorer']
+
+        skip = 0
+        if options['resume']:
+            checkpoint = self.load_checkpoint(checkpoint_path, path, output)
+            if checkpoint:
+                skip = checkpoint['rows']
+                with open(output, 'r+b') as f:
+                    f.truncate(checkpoint['output_bytes'])
+                self.stderr.write(f'Resuming after {skip:,} rows.')
+
+        items = islice(read_items(path, fmt, options['field'], options['id_field']), skip, None)
+        chunks = batch.chunked(items, options['chunk_size'])
+
+        done = skip
+        scored = 0
+        started = last_report = time.monotonic()
+        with open(output, 'a' if skip else 'w', newline='', encoding='utf-8') as f:
+            writer = CsvWriter(f) if output.lower().endswith('.csv') else NdjsonWriter(f)
+            for chunk, scores in score_chunks(chunks, scorer, options['workers']):
+                results = batch.merge_results(chunk, scores)
+                writer.write(results)
+                f.flush()
+                done += len(chunk)
+                scored += len(chunk)
+                if options['store']:
+                    with transaction.atomic():
+                        batch.save_chunk(chunk, results, scorer)
+                        self.save_checkpoint(checkpoint_path, path, output, done, f.tell())
+                else:
+                    self.save_checkpoint(checkpoint_path, path, output, done, f.tell())
+
+                now = time.monotonic()
+                if now - last_report >= options['progress_every']:
+                    last_report = now
+                    self.stderr.write(f'{done:,} rows, {scored / (now - started):,.0f} rows/sec')
+
+        elapsed = time.monotonic() - started
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        rate = scored / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f'Scored {scored:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/sec); {done:,} total in {output}'
+        ))
+
+    def load_checkpoint(self, checkpoint_path, path, output):
+        try:
+            with open(checkpoint_path, encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            self.stderr.write('No checkpoint found; starting from the beginning.')
+            return None
+        except ValueError:
+            raise CommandError(f'Checkpoint {checkpoint_path} is not valid JSON.')
+        if checkpoint.get('input') != os.path.abspath(path) or checkpoint.get('output') != os.path.abspath(output):
+            raise CommandError(f'Checkpoint {checkpoint_path} belongs to a different input or output file.')
+        if not os.path.exists(output):
+            raise CommandError(f'Checkpoint exists but output {output} is missing.')
+        return checkpoint
+
+    def save_checkpoint(self, checkpoint_path, path, output, rows, output_bytes):
+        tmp_path = f'{checkpoint_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'input': os.path.abspath(path),
+                'output': os.path.abspath(output),
+                'rows': rows,
+                'output_bytes': output_bytes,
+            }, f)
+        os.replace(tmp_path, checkpoint_path)
@@ -0,0 +1,211 @@
+"""Lightweight in-process metrics rendered in the Prometheus text format.
+
+Counters and histograms are plain Python objects guarded by a lock, cheap
+enough to update on every request. Values are per process; scrape each
+worker, or aggregate in Prometheus. Like ``sentiment.scoring`` this module
+does not depend on Django so the scorers can record phase timings.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def collect(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_labels(self.labelnames, key)} {_number(value)}' for key, value in items]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def collect(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, [("le", _number(bound))])} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {count}')
+        return lines
+
+
+class FunctionMetric(Metric):
+    """Metric whose samples are read from a callback at scrape time.
+
+    The callback returns a number, or a dict mapping label-value tuples to
+    numbers when the metric has labels. Used to export state that is
+    already tracked elsewhere, such as the result cache counters.
+    """
+
+    def __init__(self, name, documentation, function, labelnames=(), kind='gauge'):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+        self.kind = kind
+
+    def collect(self):
+        samples = self.function()
+        if not isinstance(samples, dict):
+            samples = {(): samples}
+        return [f'{self.name}{_labels(self.labelnames, key)} {_number(value)}' for key, value in sorted(samples.items())]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric {metric.name} is already registered.')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(Counter(
+    'sentiment_requests_total', 'HTTP requests handled, by view, method and status.',
+    ('view', 'method', 'status'),
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'sentiment_request_duration_seconds', 'HTTP request latency, by view.', ('view', 'method'),
+))
+PHASE_SECONDS = REGISTRY.register(Histogram(
+    'sentiment_phase_duration_seconds',
+    'Time spent in each phase: tokenize, score, cache, persist, serialize, render.', ('phase',),
+))
+TEXTS_SCORED = REGISTRY.register(Counter(
+    'sentiment_texts_scored_total', 'Texts scored by a backend (cache misses only).', ('scorer',),
+))
+REJECTED = REGISTRY.register(Counter(
+    'sentiment_rejected_requests_total', 'Async scoring requests rejected with 429.',
+))
+PROFILES = REGISTRY.register(Counter(
+    'sentiment_profiles_written_total', 'cProfile dumps written for slow requests.',
+))
+
+
+_recording = threading.local()
+
+
+@contextmanager
+def phase(name):
+    """Time the enclosed block into the phase duration histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        PHASE_SECONDS.observe(seconds, phase=name)
+        phases = getattr(_recording, 'phases', None)
+        if phases is not None:
+            phases.append((name, seconds))
+
+
+@contextmanager
+def recording():
+    """Collect the phase timings of the enclosed block as (phase, seconds) pairs.
+
+    Pool workers return the list so the parent process, whose registry is
+    the one scraped, can replay the timings with ``observe_phases``.
+    """
+    previous = getattr(_recording, 'phases', None)
+    _recording.phases = phases = []
+    try:
+        yield phases
+    finally:
+        _recording.phases = previous
+
+
+def observe_phases(phases):
+    """Record (phase, seconds) pairs collected by ``recording`` elsewhere."""
+    for name, seconds in phases:
+        PHASE_SECONDS.observe(seconds, phase=name)
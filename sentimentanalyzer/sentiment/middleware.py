@@ -0,0 +1,112 @@
+"""Request timing middleware.
+
+Records a latency histogram and a request counter per view for every
+request, and optionally profiles a sample of requests with cProfile,
+keeping the dump only when the request turned out slower than
+``SENTIMENT_PROFILE_THRESHOLD_MS``.
+"""
+import cProfile
+import os
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+# Only one cProfile profiler can be active per process on recent Pythons.
+_profile_lock = threading.Lock()
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.url_name or match.view_name or 'unnamed'
+
+
+def _record(request, response, elapsed):
+    view = _view_name(request)
+    status = response.status_code if response is not None else 500
+    metrics.REQUEST_SECONDS.observe(elapsed, view=view, method=request.method)
+    metrics.REQUESTS.inc(view=view, method=request.method, status=status)
+    return view
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        profiler = self._start_profiler()
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self.get_response(request)
+        finally:
+            # Streaming bodies are produced after the view returns, so time
+            # them once the last chunk has been sent.
+            if response is None or not response.streaming:
+                self._finish(request, response, start, profiler)
+        if response.streaming:
+            response.streaming_content = self._timed_stream(
+                request, response, response.streaming_content, start, profiler)
+        return response
+
+    def _timed_stream(self, request, response, content, start, profiler):
+        try:
+            yield from content
+        finally:
+            self._finish(request, response, start, profiler)
+
+    def _finish(self, request, response, start, profiler):
+        elapsed = time.perf_counter() - start
+        view = _record(request, response, elapsed)
+        if profiler is not None:
+            self._finish_profiler(profiler, view, elapsed)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await self.get_response(request)
+            return response
+        finally:
+            _record(request, response, time.perf_counter() - start)
+
+    def _start_profiler(self):
+        rate = settings.SENTIMENT_PROFILE_SAMPLE_RATE
+        if rate <= 0 or random.random() >= rate:
+            return None
+        if not _profile_lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler is already active
+            _profile_lock.release()
+            return None
+        return profiler
+
+    def _finish_profiler(self, profiler, view, elapsed):
+        try:
+            profiler.disable()
+            if elapsed * 1000 >= settings.SENTIMENT_PROFILE_THRESHOLD_MS:
+                directory = settings.SENTIMENT_PROFILE_DIR
+                os.makedirs(directory, exist_ok=True)
+                filename = f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{view}-{int(elapsed * 1000)}ms.prof'
+                profiler.dump_stats(os.path.join(directory, filename))
+                metrics.PROFILES.inc()
+        finally:
+            _profile_lock.release()
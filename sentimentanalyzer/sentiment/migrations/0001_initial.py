@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentimentResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text_hash', models.CharField(max_length=64)),
+                ('polarity', models.FloatField()),
+                ('subjectivity', models.FloatField()),
+                ('label', models.CharField(choices=[('positive', 'Positive'), ('negative', 'Negative'), ('neutral', 'Neutral')], max_length=8)),
+                ('scorer', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['text_hash'], name='sentiment_text_hash_idx'), models.Index(fields=['created_at'], name='sentiment_created_idx'), models.Index(fields=['label', 'created_at'], name='sentiment_label_created_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,79 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Avg, Count
+from django.db.models.functions import Trunc
+from django.utils import timezone
 
-# Create your models here.
+BUCKETS = ('minute', 'hour', 'day', 'week', 'month')
+
+
+class SentimentResultQuerySet(models.QuerySet):
+    def between(self, since=None, until=None):
+        queryset = self
+        if since is not None:
+            queryset = queryset.filter(created_at__gte=since)
+        if until is not None:
+            queryset = queryset.filter(created_at__lt=until)
+        return queryset
+
+    def bucketed(self, bucket):
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket {bucket!r}; choose from {', '.join(BUCKETS)}.")
+        return self.annotate(bucket=Trunc('created_at', bucket)).order_by('bucket')
+
+    def label_counts(self, bucket):
+        """Rows of bucket, label and count, aggregated in the database."""
+        return self.bucketed(bucket).values('bucket', 'label').annotate(count=Count('id')).order_by('bucket', 'label')
+
+    def mean_polarity(self, bucket):
+        """Rows of bucket, mean polarity/subjectivity and count per bucket."""
+        return self.bucketed(bucket).values('bucket').annotate(
+            mean_polarity=Avg('polarity'),
+            mean_subjectivity=Avg('subjectivity'),
+            count=Count('id'),
+        )
+
+
+class SentimentResultManager(models.Manager.from_queryset(SentimentResultQuerySet)):
+    def record(self, text_hashes, results, scorer, batch_size=None):
+        """Insert scored results in one transaction using bulk_create."""
+        now = timezone.now()
+        objs = [
+            self.model(
+                text_hash=text_hash,
+                polarity=result['polarity'],
+                subjectivity=result['subjectivity'],
+                label=result['label'],
+                scorer=scorer,
+                created_at=now,
+            )
+            for text_hash, result in zip(text_hashes, results)
+        ]
+        with transaction.atomic(using=self.db):
+            return self.bulk_create(objs, batch_size=batch_size)
+
+
+class SentimentResult(models.Model):
+    LABEL_CHOICES = [
+        ('positive', 'Positive'),
+        ('negative', 'Negative'),
+        ('neutral', 'Neutral'),
+    ]
+
+    text_hash = models.CharField(max_length=64)
+    polarity = models.FloatField()
+    subjectivity = models.FloatField()
+    label = models.CharField(max_length=8, choices=LABEL_CHOICES)
+    scorer = models.CharField(max_length=20)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = SentimentResultManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['text_hash'], name='sentiment_text_hash_idx'),
+            models.Index(fields=['created_at'], name='sentiment_created_idx'),
+            models.Index(fields=['label', 'created_at'], name='sentiment_label_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.label} ({self.polarity:+.2f}) {self.text_hash[:12]}'
@@ -0,0 +1,108 @@
+"""Sentiment scoring helpers shared by the HTML and API views.
+
+Scores come from a pluggable scorer backend. ``textblob`` runs TextBlob's
+PatternAnalyzer text by text; ``lexicon`` scores whole batches with
+vectorized lookups into the same lexicon (see ``sentiment.lexicon``). This
+module does not touch Django settings so pool workers can import it.
+
+TextBlob (and with it NLTK and the pattern lexicon) is imported on first use
+rather than at module load, so worker processes boot quickly; call
+``warm_up()`` to pay that cost before serving traffic instead.
+"""
+import threading
+
+from . import metrics
+
+DEFAULT_SCORER = 'textblob'
+
+LABELS = {
+    'positive': "Positive 😊",
+    'negative': "Negative 😟",
+    'neutral': "Neutral 😐",
+}
+
+
+class BaseScorer:
+    """Interface for scorer backends."""
+
+    name = None
+
+    def score_batch(self, texts):
+        """Return a (polarity, subjectivity) tuple for each text, in order."""
+        raise NotImplementedError
+
+
+class TextBlobScorer(BaseScorer):
+    """Scores each text with TextBlob's default PatternAnalyzer."""
+
+    name = 'textblob'
+
+    def __init__(self):
+        from textblob.en import sentiment as pattern_sentiment
+        self._sentiment = pattern_sentiment
+
+    def score_batch(self, texts):
+        # Same steps as TextBlob(text).sentiment, split so tokenizing and
+        # scoring can be timed separately.
+        pattern_sentiment = self._sentiment
+        tokenizer = pattern_sentiment.tokenizer
+        with metrics.phase('tokenize'):
+            tokens = [[word.lower() for word in ' '.join(tokenizer(text)).split()] for text in texts]
+        with metrics.phase('score'):
+            return [tuple(pattern_sentiment(words))[:2] for words in tokens]
+
+
+def _lexicon_scorer():
+    from .lexicon import LexiconScorer
+    return LexiconScorer()
+
+
+SCORERS = {
+    'textblob': TextBlobScorer,
+    'lexicon': _lexicon_scorer,
+}
+
+_scorers = {}
+_scorers_lock = threading.Lock()
+
+
+def get_scorer(name=DEFAULT_SCORER):
+    """Return the scorer registered as ``name``, building it on first use."""
+    if name not in _scorers:
+        try:
+            factory = SCORERS[name]
+        except KeyError:
+            raise ValueError(f"Unknown sentiment scorer {name!r}; choose from {sorted(SCORERS)}.")
+        with _scorers_lock:
+            if name not in _scorers:
+                _scorers[name] = factory()
+    return _scorers[name]
+
+
+def warm_up(name=DEFAULT_SCORER):
+    """Import the scorer's dependencies and load its lexicon."""
+    get_scorer(name).score_batch(['warm up'])
+
+
+def label_for(polarity):
+    """Map a polarity score to 'positive', 'negative' or 'neutral'."""
+    if polarity > 0:
+        return 'positive'
+    if polarity < 0:
+        return 'negative'
+    return 'neutral'
+
+
+def score_many(texts, scorer=DEFAULT_SCORER):
+    """Score a sequence of texts, returning results in input order."""
+    texts = list(texts)
+    metrics.TEXTS_SCORED.inc(len(texts), scorer=scorer)
+    return [
+        {'polarity': polarity, 'subjectivity': subjectivity, 'label': label_for(polarity)}
+        for polarity, subjectivity in get_scorer(scorer).score_batch(texts)
+    ]
+
+
+def score_text(text, scorer=DEFAULT_SCORER):
+    """Score a single text and return polarity, subjectivity and label."""
+    return score_many([text], scorer)[0]
@@ -1,3 +1,506 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from datetime import datetime, timezone
+
+from django.apps import apps
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+
+from . import cache, limits, metrics
+from .management.commands.score_file import Command
+from .engine import ScoringEngine
+from .lexicon import TOLERANCE
+from .models import SentimentResult
+from .scoring import get_scorer, label_for, score_many, score_text
+
+
+def ndjson(response):
+    body = b''.join(response.streaming_content).decode()
+    return [json.loads(line) for line in body.splitlines()]
+
+
+class ScoreApiTests(TestCase):
+    def setUp(self):
+        cache.get_result_cache().clear()
+
+    def test_json_array_is_scored_in_order(self):
+        texts = ['I love this great movie', 'This is terrible and awful', 'The sky']
+        response = self.client.post(reverse('api_score'), json.dumps(texts), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        results = ndjson(response)
+        self.assertEqual([r['index'] for r in results], [0, 1, 2])
+        self.assertEqual([r['label'] for r in results], ['positive', 'negative', 'neutral'])
+        for text, result in zip(texts, results):
+            expected = score_text(text)
+            self.assertAlmostEqual(result['polarity'], expected['polarity'])
+            self.assertAlmostEqual(result['subjectivity'], expected['subjectivity'])
+
+    def test_ndjson_body_keeps_ids_and_reports_bad_lines(self):
+        body = '\n'.join([
+            json.dumps({'id': 'a', 'text': 'What a wonderful day'}),
+            'not json',
+            json.dumps(42),
+            json.dumps('Bad service'),
+        ])
+        response = self.client.post(reverse('api_score'), body, content_type='application/x-ndjson')
+
+        results = ndjson(response)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0]['id'], 'a')
+        self.assertEqual(results[0]['label'], 'positive')
+        self.assertIn('error', results[1])
+        self.assertIn('error', results[2])
+        self.assertEqual(results[3]['label'], 'negative')
+
+    def test_large_batch_spans_several_chunks(self):
+        texts = ['good'] * 1200
+        with self.settings(SENTIMENT_BATCH_SIZE=100):
+            response = self.client.post(reverse('api_score'), json.dumps(texts), content_type='application/json')
+
+        results = ndjson(response)
+        self.assertEqual(len(results), 1200)
+        self.assertEqual(results[-1]['index'], 1199)
+
+    def test_rejects_non_array_body(self):
+        response = self.client.post(reverse('api_score'), '{"text": "hi"}', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_get(self):
+        self.assertEqual(self.client.get(reverse('api_score')).status_code, 405)
+
+
+class AsyncScoreApiTests(TestCase):
+    def setUp(self):
+        cache.get_result_cache().clear()
+
+    async def test_scores_batch(self):
+        response = await self.async_client.post(
+            reverse('api_score_async'), json.dumps(['Great job', 'Awful']), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        results = [json.loads(line) for line in response.content.decode().splitlines()]
+        self.assertEqual([r['label'] for r in results], ['positive', 'negative'])
+
+    async def test_rejects_bad_body(self):
+        response = await self.async_client.post(reverse('api_score_async'), '{', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    async def test_returns_429_when_queue_is_full(self):
+        limiter = limits.ConcurrencyLimiter(max_inflight=1, max_queue=0)
+        with mock.patch('sentiment.limits.get_limiter', return_value=limiter), \
+                self.settings(SENTIMENT_RETRY_AFTER=3):
+            async with limiter.slot():
+                response = await self.async_client.post(
+                    reverse('api_score_async'), json.dumps(['ok']), content_type='application/json')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '3')
+
+
+class ConcurrencyLimiterTests(TestCase):
+    async def test_waiters_are_bounded(self):
+        limiter = limits.ConcurrencyLimiter(max_inflight=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot():
+                await release.wait()
+
+        first = asyncio.create_task(hold())
+        second = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        self.assertEqual((limiter.inflight, limiter.waiting), (1, 1))
+        with self.assertRaises(limits.Overloaded):
+            async with limiter.slot():
+                pass
+        release.set()
+        await asyncio.gather(first, second)
+        self.assertEqual((limiter.inflight, limiter.waiting), (0, 0))
+
+
+class SentimentResultTests(TestCase):
+    def setUp(self):
+        cache.get_result_cache().clear()
+
+    def make(self, label, polarity, when):
+        return SentimentResult(text_hash='x' * 64, polarity=polarity, subjectivity=0.5,
+                               label=label, scorer='textblob', created_at=when)
+
+    def test_api_stores_results_in_bulk(self):
+        texts = ['good', 'bad', 'fine', 'good']
+        with self.assertNumQueries(3):  # savepoint, one INSERT, release
+            ndjson(self.client.post(reverse('api_score'), json.dumps(texts), content_type='application/json'))
+
+        self.assertEqual(SentimentResult.objects.count(), 4)
+        self.assertEqual(SentimentResult.objects.filter(text_hash=cache.text_hash('good')).count(), 2)
+
+    def test_errors_are_not_stored(self):
+        ndjson(self.client.post(reverse('api_score'), json.dumps(['good', 7]), content_type='application/json'))
+        self.assertEqual(SentimentResult.objects.count(), 1)
+
+    def test_storage_can_be_disabled(self):
+        with self.settings(SENTIMENT_STORE_RESULTS=False):
+            ndjson(self.client.post(reverse('api_score'), json.dumps(['good']), content_type='application/json'))
+        self.assertFalse(SentimentResult.objects.exists())
+
+    def test_label_and_polarity_stats(self):
+        day1 = datetime(2025, 1, 1, 10, tzinfo=timezone.utc)
+        day2 = datetime(2025, 1, 2, 10, tzinfo=timezone.utc)
+        SentimentResult.objects.bulk_create([
+            self.make('positive', 0.5, day1),
+            self.make('positive', 0.3, day1),
+            self.make('negative', -0.2, day1),
+            self.make('neutral', 0.0, day2),
+        ])
+
+        labels = self.client.get(reverse('label_stats'), {'bucket': 'day'}).json()['results']
+        self.assertEqual(labels, [
+            {'bucket': '2025-01-01T00:00:00+00:00', 'positive': 2, 'negative': 1, 'neutral': 0},
+            {'bucket': '2025-01-02T00:00:00+00:00', 'positive': 0, 'negative': 0, 'neutral': 1},
+        ])
+
+        polarity = self.client.get(reverse('polarity_stats'), {'since': '2025-01-01T00:00:00Z', 'until': '2025-01-02T00:00:00Z'}).json()['results']
+        self.assertEqual(len(polarity), 1)
+        self.assertAlmostEqual(polarity[0]['mean_polarity'], 0.2)
+        self.assertEqual(polarity[0]['count'], 3)
+
+    def test_stats_reject_bad_parameters(self):
+        self.assertEqual(self.client.get(reverse('label_stats'), {'bucket': 'year'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('polarity_stats'), {'since': 'yesterday'}).status_code, 400)
+
+
+class ScoreFileCommandTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def write_csv(self, rows):
+        path = self.path('reviews.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['id', 'review'])
+            writer.writerows(rows)
+        return path
+
+    def read_ndjson(self, path):
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def run_command(self, *args):
+        call_command('score_file', *args, stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_scores_csv_in_chunks(self):
+        rows = [(f'r{i}', text) for i, text in enumerate(['great', 'awful', 'a chair'] * 10)]
+        path = self.write_csv(rows)
+        output = self.path('out.ndjson')
+
+        self.run_command(path, '-o', output, '--field', 'review', '--chunk-size', '7')
+
+        results = self.read_ndjson(output)
+        self.assertEqual([r['index'] for r in results], list(range(30)))
+        self.assertEqual(results[1]['id'], 'r1')
+        self.assertEqual([r['label'] for r in results[:3]], ['positive', 'negative', 'neutral'])
+        self.assertFalse(os.path.exists(output + '.checkpoint'))
+
+    def test_ndjson_input_to_csv_output_with_workers(self):
+        path = self.path('reviews.ndjson')
+        with open(path, 'w', encoding='utf-8') as f:
+            for text in ['nice', 'bad'] * 20:
+                f.write(json.dumps({'text': text}) + '\n')
+        output = self.path('out.csv')
+
+        self.run_command(path, '-o', output, '--chunk-size', '5', '--workers', '2')
+
+        with open(output, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 40)
+        self.assertEqual([row['label'] for row in rows[:2]], ['positive', 'negative'])
+
+    def test_resume_after_interruption(self):
+        rows = [(f'r{i}', f'good review number {i}') for i in range(25)]
+        path = self.write_csv(rows)
+        output = self.path('out.ndjson')
+        real_score_many = score_many
+        calls = []
+
+        def flaky(texts, scorer):
+            calls.append(len(texts))
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return real_score_many(texts, scorer)
+
+        with mock.patch('sentiment.scoring.score_many', side_effect=flaky):
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_command(path, '-o', output, '--field', 'review', '--chunk-size', '10')
+        self.assertEqual(len(self.read_ndjson(output)), 20)
+
+        self.run_command(path, '-o', output, '--field', 'review', '--chunk-size', '10', '--resume')
+
+        results = self.read_ndjson(output)
+        self.assertEqual([r['index'] for r in results], list(range(25)))
+        self.assertEqual(results[-1]['id'], 'r24')
+
+    def test_store_saves_rows(self):
+        path = self.write_csv([('a', 'lovely'), ('b', 'dreadful')])
+        self.run_command(path, '-o', self.path('out.ndjson'), '--field', 'review', '--store')
+        self.assertEqual(SentimentResult.objects.count(), 2)
+
+    def test_resume_with_store_does_not_duplicate_rows(self):
+        path = self.write_csv([(f'r{i}', f'good review number {i}') for i in range(25)])
+        output = self.path('out.ndjson')
+        real_save_checkpoint = Command.save_checkpoint
+        calls = []
+
+        def interrupted(command, *args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            return real_save_checkpoint(command, *args)
+
+        with mock.patch.object(Command, 'save_checkpoint', interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_command(path, '-o', output, '--field', 'review', '--chunk-size', '10', '--store')
+        self.assertEqual(SentimentResult.objects.count(), 10)
+
+        self.run_command(path, '-o', output, '--field', 'review', '--chunk-size', '10', '--store', '--resume')
+
+        self.assertEqual(len(self.read_ndjson(output)), 25)
+        self.assertEqual(SentimentResult.objects.count(), 25)
+
+
+class ResultViewTests(TestCase):
+    def test_result_renders_label(self):
+        response = self.client.post(reverse('result'), {'text': 'I love this great movie'})
+        self.assertContains(response, 'Positive')
+
+
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        cache.get_result_cache().clear()
+
+    def test_hot_inputs_skip_textblob(self):
+        cache.score_many(['Great food', 'Awful food'])
+        with mock.patch('sentiment.scoring.score_many') as scorer:
+            results = cache.score_many(['Great   food', 'Awful food'])
+        scorer.assert_not_called()
+        self.assertEqual([r['label'] for r in results], ['positive', 'negative'])
+        stats = cache.get_result_cache().stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 2))
+
+    def test_duplicate_misses_are_scored_once(self):
+        with mock.patch('sentiment.scoring.score_many', wraps=lambda texts, scorer: [
+                {'polarity': 0.0, 'subjectivity': 0.0, 'label': 'neutral'} for _ in texts]) as scorer:
+            cache.score_many(['same', 'same', ' same '])
+        scorer.assert_called_once_with(['same'], 'textblob')
+
+    def test_lru_eviction(self):
+        result_cache = cache.ResultCache(max_entries=2)
+        result_cache.set_many({'a': 1, 'b': 2})
+        result_cache.get_many(['a'])
+        result_cache.set_many({'c': 3})
+
+        self.assertEqual(result_cache.get_many(['a', 'b', 'c']), [1, None, 3])
+        stats = result_cache.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['size'], 2)
+        result_cache.clear()
+
+    def test_backend_hits_are_bounded_by_the_lru(self):
+        result_cache = cache.ResultCache(max_entries=2)
+        self.addCleanup(result_cache.clear)
+        result_cache.set_many({'a': 1, 'b': 2})
+        result_cache.backend.set('c', 3)
+
+        self.assertEqual(result_cache.get_many(['c']), [3])
+
+        stats = result_cache.stats()
+        self.assertEqual((stats['size'], stats['evictions']), (2, 1))
+        self.assertEqual(result_cache.get_many(['a', 'b', 'c']), [None, 2, 3])
+
+    def test_stats_endpoint(self):
+        cache.score_many(['nice', 'nice'])
+        response = self.client.get(reverse('cache_stats'))
+        self.assertEqual(response.json()['misses'], 2)
+
+
+class ScoringEngineTests(TestCase):
+    texts = ['I love it', 'I hate it', 'It is a table', 'Pretty good', 'Very bad'] * 40
+
+    def test_small_batches_are_scored_inline(self):
+        engine = ScoringEngine(pool_size=4, threshold=1000)
+        with mock.patch.object(engine, 'start') as start:
+            engine.score_many(self.texts)
+        start.assert_not_called()
+
+    def test_pool_matches_inline_scoring(self):
+        engine = ScoringEngine(pool_size=2, threshold=10, shards_per_worker=3)
+        try:
+            self.assertEqual(engine.score_many(self.texts), score_many(self.texts))
+        finally:
+            engine.shutdown()
+
+    def test_pool_metrics_reach_the_parent(self):
+        engine = ScoringEngine(pool_size=2, threshold=1)
+        scored_before = metrics.TEXTS_SCORED.value(scorer=engine.scorer)
+        tokenize_before = metrics.PHASE_SECONDS.count(phase='tokenize')
+        score_before = metrics.PHASE_SECONDS.count(phase='score')
+        shards = len(engine.shards(self.texts))
+        try:
+            engine.score_many(self.texts)
+        finally:
+            engine.shutdown()
+        self.assertEqual(metrics.TEXTS_SCORED.value(scorer=engine.scorer), scored_before + len(self.texts))
+        self.assertEqual(metrics.PHASE_SECONDS.count(phase='tokenize'), tokenize_before + shards)
+        self.assertEqual(metrics.PHASE_SECONDS.count(phase='score'), score_before + shards)
+
+    def test_shards_cover_input_in_order(self):
+        engine = ScoringEngine(pool_size=3, threshold=1, shards_per_worker=2)
+        shards = engine.shards(list(range(20)))
+        self.assertEqual(len(shards), 5)
+        self.assertEqual(sum(shards, []), list(range(20)))
+
+
+class LexiconParityTests(TestCase):
+    """The vectorized lexicon backend must agree with TextBlob."""
+
+    texts = [
+        'The food was absolutely amazing and the staff were friendly.',
+        'Terrible service, cold food, never coming back!',
+        'It was okay, nothing special.',
+        'The movie is not bad at all',
+        'What a wonderful, beautiful day!!!',
+        'The product broke after two days. Very disappointing.',
+        'I am extremely happy with this purchase',
+        'Worst experience ever :(',
+        'Not the best, not the worst.',
+        'The hotel room was clean but small',
+        'Highly recommended!',
+        'Meh.',
+        'The plot was predictable and boring, but the acting was great.',
+        'This is the best phone I have ever owned.',
+        'Absolutely horrible customer support',
+        'pretty good value for money',
+        "I'm not sure how I feel about this",
+        'so so sad',
+        'Incredibly fast shipping, really pleased',
+        'not a very good movie',
+        'really not good',
+        'very not good',
+        'really is a good day',
+        'not really good',
+        'very very good!!',
+        'Good! really bad',
+        "He's not a bad guy :)",
+        'no good',
+        'Not bad... not bad at all!',
+        '',
+        'The table is brown.',
+    ]
+
+    def test_scores_within_tolerance(self):
+        expected = get_scorer('textblob').score_batch(self.texts)
+        actual = get_scorer('lexicon').score_batch(self.texts)
+        for text, (p1, s1), (p2, s2) in zip(self.texts, expected, actual):
+            with self.subTest(text=text):
+                self.assertAlmostEqual(p1, p2, delta=TOLERANCE)
+                self.assertAlmostEqual(s1, s2, delta=TOLERANCE)
+
+    def test_labels_match(self):
+        expected = [r['label'] for r in score_many(self.texts, 'textblob')]
+        actual = [r['label'] for r in score_many(self.texts, 'lexicon')]
+        self.assertEqual(actual, expected)
+
+    def test_batch_results_do_not_depend_on_neighbours(self):
+        batch = get_scorer('lexicon').score_batch(self.texts)
+        single = [get_scorer('lexicon').score_batch([text])[0] for text in self.texts]
+        self.assertEqual(batch, single)
+
+    def test_unknown_scorer(self):
+        with self.assertRaises(ValueError):
+            get_scorer('nope')
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.get_result_cache().clear()
+
+    def test_registry_renders_prometheus_text(self):
+        registry = metrics.Registry()
+        counter = registry.register(metrics.Counter('demo_total', 'Demo counter.', ('kind',)))
+        histogram = registry.register(metrics.Histogram('demo_seconds', 'Demo histogram.', buckets=(0.1, 1.0)))
+        counter.inc(kind='a "quoted"')
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+
+        text = registry.render()
+        self.assertIn('# TYPE demo_total counter', text)
+        self.assertIn('demo_total{kind="a \\"quoted\\""} 1', text)
+        self.assertIn('demo_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('demo_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn('demo_seconds_count 2', text)
+
+    def test_requests_and_phases_are_recorded(self):
+        requests_before = metrics.REQUESTS.value(view='result', method='POST', status=200)
+        render_before = metrics.PHASE_SECONDS.count(phase='render')
+        score_before = metrics.PHASE_SECONDS.count(phase='score')
+
+        self.client.post(reverse('result'), {'text': 'Lovely weather'})
+
+        self.assertEqual(metrics.REQUESTS.value(view='result', method='POST', status=200), requests_before + 1)
+        self.assertEqual(metrics.PHASE_SECONDS.count(phase='render'), render_before + 1)
+        self.assertEqual(metrics.PHASE_SECONDS.count(phase='score'), score_before + 1)
+
+    def test_streaming_requests_are_timed_after_the_body(self):
+        before = metrics.REQUEST_SECONDS.count(view='api_score', method='POST')
+        response = self.client.post(reverse('api_score'), json.dumps(['good']), content_type='application/json')
+        self.assertEqual(metrics.REQUEST_SECONDS.count(view='api_score', method='POST'), before)
+        ndjson(response)
+        self.assertEqual(metrics.REQUEST_SECONDS.count(view='api_score', method='POST'), before + 1)
+
+    def test_metrics_endpoint(self):
+        cache.score_many(['fine'])
+        response = self.client.get(reverse('metrics'))
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('sentiment_cache_events_total{event="miss"} 1', body)
+        self.assertIn('sentiment_phase_duration_seconds_bucket', body)
+
+    def test_slow_requests_are_profiled(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(SENTIMENT_PROFILE_SAMPLE_RATE=1.0, SENTIMENT_PROFILE_THRESHOLD_MS=0,
+                               SENTIMENT_PROFILE_DIR=directory):
+                self.client.get(reverse('home'))
+            dumps = os.listdir(directory)
+        self.assertEqual(len(dumps), 1)
+        self.assertTrue(dumps[0].endswith('.prof'))
+
+
+class WarmUpTests(TestCase):
+    def test_ready_warms_up_only_when_enabled(self):
+        config = apps.get_app_config('sentiment')
+        with mock.patch('sentiment.scoring.warm_up') as warm_up:
+            with self.settings(SENTIMENT_WARMUP=False):
+                config.ready()
+            warm_up.assert_not_called()
+            with self.settings(SENTIMENT_WARMUP=True, SENTIMENT_SCORER='lexicon'):
+                config.ready()
+            warm_up.assert_called_once_with('lexicon')
+
 
-# Create your tests here.
+class LabelTests(TestCase):
+    def test_label_for(self):
+        self.assertEqual(label_for(0.1), 'positive')
+        self.assertEqual(label_for(-0.1), 'negative')
+        self.assertEqual(label_for(0), 'neutral')
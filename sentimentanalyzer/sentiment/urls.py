@@ -4,4 +4,10 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'), 
     path('result/', views.result, name='result'),
+    path('api/score/', views.api_score, name='api_score'),
+    path('api/score/async/', views.api_score_async, name='api_score_async'),
+    path('api/cache/stats/', views.cache_stats, name='cache_stats'),
+    path('api/stats/labels/', views.label_stats, name='label_stats'),
+    path('api/stats/polarity/', views.polarity_stats, name='polarity_stats'),
+    path('metrics', views.metrics_view, name='metrics'),
 ]
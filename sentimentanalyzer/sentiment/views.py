@@ -1,5 +1,15 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
-from textblob import TextBlob
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from . import batch, limits, metrics
+from .cache import get_result_cache, score_text
+from .models import BUCKETS, SentimentResult
+from .scoring import LABELS
 
 def home(request):
     return render(request, 'home.html')
@@ -7,20 +17,105 @@ def home(request):
 def result(request):
     if request.method == 'POST':
         text = request.POST.get('text')
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
-
-        if polarity > 0:
-            result = "Positive 😊"
-        elif polarity < 0:
-            result = "Negative 😟"
-        else:
-            result = "Neutral 😐"
-
-    return render(request, 'result.html', {
-        'text' : text,
-        'result': result,
-        'polarity': polarity,
-        'subjectivity': subjectivity
-    })
\ No newline at end of file
+        scores = score_text(text)
+        if settings.SENTIMENT_STORE_RESULTS:
+            batch.save_chunk([{'text': text}], [scores])
+        polarity = scores['polarity']
+        subjectivity = scores['subjectivity']
+        result = LABELS[scores['label']]
+
+    with metrics.phase('render'):
+        return render(request, 'result.html', {
+            'text' : text,
+            'result': result,
+            'polarity': polarity,
+            'subjectivity': subjectivity
+        })
+
+@csrf_exempt
+@require_POST
+def api_score(request):
+    """Score a JSON array or NDJSON batch of texts, streaming NDJSON results."""
+    try:
+        items = batch.iter_items(request)
+    except batch.BatchError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    return StreamingHttpResponse(batch.stream_scores(items), content_type='application/x-ndjson')
+
+@csrf_exempt
+@require_POST
+async def api_score_async(request):
+    """Async variant of api_score for ASGI servers.
+
+    Scoring runs in a worker thread so the event loop stays free, and the
+    number of concurrent jobs is capped; overflow gets a 429 with Retry-After.
+    """
+    try:
+        async with limits.get_limiter().slot():
+            scored = await sync_to_async(batch.score_request, thread_sensitive=False)(request)
+    except limits.Overloaded:
+        response = JsonResponse({'error': 'Too many scoring requests in progress. Try again later.'}, status=429)
+        response['Retry-After'] = str(settings.SENTIMENT_RETRY_AFTER)
+        return response
+    except batch.BatchError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    if settings.SENTIMENT_STORE_RESULTS:
+        await sync_to_async(batch.save_scored)(scored)
+    body = ''.join(batch.render(results) for _, results in scored)
+    return HttpResponse(body, content_type='application/x-ndjson')
+
+def metrics_view(request):
+    """Expose request, phase and cache metrics in Prometheus text format."""
+    return HttpResponse(metrics.REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def cache_stats(request):
+    """Report hit, miss and eviction counters for the result cache."""
+    return JsonResponse(get_result_cache().stats())
+
+def _stats_queryset(request):
+    """Parse bucket/since/until query parameters shared by the stats views."""
+    bucket = request.GET.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(BUCKETS)}")
+    bounds = {}
+    for name in ('since', 'until'):
+        value = request.GET.get(name)
+        if value:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                raise ValueError(f'{name} must be an ISO 8601 datetime')
+            bounds[name] = parsed
+    return bucket, SentimentResult.objects.between(**bounds)
+
+def label_stats(request):
+    """Label counts per time bucket, aggregated in the database."""
+    try:
+        bucket, queryset = _stats_queryset(request)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    buckets = {}
+    for row in queryset.label_counts(bucket):
+        counts = buckets.setdefault(row['bucket'], {'positive': 0, 'negative': 0, 'neutral': 0})
+        counts[row['label']] = row['count']
+    return JsonResponse({
+        'bucket': bucket,
+        'results': [{'bucket': start.isoformat(), **counts} for start, counts in buckets.items()],
+    })
+
+def polarity_stats(request):
+    """Mean polarity and subjectivity per time bucket."""
+    try:
+        bucket, queryset = _stats_queryset(request)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    return JsonResponse({
+        'bucket': bucket,
+        'results': [
+            {**row, 'bucket': row['bucket'].isoformat()}
+            for row in queryset.mean_polarity(bucket)
+        ],
+    })
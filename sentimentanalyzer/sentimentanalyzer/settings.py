@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'sentiment.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,14 +75,47 @@ WSGI_APPLICATION = 'sentimentanalyzer.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# WAL lets readers (the stats endpoints) run alongside the bulk inserts of
+# scored results, and IMMEDIATE transactions take the write lock up front
+# instead of failing with "database is locked" on upgrade.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA busy_timeout=5000;'
+            ),
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# The 'sentiment' cache holds scored results keyed by a hash of the text.
+# Swap its backend for FileBasedCache or DatabaseCache to share results
+# between workers; SENTIMENT_CACHE_MAX_ENTRIES bounds it either way.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sentiment': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sentiment-results',
+        'TIMEOUT': None,
+        # Kept above SENTIMENT_CACHE_MAX_ENTRIES so the LRU index, not the
+        # backend's own culling, decides what is evicted.
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -122,3 +156,45 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Sentiment scoring
+
+# Scorer backend: 'textblob' (PatternAnalyzer, one text at a time) or
+# 'lexicon' (vectorized NumPy scorer over the same lexicon; needs numpy).
+SENTIMENT_SCORER = os.environ.get('SENTIMENT_SCORER', 'textblob')
+
+# Load the scorer and its lexicon in SentimentConfig.ready() so the first
+# request does not pay for it. Off by default to keep manage.py commands fast.
+SENTIMENT_WARMUP = os.environ.get('SENTIMENT_WARMUP') == '1'
+
+# Number of texts scored together when streaming /api/score/ results.
+SENTIMENT_BATCH_SIZE = 4096
+
+# Store every scored result as a SentimentResult row, inserted with
+# bulk_create in batches of SENTIMENT_STORE_BATCH_SIZE.
+SENTIMENT_STORE_RESULTS = True
+SENTIMENT_STORE_BATCH_SIZE = 500
+
+# Cache alias and LRU bound for scored results.
+SENTIMENT_CACHE_ALIAS = 'sentiment'
+SENTIMENT_CACHE_MAX_ENTRIES = 10000
+
+# Process pool used to spread large batches across cores. A pool size of 1
+# scores everything inline; batches smaller than the threshold always are.
+SENTIMENT_POOL_SIZE = int(os.environ.get('SENTIMENT_POOL_SIZE', os.cpu_count() or 1))
+SENTIMENT_POOL_THRESHOLD = 512
+SENTIMENT_POOL_SHARDS_PER_WORKER = 4
+
+# Async scoring (/api/score/async/ under ASGI): concurrent jobs allowed, how
+# many more may wait for a slot, and the Retry-After seconds sent with 429s.
+SENTIMENT_MAX_INFLIGHT = 8
+SENTIMENT_MAX_QUEUE = 32
+SENTIMENT_RETRY_AFTER = 1
+
+# Sampled cProfile of requests: the given fraction of requests is profiled
+# and a .prof dump kept in SENTIMENT_PROFILE_DIR when slower than the
+# threshold. 0 disables profiling.
+SENTIMENT_PROFILE_SAMPLE_RATE = float(os.environ.get('SENTIMENT_PROFILE_SAMPLE_RATE', '0'))
+SENTIMENT_PROFILE_THRESHOLD_MS = 500
+SENTIMENT_PROFILE_DIR = BASE_DIR / 'profiles'
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sentimentanalyzer.settings')
 
 application = get_wsgi_application()
+
+# Start the scoring pool now so the first large batch does not pay for it.
+from sentiment.engine import get_engine  # noqa: E402
+
+get_engine().start()
@@ -1,12 +1,25 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, g
 import speech_recognition as sr
-from gtts import gTTS
-import requests
-import json
 import os
 from datetime import datetime
 from dotenv import load_dotenv
+import asyncio
 import io
+import json
+import logging
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from audio_cache import AudioCache
+import metrics
+from intents import IntentMatcher
+from jobs import DONE, FAILED, JobQueue, Scheduler
+from reminder_store import ReminderStore
+from fetchers import CachedFetcher
+import tts
+from recognizers import get_recognizer
+from vad import SAMPLE_TYPES, VoiceActivityDetector, open_pcm_stream
 
 load_dotenv()
 
@@ -14,16 +27,149 @@ app = Flask(__name__)
 
 WEATHER_API_KEY = os.getenv('WEATHER_API_KEY')
 NEWS_API_KEY = os.getenv('NEWS_API_KEY')
+WEATHER_API_URL = os.getenv('WEATHER_API_URL', 'http://api.openweathermap.org/data/2.5/weather')
+NEWS_API_URL = os.getenv('NEWS_API_URL', 'https://newsapi.org/v2/top-headlines')
+WEATHER_CITY = os.getenv('WEATHER_CITY', 'Gujarat')
+NEWS_COUNTRY = os.getenv('NEWS_COUNTRY', 'us')
+
+# Weather and headlines change every few minutes; serve them from cache and
+# refresh in the background for a while after they expire.
+WEATHER_CACHE_TTL = int(os.getenv('WEATHER_CACHE_TTL', 600))
+NEWS_CACHE_TTL = int(os.getenv('NEWS_CACHE_TTL', 900))
+FETCH_STALE_TTL = int(os.getenv('FETCH_STALE_TTL', 3600))
 
 REMINDERS_FILE = 'reminders.json'
+REMINDERS_DB = os.getenv('REMINDERS_DB', 'reminders.db')
+REMINDERS_PAGE_SIZE = 100
+REMINDERS_MAX_PAGE_SIZE = 1000
 AUDIO_DIR = 'static/audio'
+AUDIO_CACHE_MAX_BYTES = int(os.getenv('AUDIO_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+AUDIO_CACHE_MAX_AGE = int(os.getenv('AUDIO_CACHE_MAX_AGE', 7 * 24 * 3600))
+AUDIO_CLEANUP_INTERVAL = int(os.getenv('AUDIO_CLEANUP_INTERVAL', 300))
+TTS_WORKERS = int(os.getenv('TTS_WORKERS', 4))
+TTS_JOB_TTL = 600
+JOB_MAX_WAIT = 30
+PRERENDER_AUDIO = os.getenv('PRERENDER_AUDIO', '1') == '1'
+SPEECH_RECOGNIZER = os.getenv('SPEECH_RECOGNIZER', 'google')
+TIMING_LOG = os.getenv('TIMING_LOG', '1') == '1'
+STREAM_CHUNK_BYTES = 8192
+STREAM_SAMPLE_RATE = 16000
+STREAM_MIN_RATE = 8000
+STREAM_MAX_RATE = 48000
+
+GREETING_RESPONSE = "Hi there! How can I help you today?"
+HELP_RESPONSE = "I can help you with: weather information, latest news, current time and date, setting reminders, and general conversation. Just speak naturally!"
+THANKS_RESPONSE = "You're welcome! Is there anything else I can help you with?"
+GOODBYE_RESPONSE = "Goodbye! Have a great day!"
+
+# Replies that never change; their audio is rendered once at startup.
+CANNED_RESPONSES = [GREETING_RESPONSE, HELP_RESPONSE, THANKS_RESPONSE, GOODBYE_RESPONSE]
+
+# Intents are compiled into a single automaton and matched on whole words.
+# Specific requests outrank small talk, so "hi, what's the weather" gets the
+# weather and "remind me to check the news" sets a reminder.
+INTENTS = IntentMatcher()
+INTENTS.add('reminder', ["remind me", "set a reminder", "setting a reminder", "create a reminder", "reminder to", "remember to"], priority=90)
+INTENTS.add('weather', ["weather", "temperature", "forecast", "climate"], priority=80)
+INTENTS.add('news', ["news", "headlines", "current events", "latest news"], priority=70)
+INTENTS.add('time', ["time", "clock", "what time"], priority=60)
+INTENTS.add('date', ["date", "today", "what day", "calendar"], priority=50)
+INTENTS.add('help', ["help", "what can you do", "commands", "options"], priority=40)
+INTENTS.add('thanks', ["thank", "thanks", "thank you"], priority=30)
+INTENTS.add('goodbye', ["goodbye", "bye", "see you", "farewell"], priority=20)
+INTENTS.add('greeting', ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"], priority=10)
+
+REMINDER_PREFIXES = IntentMatcher()
+REMINDER_PREFIXES.add('reminder', [
+    "remind me to",
+    "remind me",
+    "set a reminder to",
+    "set a reminder for",
+    "setting a reminder to",
+    "setting a reminder for",
+    "create a reminder to",
+    "reminder to",
+    "remember to",
+])
 
 os.makedirs(AUDIO_DIR, exist_ok=True)
 os.makedirs('static', exist_ok=True)
 
-if not os.path.exists(REMINDERS_FILE):
-    with open(REMINDERS_FILE, 'w') as f:
-        json.dump([], f)
+audio_cache = AudioCache(AUDIO_DIR, AUDIO_CACHE_MAX_BYTES, AUDIO_CACHE_MAX_AGE)
+tts_jobs = JobQueue(TTS_WORKERS, TTS_JOB_TTL, name='tts')
+scheduler = Scheduler(app.logger)
+
+speech_recognizer = get_recognizer(SPEECH_RECOGNIZER)
+
+# Speech segments from /stream_audio are recognized here while the upload
+# is still arriving.
+recognition_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='recognize')
+
+weather_fetcher = CachedFetcher(WEATHER_API_URL, WEATHER_CACHE_TTL, FETCH_STALE_TTL,
+                                params={'appid': WEATHER_API_KEY, 'units': 'metric'}, name='weather')
+news_fetcher = CachedFetcher(NEWS_API_URL, NEWS_CACHE_TTL, FETCH_STALE_TTL,
+                             params={'apiKey': NEWS_API_KEY}, name='news')
+
+reminder_store = ReminderStore(REMINDERS_DB, app.logger)
+imported = reminder_store.import_json(REMINDERS_FILE)
+if imported:
+    app.logger.info(f"Imported {imported} reminders from {REMINDERS_FILE}")
+
+# One JSON line per request with its latency and per-stage breakdown.
+timing_log = logging.getLogger('voice_assistant.timing')
+if TIMING_LOG and not timing_log.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    timing_log.addHandler(_handler)
+    timing_log.setLevel(logging.INFO)
+    timing_log.propagate = False
+
+metrics.REGISTRY.register(metrics.FunctionMetric(
+    'voice_audio_cache_events_total', 'Audio cache hits, misses and evictions.',
+    lambda: {(event,): audio_cache.stats()[event] for event in ('hits', 'misses', 'evictions')},
+    ('event',), kind='counter',
+))
+metrics.REGISTRY.register(metrics.FunctionMetric(
+    'voice_audio_cache_bytes', 'Bytes of synthesized audio on disk.', lambda: audio_cache.stats()['bytes'],
+))
+metrics.REGISTRY.register(metrics.FunctionMetric(
+    'voice_fetch_cache_events_total', 'Weather and news cache hits, stale hits and misses.',
+    lambda: {(fetcher.name, event): fetcher.cache.stats()[event]
+             for fetcher in (weather_fetcher, news_fetcher) for event in ('hits', 'stale_hits', 'misses')},
+    ('api', 'event'), kind='counter',
+))
+metrics.REGISTRY.register(metrics.FunctionMetric(
+    'voice_tts_jobs', 'Speech synthesis jobs, by state.',
+    lambda: {(state,): count for state, count in tts_jobs.stats().items()}, ('state',),
+))
+
+@app.before_request
+def start_timing():
+    g.request_start = time.perf_counter()
+    metrics.start_request()
+
+@app.after_request
+def record_timing(response):
+    elapsed = time.perf_counter() - g.pop('request_start', time.perf_counter())
+    stages = metrics.finish_request()
+    endpoint = request.endpoint or 'unmatched'
+    metrics.REQUEST_SECONDS.observe(elapsed, endpoint=endpoint)
+    metrics.REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    timing_log.info(json.dumps({
+        'time': datetime.now().isoformat(timespec='milliseconds'),
+        'method': request.method,
+        'path': request.path,
+        'endpoint': endpoint,
+        'status': response.status_code,
+        'ms': round(elapsed * 1000, 1),
+        'stages_ms': {name: round(seconds * 1000, 1) for name, seconds in stages.items()},
+    }))
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics_view():
+    """Prometheus metrics for this process"""
+    return metrics.REGISTRY.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
 @app.route('/')
 def index():
@@ -35,83 +181,215 @@ def process_audio():
         return jsonify({'response': 'No audio file received.'}), 400
 
     audio_file = request.files['audio_data']
-    recognizer = sr.Recognizer()
 
     try:
         app.logger.info(f"Received audio file: {audio_file.filename}, Content-Type: {audio_file.content_type}")
         
-        audio_bytes = audio_file.read()
+        with metrics.stage('upload'):
+            audio_bytes = audio_file.read()
         app.logger.info(f"Audio file size: {len(audio_bytes)} bytes")
         
         if len(audio_bytes) == 0:
             return jsonify({'response': 'Empty audio file received.'}), 400
-        audio_stream = io.BytesIO(audio_bytes)
-        
-        with sr.AudioFile(audio_stream) as source:
-           
+
+        text = recognize(audio_bytes)
+        app.logger.info(f"Successfully recognized text: {text}")
+
+    except Exception as e:
+        return recognition_error(e)
+
+    with metrics.stage('command'):
+        response = handle_command(text.lower())
+    result = {'response': response, 'recognized_text': text}
+    filename = audio_cache.lookup(response)
+    if filename:
+        result['audio_url'] = f'static/audio/{filename}'
+    return jsonify(result)
+
+@app.route('/pipeline', methods=['POST'])
+async def pipeline():
+    """Recognize speech, handle the command and synthesize the reply in one call.
+
+    The blocking recognition, API and TTS calls run in worker threads so the
+    event loop only waits on them, and the reply's audio parts are rendered
+    concurrently as soon as its text is known.
+    """
+    if 'audio_data' not in request.files:
+        return jsonify({'response': 'No audio file received.'}), 400
+
+    audio_bytes = request.files['audio_data'].read()
+    if len(audio_bytes) == 0:
+        return jsonify({'response': 'Empty audio file received.'}), 400
+
+    try:
+        text = await asyncio.to_thread(recognize, audio_bytes)
+    except Exception as e:
+        return recognition_error(e)
+
+    with metrics.stage('command'):
+        response = await asyncio.to_thread(handle_command, text.lower())
+    result = {'response': response, 'recognized_text': text}
+    try:
+        filename, cached = await asyncio.to_thread(synthesize, response)
+        result.update(audio_url=f'static/audio/{filename}', cached=cached)
+    except Exception as e:
+        app.logger.error(f"Error synthesizing pipeline reply: {str(e)}")
+    return jsonify(result)
+
+def recognize(audio_bytes):
+    """Transcribe WAV audio bytes with the configured recognizer backend"""
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(io.BytesIO(audio_bytes)) as source:
+        with metrics.stage('calibrate'):
             recognizer.adjust_for_ambient_noise(source, duration=0.2)
+        with metrics.stage('record'):
             audio_data = recognizer.record(source)
+    with metrics.stage('recognize'):
+        return speech_recognizer.recognize(audio_data)
 
-        text = recognizer.recognize_google(audio_data)
-        app.logger.info(f"Successfully recognized text: {text}")
+@app.route('/stream_audio', methods=['POST'])
+def stream_audio():
+    """Recognize a chunked PCM or WAV upload one speech segment at a time.
+
+    Frames are read as they arrive and silence is dropped by the voice
+    activity detector; each speech segment is sent for recognition as soon
+    as it ends, so the upload never has to be held in memory.
+    """
+    try:
+        rate, width, channels, head = open_pcm_stream(
+            request.stream, int(request.args.get('rate', STREAM_SAMPLE_RATE)), int(request.args.get('width', 2)))
+    except ValueError as e:
+        return jsonify({'response': f'Invalid audio stream: {str(e)}'}), 400
+    if channels != 1 or width not in SAMPLE_TYPES:
+        return jsonify({'response': 'Audio must be mono 16 or 32-bit PCM.'}), 400
+    if not STREAM_MIN_RATE <= rate <= STREAM_MAX_RATE:
+        return jsonify({'response': f'Sample rate must be between {STREAM_MIN_RATE} and {STREAM_MAX_RATE} Hz.'}), 400
+
+    vad = VoiceActivityDetector(rate, width)
+    futures = []
+    chunks = itertools.chain([head], iter(lambda: request.stream.read(STREAM_CHUNK_BYTES), b''))
+    with metrics.stage('stream'):
+        for chunk in chunks:
+            for segment in vad.feed(chunk):
+                futures.append(recognition_pool.submit(recognize_segment, segment, rate, width))
+    segment = vad.flush()
+    if segment:
+        futures.append(recognition_pool.submit(recognize_segment, segment, rate, width))
+
+    with metrics.stage('recognize_wait'):
+        wait(futures)
+    transcripts = []
+    for future in futures:
+        try:
+            transcripts.append(future.result())
+        except sr.UnknownValueError:
+            continue
+        except Exception as e:
+            return recognition_error(e)
+    if not transcripts:
+        return recognition_error(sr.UnknownValueError())
+
+    text = ' '.join(transcripts)
+    app.logger.info(f"Recognized {len(futures)} segments, {vad.speech_seconds:.1f}s of speech in {vad.audio_seconds:.1f}s: {text}")
+    with metrics.stage('command'):
+        response = handle_command(text.lower())
+    result = {
+        'response': response,
+        'recognized_text': text,
+        'segments': len(futures),
+        'audio_seconds': vad.audio_seconds,
+        'speech_seconds': vad.speech_seconds,
+    }
+    filename = audio_cache.lookup(response)
+    if filename:
+        result['audio_url'] = f'static/audio/{filename}'
+    return jsonify(result)
 
-    except sr.UnknownValueError:
+def recognize_segment(pcm, sample_rate, sample_width):
+    """Transcribe one speech segment of raw PCM"""
+    with metrics.stage('recognize'):
+        return speech_recognizer.recognize(sr.AudioData(pcm, sample_rate, sample_width))
+
+def recognition_error(e):
+    """Map a recognition failure to the JSON error response"""
+    reason = {sr.UnknownValueError: 'not_understood', sr.RequestError: 'request_error'}.get(type(e), 'audio_error')
+    metrics.RECOGNITION_FAILURES.inc(backend=SPEECH_RECOGNIZER, reason=reason)
+    if isinstance(e, sr.UnknownValueError):
         app.logger.warning("Speech recognition could not understand audio")
         return jsonify({'response': "Could not understand audio. Please speak more clearly and try again."}), 400
-    except sr.RequestError as e:
+    if isinstance(e, sr.RequestError):
         app.logger.error(f"Speech recognition request error: {e}")
         return jsonify({'response': "Speech recognition service is unavailable. Please check your internet connection and try again."}), 500
-    except Exception as e:
-        app.logger.error(f"Audio processing error: {str(e)}")
-        return jsonify({'response': f"Audio processing error: {str(e)}. Please ensure you're using Chrome browser and try again."}), 500
+    app.logger.error(f"Audio processing error: {str(e)}")
+    return jsonify({'response': f"Audio processing error: {str(e)}. Please ensure you're using Chrome browser and try again."}), 500
 
-    response = handle_command(text.lower())
-    return jsonify({'response': response, 'recognized_text': text})
+@app.route('/respond', methods=['POST'])
+def respond():
+    """Handle a text command and return the reply together with its audio URL"""
+    try:
+        data = request.get_json()
+        if not data or 'text' not in data:
+            return jsonify({'error': 'No text provided'}), 400
+
+        command_text = data.get('text')
+        if not command_text.strip():
+            return jsonify({'error': 'Empty text provided'}), 400
+
+        response = handle_command(command_text)
+        filename, cached = synthesize(response)
+        return jsonify({'response': response, 'audio_url': f'static/audio/{filename}', 'cached': cached})
+
+    except Exception as e:
+        app.logger.error(f"Error in respond endpoint: {str(e)}")
+        return jsonify({'error': 'Failed to generate response'}), 500
 
 def handle_command(command_text):
     """Enhanced command handling with more features"""
     command_text = command_text.lower().strip()
 
-    if any(word in command_text for word in ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"]):
-        return "Hi there! How can I help you today?"
+    match = INTENTS.match(command_text)
+    intent = match.intent if match else None
+    metrics.INTENTS.inc(intent=intent or 'unknown')
+
+    if intent == 'greeting':
+        return GREETING_RESPONSE
   
-    if any(word in command_text for word in ["weather", "temperature", "forecast", "climate"]):
+    if intent == 'weather':
         return get_weather()
     
-    if any(word in command_text for word in ["news", "headlines", "current events", "latest news"]):
+    if intent == 'news':
         return get_news()
     
-    if any(phrase in command_text for phrase in ["remind me", "set a reminder", "setting a reminder", "create a reminder", "reminder to", "remember to"]):
+    if intent == 'reminder':
         return set_reminder(command_text)
     
-    if any(word in command_text for word in ["time", "clock", "what time"]):
+    if intent == 'time':
         current_time = datetime.now().strftime("%I:%M %p")
         return f"The current time is {current_time}"
  
-    if any(word in command_text for word in ["date", "today", "what day", "calendar"]):
+    if intent == 'date':
         current_date = datetime.now().strftime("%A, %B %d, %Y")
         return f"Today is {current_date}"
  
-    if any(word in command_text for word in ["help", "what can you do", "commands", "options"]):
-        return "I can help you with: weather information, latest news, current time and date, setting reminders, and general conversation. Just speak naturally!"
+    if intent == 'help':
+        return HELP_RESPONSE
  
-    if any(word in command_text for word in ["thank", "thanks", "thank you"]):
-        return "You're welcome! Is there anything else I can help you with?"
+    if intent == 'thanks':
+        return THANKS_RESPONSE
     
-    if any(word in command_text for word in ["goodbye", "bye", "see you", "farewell"]):
-        return "Goodbye! Have a great day!"
+    if intent == 'goodbye':
+        return GOODBYE_RESPONSE
     
     return f"I heard you say '{command_text}', but I'm not sure how to help with that. Try asking about weather, news, time, setting reminders, or just say hello!"
 
-def get_weather():
+def get_weather(city=WEATHER_CITY):
     """Get weather information"""
     if not WEATHER_API_KEY:
         return "Weather API key not configured."
     
-    city = 'Gujarat'  
-    url = f'http://api.openweathermap.org/data/2.5/weather?q={city}&appid={WEATHER_API_KEY}&units=metric'
     try:
-        res = requests.get(url, timeout=5).json()
+        with metrics.stage('weather'):
+            res = weather_fetcher.fetch(q=city)
         if res.get('cod') != 200:
             return "Couldn't fetch weather information."
         
@@ -122,14 +400,14 @@ def get_weather():
     except Exception as e:
         return "Couldn't fetch the weather information."
 
-def get_news():
+def get_news(country=NEWS_COUNTRY):
     """Get latest news headlines"""
     if not NEWS_API_KEY:
         return "News API key not configured."
     
-    url = f'https://newsapi.org/v2/top-headlines?country=us&apiKey={NEWS_API_KEY}'
     try:
-        res = requests.get(url, timeout=5).json()
+        with metrics.stage('news'):
+            res = news_fetcher.fetch(country=country)
         if res.get('status') != 'ok':
             return "Couldn't fetch the news."
         
@@ -148,22 +426,9 @@ def set_reminder(text):
         text = text.lower().strip()
         reminder_text = ""
         
-        patterns = [
-            "remind me to ",
-            "remind me ",
-            "set a reminder to ",
-            "set a reminder for ",
-            "setting a reminder to ",
-            "setting a reminder for ",
-            "create a reminder to ",
-            "reminder to ",
-            "remember to "
-        ]
-        
-        for pattern in patterns:
-            if pattern in text:
-                reminder_text = text.split(pattern, 1)[1].strip()
-                break
+        match = REMINDER_PREFIXES.match(text)
+        if match:
+            reminder_text = text[match.end:].strip()
         
         if not reminder_text and "reminder" in text:
             parts = text.split("reminder", 1)
@@ -181,18 +446,8 @@ def set_reminder(text):
         if not reminder_text:
             return "Please specify what you want to be reminded about."
         
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        try:
-            with open(REMINDERS_FILE, 'r') as f:
-                reminders = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            reminders = []
-      
-        reminders.append({"text": reminder_text, "time": now})
-        
-        with open(REMINDERS_FILE, 'w') as f:
-            json.dump(reminders, f, indent=2)
+        with metrics.stage('reminder'):
+            reminder_store.add(reminder_text)
         
         return f"Reminder set successfully: {reminder_text}"
         
@@ -200,9 +455,22 @@ def set_reminder(text):
         app.logger.error(f"Error setting reminder: {str(e)}")
         return "Sorry, I couldn't set that reminder. Please try again."
 
+def synthesize(text, lang='en', counted=False):
+    """Return ``(filename, cached)`` for the spoken audio of ``text``"""
+    with metrics.stage('synthesize'):
+        return audio_cache.get_or_create(text, lang, lambda path: tts.save(text, lang, path), counted)
+
+def prerender_canned_responses():
+    """Render audio for the constant replies so they never wait on TTS"""
+    for text in CANNED_RESPONSES:
+        try:
+            synthesize(text)
+        except Exception as e:
+            app.logger.warning(f"Could not pre-render audio for {text!r}: {str(e)}")
+
 @app.route('/speak', methods=['POST'])
 def speak():
-    """Convert text to speech and return audio file URL"""
+    """Return the audio URL for text, or queue its synthesis and return a job id"""
     try:
         data = request.get_json()
         if not data or 'text' not in data:
@@ -212,58 +480,101 @@ def speak():
         if not text.strip():
             return jsonify({'error': 'Empty text provided'}), 400
         
-        timestamp = datetime.now().timestamp()
-        filename = f'{timestamp}.mp3'
-        filepath = os.path.join(AUDIO_DIR, filename)
-    
-        tts = gTTS(text=text, lang='en')
-        tts.save(filepath)
-   
-        audio_url = f'static/audio/{filename}'
-        return jsonify({'audio_url': audio_url})
+        lang = data.get('lang', 'en')
+        filename = audio_cache.lookup(text, lang)
+        if filename:
+            return jsonify({'audio_url': f'static/audio/{filename}', 'cached': True})
+
+        job = tts_jobs.submit(synthesize, text, lang, True, key=(text, lang))
+        return jsonify(job_response(job)), 202
         
     except Exception as e:
         app.logger.error(f"Error in speak endpoint: {str(e)}")
         return jsonify({'error': 'Failed to generate speech'}), 500
 
+@app.route('/speak/jobs/<job_id>', methods=['GET'])
+def speak_job(job_id):
+    """Get a speech job; ?wait=N long-polls up to N seconds for it to finish"""
+    job = tts_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    try:
+        wait = min(float(request.args.get('wait', 0)), JOB_MAX_WAIT)
+    except ValueError:
+        return jsonify({'error': 'wait must be a number'}), 400
+    if wait > 0:
+        job.wait(wait)
+    return jsonify(job_response(job))
+
+def job_response(job):
+    result = {'job_id': job.id, 'status': job.status, 'status_url': f'/speak/jobs/{job.id}'}
+    if job.status == DONE:
+        filename, cached = job.result
+        result.update(audio_url=f'static/audio/{filename}', cached=cached)
+    elif job.status == FAILED:
+        app.logger.error(f"Speech job {job.id} failed: {job.error}")
+        result['error'] = 'Failed to generate speech'
+    return result
+
+def clean_up_audio():
+    """Keep static/audio within its size and age limits"""
+    removed = audio_cache.sweep()
+    if removed:
+        app.logger.info(f"Removed {len(removed)} cached audio files")
+
 @app.route('/reminders', methods=['GET'])
 def get_reminders():
-    """Get all reminders"""
+    """Get reminders, oldest first, a page at a time"""
     try:
-        with open(REMINDERS_FILE, 'r') as f:
-            reminders = json.load(f)
-        return jsonify({'reminders': reminders})
-    except (FileNotFoundError, json.JSONDecodeError):
-        return jsonify({'reminders': []})
+        limit = min(int(request.args.get('limit', REMINDERS_PAGE_SIZE)), REMINDERS_MAX_PAGE_SIZE)
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({'error': 'limit must be positive and offset non-negative'}), 400
+
+    try:
+        reminders = reminder_store.list(limit, offset)
+        return jsonify({'reminders': reminders, 'total': reminder_store.count(), 'limit': limit, 'offset': offset})
+    except Exception as e:
+        app.logger.error(f"Error reading reminders: {str(e)}")
+        return jsonify({'error': 'Failed to load reminders'}), 500
 
 @app.route('/reminders', methods=['DELETE'])
 def clear_reminders():
     """Clear all reminders"""
     try:
-        with open(REMINDERS_FILE, 'w') as f:
-            json.dump([], f)
+        reminder_store.clear()
         return jsonify({'message': 'All reminders cleared'})
     except Exception as e:
         return jsonify({'error': 'Failed to clear reminders'}), 500
 
-def cleanup_old_audio_files():
-    """Remove audio files older than 1 hour"""
+@app.route('/audio_cache', methods=['GET'])
+def get_audio_cache_stats():
+    """Get audio cache size and hit/miss counters, and speech job counts"""
+    return jsonify({**audio_cache.stats(), 'jobs': tts_jobs.stats()})
+
+@app.route('/fetch_cache', methods=['GET'])
+def get_fetch_cache_stats():
+    """Get weather and news cache hit/miss counters"""
+    return jsonify({'weather': weather_fetcher.cache.stats(), 'news': news_fetcher.cache.stats()})
+
+def warm_up_recognizer():
+    """Load the recognizer's model before the first request needs it"""
     try:
-        current_time = datetime.now().timestamp()
-        for filename in os.listdir(AUDIO_DIR):
-            if filename.endswith('.mp3'):
-                file_path = os.path.join(AUDIO_DIR, filename)
-                try:
-                    
-                    file_timestamp = float(filename.split('.')[0])
-                    
-                    if current_time - file_timestamp > 3600:
-                        os.remove(file_path)
-                except (ValueError, OSError):
-                    pass
+        speech_recognizer.warm_up()
     except Exception as e:
-        app.logger.error(f"Error cleaning up audio files: {str(e)}")
+        app.logger.error(f"Could not load the {SPEECH_RECOGNIZER} recognizer: {str(e)}")
+
+threading.Thread(target=warm_up_recognizer, name='recognizer-warm-up', daemon=True).start()
+
+scheduler.every(AUDIO_CLEANUP_INTERVAL, clean_up_audio)
+scheduler.every(60, tts_jobs.prune)
+scheduler.start()
+
+if PRERENDER_AUDIO:
+    threading.Thread(target=prerender_canned_responses, name='prerender-audio', daemon=True).start()
 
 if __name__ == "__main__":
-    cleanup_old_audio_files()
+    audio_cache.sweep()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""Content-addressed cache of synthesized speech.
+
+Each clip is stored as ``<sha256(lang + text)>.mp3`` so a phrase is only
+synthesized once; repeats are served from disk via an in-memory index. The
+cache is bounded by total size and by time since last use, evicting the
+least recently used clips first.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class AudioCache:
+    def __init__(self, directory, max_bytes, max_age):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._index = OrderedDict()  # filename -> [size, last_used]
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._pending = {}  # filename -> lock held while it is synthesized
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Index clips already on disk, oldest first."""
+        entries = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.mp3'):
+                try:
+                    stat = os.stat(os.path.join(self.directory, filename))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, filename, stat.st_size))
+        for mtime, filename, size in sorted(entries):
+            self._index[filename] = [size, mtime]
+            self._total_bytes += size
+
+    @staticmethod
+    def filename(text, lang):
+        digest = hashlib.sha256(f'{lang}\0{text}'.encode('utf-8')).hexdigest()
+        return f'{digest}.mp3'
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def get(self, text, lang='en'):
+        """Return the cached filename for ``text`` or None."""
+        filename = self.filename(text, lang)
+        with self._lock:
+            entry = self._index.get(filename)
+            if entry is None:
+                return None
+            entry[1] = time.time()
+            self._index.move_to_end(filename)
+        return filename
+
+    def lookup(self, text, lang='en'):
+        """Like ``get``, but counts the lookup as a hit or a miss."""
+        filename = self.get(text, lang)
+        with self._lock:
+            if filename is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return filename
+
+    def get_or_create(self, text, lang, synthesize, counted=False):
+        """Return ``(filename, cached)``, calling ``synthesize(path)`` on a miss.
+
+        Concurrent requests for the same phrase wait for a single synthesis.
+        Pass ``counted=True`` when the caller already counted the miss with
+        ``lookup``, so the phrase is not counted twice.
+        """
+        filename = self.get(text, lang)
+        if filename is not None:
+            if not counted:
+                with self._lock:
+                    self.hits += 1
+            return filename, True
+
+        with self._lock:
+            pending = self._pending.setdefault(self.filename(text, lang), threading.Lock())
+        with pending:
+            filename = self.get(text, lang)
+            if filename is not None:
+                if not counted:
+                    with self._lock:
+                        self.hits += 1
+                return filename, True
+            filename = self.filename(text, lang)
+            tmp_path = self.path(f'{filename}.{threading.get_ident()}.tmp')
+            try:
+                synthesize(tmp_path)
+                os.replace(tmp_path, self.path(filename))
+                self.add(filename)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                with self._lock:
+                    self._pending.pop(filename, None)
+            if not counted:
+                with self._lock:
+                    self.misses += 1
+        return filename, False
+
+    def add(self, filename):
+        """Index a clip that was written to the cache directory."""
+        size = os.path.getsize(self.path(filename))
+        with self._lock:
+            previous = self._index.pop(filename, None)
+            if previous:
+                self._total_bytes -= previous[0]
+            self._index[filename] = [size, time.time()]
+            self._total_bytes += size
+        self.evict()
+
+    def evict(self, now=None):
+        """Remove clips unused for ``max_age`` seconds, then LRU clips over ``max_bytes``."""
+        now = time.time() if now is None else now
+        removed = []
+        with self._lock:
+            while self._index:
+                filename, (size, last_used) = next(iter(self._index.items()))
+                if now - last_used <= self.max_age and self._total_bytes <= self.max_bytes:
+                    break
+                self._index.popitem(last=False)
+                self._total_bytes -= size
+                removed.append(filename)
+            self.evictions += len(removed)
+        for filename in removed:
+            try:
+                os.remove(self.path(filename))
+            except OSError:
+                pass
+        return removed
+
+    def sweep(self, temp_age=3600):
+        """Re-sync the index with the directory, drop stale temp files, then evict.
+
+        Keeps the size bound honest when files are added or removed behind
+        the cache's back, and cleans up after interrupted syntheses.
+        """
+        now = time.time()
+        on_disk = {}
+        for filename in os.listdir(self.directory):
+            try:
+                stat = os.stat(self.path(filename))
+            except OSError:
+                continue
+            if filename.endswith('.tmp') and now - stat.st_mtime > temp_age:
+                try:
+                    os.remove(self.path(filename))
+                except OSError:
+                    pass
+            elif filename.endswith('.mp3'):
+                on_disk[filename] = stat
+        with self._lock:
+            for filename in [f for f in self._index if f not in on_disk]:
+                self._total_bytes -= self._index.pop(filename)[0]
+            # Unknown files go to the least recently used end, oldest first.
+            for filename, stat in sorted(on_disk.items(), key=lambda item: -item[1].st_mtime):
+                if filename not in self._index:
+                    self._index[filename] = [stat.st_size, stat.st_mtime]
+                    self._index.move_to_end(filename, last=False)
+                    self._total_bytes += stat.st_size
+        return self.evict(now)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._index),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
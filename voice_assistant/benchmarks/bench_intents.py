@@ -0,0 +1,93 @@
+"""Micro-benchmark for intent dispatch.
+
+Registers a growing number of synthetic intents next to the assistant's own
+and times matching a set of commands, comparing the compiled matcher with the
+linear substring scan it replaced. Compiled dispatch time should stay flat
+as intents are added.
+
+    python benchmarks/bench_intents.py
+    python benchmarks/bench_intents.py --intents 10 100 500 2000 --repeat 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intents import IntentMatcher  # noqa: E402
+
+BASE_INTENTS = [
+    ('reminder', ["remind me", "set a reminder", "create a reminder", "reminder to", "remember to"], 90),
+    ('weather', ["weather", "temperature", "forecast", "climate"], 80),
+    ('news', ["news", "headlines", "current events", "latest news"], 70),
+    ('time', ["time", "clock", "what time"], 60),
+    ('greeting', ["hello", "hi", "hey", "good morning"], 10),
+]
+COMMANDS = [
+    "hi there",
+    "what's the weather like in the city this afternoon",
+    "remind me to call mom when i get home from work",
+    "could you read me the latest news headlines please",
+    "this is something which you probably cannot help with at all",
+    "please play some relaxing music in the living room",
+]
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'tu', 'ven', 'zo', 'pe', 'qua', 'sil', 'dor', 'nex']
+
+
+def synthetic_intents(count, seed=0):
+    rng = random.Random(seed)
+    intents = []
+    for i in range(count):
+        phrases = [' '.join(''.join(rng.choice(SYLLABLES) for _ in range(3)) for _ in range(rng.randint(1, 3)))
+                   for _ in range(4)]
+        intents.append((f'synthetic_{i}', phrases, rng.randint(0, 100)))
+    return intents
+
+
+def linear_match(intents, text):
+    """The old dispatch: substring scans over every phrase, in priority order."""
+    for intent, phrases, _ in intents:
+        if any(phrase in text for phrase in phrases):
+            return intent
+    return None
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for command in COMMANDS:
+                fn(command)
+        timings.append((time.perf_counter() - start) / (repeat * len(COMMANDS)))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--intents', nargs='+', type=int, default=[0, 10, 100, 500, 1000, 2000])
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f'{"intents":>8} {"phrases":>8} {"compile ms":>11} {"compiled us":>12} {"linear us":>10}')
+    for count in args.intents:
+        intents = BASE_INTENTS + synthetic_intents(count)
+        matcher = IntentMatcher()
+        for intent, phrases, priority in intents:
+            matcher.add(intent, phrases, priority)
+        start = time.perf_counter()
+        matcher.compile()
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        by_priority = sorted(intents, key=lambda item: -item[2])
+
+        compiled = measure(matcher.match, args.repeat)
+        linear = measure(lambda text: linear_match(by_priority, text), args.repeat)
+        print(f'{len(intents):>8} {len(matcher):>8} {compile_ms:>11.2f} {compiled * 1e6:>12.2f} {linear * 1e6:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark speech recognition backends.
+
+Times per-utterance latency (one at a time) and throughput (from a pool of
+concurrent callers) for each backend, after its model has been loaded.
+Backends that are not installed or configured are skipped. Pass recorded
+WAV files for meaningful offline numbers; without them short synthetic
+utterances are used, which only exercise the plumbing.
+
+    python benchmarks/bench_recognizers.py --backends fixed vosk sphinx
+    python benchmarks/bench_recognizers.py --backends vosk google --files samples/*.wav --concurrency 8
+"""
+import argparse
+import math
+import os
+import statistics
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import speech_recognition as sr  # noqa: E402
+
+from recognizers import RECOGNIZERS, get_recognizer  # noqa: E402
+
+
+def synthetic_utterances(count, rate=16000):
+    utterances = []
+    for i in range(count):
+        samples = int(rate * (0.5 + 0.25 * (i % 4)))
+        frequency = 220 + 40 * i
+        pcm = struct.pack(f'<{samples}h', *(int(6000 * math.sin(2 * math.pi * frequency * n / rate)) for n in range(samples)))
+        utterances.append(sr.AudioData(pcm, rate, 2))
+    return utterances
+
+
+def load_utterances(paths):
+    utterances = []
+    recognizer = sr.Recognizer()
+    for path in paths:
+        with sr.AudioFile(path) as source:
+            utterances.append(recognizer.record(source))
+    return utterances
+
+
+def attempt(backend, audio):
+    start = time.perf_counter()
+    try:
+        backend.recognize(audio)
+        outcome = 'ok'
+    except sr.UnknownValueError:
+        outcome = 'not understood'
+    except sr.RequestError:
+        outcome = 'error'
+    return time.perf_counter() - start, outcome
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backends', nargs='+', default=['fixed', 'vosk', 'sphinx'], choices=sorted(RECOGNIZERS))
+    parser.add_argument('--files', nargs='*', help='WAV files to recognize (default: synthetic audio).')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over the utterances.')
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    utterances = load_utterances(args.files) if args.files else synthetic_utterances(8)
+    audio_seconds = sum(len(a.frame_data) / (a.sample_rate * a.sample_width) for a in utterances)
+    print(f'{len(utterances)} utterances, {audio_seconds:.1f}s of audio, {args.repeat} passes')
+
+    for name in args.backends:
+        backend = get_recognizer(name)
+        start = time.perf_counter()
+        try:
+            backend.warm_up()
+        except sr.RequestError as e:
+            print(f'{name:<8} skipped: {e}')
+            continue
+        load_ms = (time.perf_counter() - start) * 1000
+
+        work = utterances * args.repeat
+        sequential = [attempt(backend, audio) for audio in work]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(lambda audio: attempt(backend, audio), work))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in sequential)
+        outcomes = {}
+        for _, outcome in sequential:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        print(f'{name:<8} load {load_ms:8.1f} ms  '
+              f'latency p50 {percentile(latencies, 50) * 1000:8.1f} ms  p95 {percentile(latencies, 95) * 1000:8.1f} ms  '
+              f'mean {statistics.mean(latencies) * 1000:8.1f} ms  '
+              f'throughput x{args.concurrency} {len(work) / elapsed:8.1f} utt/s  '
+              f'realtime {audio_seconds * args.repeat / elapsed:6.1f}x  '
+              f'({", ".join(f"{k}: {v}" for k, v in sorted(outcomes.items()))})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Cached HTTP fetchers for the weather and news APIs.
+
+All requests share one ``requests.Session`` so connections are kept alive
+and pooled. Responses are cached per query for ``ttl`` seconds. For a further
+``stale_ttl`` seconds the old response is still returned immediately while a
+background thread refreshes it (stale-while-revalidate). Concurrent misses
+for the same query wait on a single request instead of each calling the API.
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+POOL_SIZE = 10
+
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
+session.mount('https://', HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
+
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='fetch-refresh')
+
+
+class TTLCache:
+    def __init__(self, ttl, stale_ttl=0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = {}  # key -> (value, fetched_at)
+        self._inflight = {}  # key -> Future of the running load
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader()`` when needed."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fetched_at = entry
+                age = now - fetched_at
+                if age < self.ttl:
+                    self.hits += 1
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    if key not in self._inflight:
+                        future = self._inflight[key] = Future()
+                        _refresher.submit(self._load, key, loader, future)
+                    return value
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = self._inflight[key] = Future()
+        if owner:
+            self._load(key, loader, future)
+        return future.result()
+
+    def _load(self, key, loader, future):
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+            }
+
+
+class CachedFetcher:
+    """GET a JSON API through the shared session, cached per query."""
+
+    def __init__(self, url, ttl, stale_ttl=0, timeout=5, params=None, name='api'):
+        self.name = name
+        self.url = url
+        self.timeout = timeout
+        self.params = params or {}
+        self.cache = TTLCache(ttl, stale_ttl)
+
+    def fetch(self, **params):
+        query = {**self.params, **params}
+        return self.cache.get(tuple(sorted(params.items())), lambda: self._request(query))
+
+    def _request(self, query):
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = session.get(self.url, params=query, timeout=self.timeout)
+            outcome = str(response.status_code)
+            response.raise_for_status()
+            return response.json()
+        finally:
+            metrics.EXTERNAL_SECONDS.observe(time.perf_counter() - start, api=self.name, outcome=outcome)
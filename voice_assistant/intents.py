@@ -0,0 +1,101 @@
+"""Keyword intent matching compiled into a word-level Aho-Corasick automaton.
+
+Intents are registered as lists of phrases and compiled once. Matching
+tokenizes the command into words and walks the automaton a single time, so
+dispatch cost grows with the length of the command rather than with the
+number of registered intents. Because phrases are matched word by word,
+"hi" never matches inside "this" or "which".
+
+When several phrases match, the intent with the highest priority wins, then
+the earliest match in the text, then the longest phrase.
+"""
+import re
+import threading
+from collections import deque, namedtuple
+
+WORD_RE = re.compile(r"\w+(?:'\w+)*")
+
+Match = namedtuple('Match', 'intent phrase start end priority')
+
+
+def tokenize(text):
+    """Yield ``(word, start, end)`` for each word in ``text``, lowercased."""
+    for m in WORD_RE.finditer(text):
+        yield m.group().lower(), m.start(), m.end()
+
+
+class IntentMatcher:
+    def __init__(self):
+        self._phrases = []  # (intent, phrase, words, priority)
+        self._lock = threading.Lock()
+        self._automaton = None
+
+    def add(self, intent, phrases, priority=0):
+        """Register ``phrases`` for ``intent``; higher priorities win ties."""
+        with self._lock:
+            for phrase in phrases:
+                words = tuple(word for word, _, _ in tokenize(phrase))
+                if not words:
+                    raise ValueError(f'Phrase {phrase!r} for intent {intent!r} has no words.')
+                self._phrases.append((intent, phrase, words, priority))
+            self._automaton = None
+
+    def __len__(self):
+        return len(self._phrases)
+
+    def compile(self):
+        """Build the automaton; called automatically on first match after ``add``."""
+        with self._lock:
+            if self._automaton is None:
+                self._automaton = self._build()
+            return self._automaton
+
+    def _build(self):
+        goto = [{}]
+        outputs = [[]]
+        for index, (_, _, words, _) in enumerate(self._phrases):
+            node = 0
+            for word in words:
+                child = goto[node].get(word)
+                if child is None:
+                    child = goto[node][word] = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                node = child
+            outputs[node].append(index)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and word not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(word, 0)
+                outputs[child] = outputs[child] + outputs[fail[child]]
+        return goto, fail, outputs
+
+    def find_all(self, text):
+        """Return every phrase occurrence in ``text`` as a list of ``Match``."""
+        goto, fail, outputs = self._automaton or self.compile()
+        tokens = list(tokenize(text))
+        matches = []
+        node = 0
+        for position, (word, _, end) in enumerate(tokens):
+            while node and word not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(word, 0)
+            for index in outputs[node]:
+                intent, phrase, words, priority = self._phrases[index]
+                start = tokens[position - len(words) + 1][1]
+                matches.append(Match(intent, phrase, start, end, priority))
+        return matches
+
+    def match(self, text):
+        """Return the best ``Match`` for ``text``, or None."""
+        matches = self.find_all(text)
+        if not matches:
+            return None
+        return min(matches, key=lambda m: (-m.priority, m.start, m.start - m.end))
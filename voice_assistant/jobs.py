@@ -0,0 +1,135 @@
+"""In-process background jobs and periodic tasks.
+
+``JobQueue`` runs submitted functions on a fixed pool of worker threads and
+keeps their outcome for ``ttl`` seconds so clients can poll, or long-poll,
+for it by id. Jobs submitted with the same ``key`` while one is still pending
+share that job. ``Scheduler`` runs housekeeping functions at fixed intervals
+on a daemon thread.
+"""
+import queue
+import threading
+import time
+import uuid
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class Job:
+    def __init__(self, function, args, key=None):
+        self.id = uuid.uuid4().hex
+        self.function = function
+        self.args = args
+        self.key = key
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the job has finished or ``timeout`` passes; return whether it finished."""
+        return self._done.wait(timeout)
+
+
+class JobQueue:
+    def __init__(self, workers=4, ttl=600, name='jobs'):
+        self.ttl = ttl
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._pending = {}  # key -> job not yet finished
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f'{name}-{i}', daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, function, *args, key=None):
+        """Queue ``function(*args)`` and return its ``Job``."""
+        with self._lock:
+            if key is not None and key in self._pending:
+                return self._pending[key]
+            job = Job(function, args, key)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._pending[key] = job
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            job.status = RUNNING
+            try:
+                job.result = job.function(*job.args)
+                job.status = DONE
+            except Exception as e:
+                job.error = str(e)
+                job.status = FAILED
+            job.finished = time.time()
+            with self._lock:
+                if job.key is not None and self._pending.get(job.key) is job:
+                    del self._pending[job.key]
+            job._done.set()
+            self._queue.task_done()
+
+    def prune(self, now=None):
+        """Forget jobs that finished more than ``ttl`` seconds ago; return how many."""
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished is not None and now - job.finished > self.ttl]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    def stats(self):
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        counts['backlog'] = self._queue.qsize()
+        return counts
+
+
+class Scheduler:
+    def __init__(self, logger=None):
+        self.logger = logger
+        self._tasks = []  # [interval, function, next_run]
+        self._stop = threading.Event()
+        self._thread = None
+
+    def every(self, interval, function):
+        """Run ``function()`` every ``interval`` seconds, first after one interval."""
+        self._tasks.append([interval, function, time.monotonic() + interval])
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for task in self._tasks:
+                interval, function, next_run = task
+                if now >= next_run:
+                    task[2] = now + interval
+                    try:
+                        function()
+                    except Exception as e:
+                        if self.logger:
+                            self.logger.error(f"Scheduled task {function.__name__} failed: {str(e)}")
+            wait = min((task[2] for task in self._tasks), default=now + 1) - time.monotonic()
+            self._stop.wait(max(0.01, wait))
@@ -0,0 +1,192 @@
+"""In-process request metrics in the Prometheus text format.
+
+Counters and histograms are plain objects guarded by a lock. ``stage()``
+times a block into the stage histogram and, when called while a request is
+being timed, into that request's breakdown, which is written as one JSON
+line per request by the timing log. The breakdown lives in a context
+variable, so stages run through ``asyncio.to_thread`` are attributed to the
+request that started them.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_stages = contextvars.ContextVar('stages', default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def collect(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_labels(self.labelnames, key)} {value}' for key, value in items]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def collect(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, [("le", le)])} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {total!r}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {count}')
+        return lines
+
+
+class FunctionMetric(Metric):
+    """Metric read from a callback at scrape time.
+
+    The callback returns a number, or a dict of label-value tuples to numbers.
+    """
+
+    def __init__(self, name, documentation, function, labelnames=(), kind='gauge'):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+        self.kind = kind
+
+    def collect(self):
+        samples = self.function()
+        if not isinstance(samples, dict):
+            samples = {(): samples}
+        return [f'{self.name}{_labels(self.labelnames, key)} {value}' for key, value in sorted(samples.items())]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric {metric.name} is already registered.')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(Counter(
+    'voice_requests_total', 'HTTP requests handled, by endpoint, method and status.',
+    ('endpoint', 'method', 'status'),
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'voice_request_duration_seconds', 'HTTP request latency, by endpoint.', ('endpoint',),
+))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'voice_stage_duration_seconds',
+    'Time spent in each stage: upload, calibrate, record, recognize, stream, recognize_wait, '
+    'command, weather, news, reminder, synthesize.', ('stage',),
+))
+EXTERNAL_SECONDS = REGISTRY.register(Histogram(
+    'voice_external_request_duration_seconds', 'Latency of calls to external APIs (cache misses only).',
+    ('api', 'outcome'),
+))
+RECOGNITION_FAILURES = REGISTRY.register(Counter(
+    'voice_recognition_failures_total', 'Speech recognition failures, by backend and reason.',
+    ('backend', 'reason'),
+))
+INTENTS = REGISTRY.register(Counter(
+    'voice_intents_total', 'Commands handled, by matched intent.', ('intent',),
+))
+
+
+def start_request():
+    """Begin collecting a stage breakdown for the current request."""
+    _stages.set({})
+
+
+def finish_request():
+    """Stop collecting and return the breakdown as ``{stage: seconds}``."""
+    stages = _stages.get()
+    _stages.set(None)
+    return stages or {}
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as stage ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        stages = _stages.get()
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + elapsed
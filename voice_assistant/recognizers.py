@@ -0,0 +1,155 @@
+"""Speech recognition backends.
+
+The backend is chosen with ``SPEECH_RECOGNIZER``:
+
+- ``google``: Google Web Speech through ``speech_recognition`` (network).
+- ``vosk``: offline Kaldi models; needs ``pip install vosk`` and a model
+  directory in ``VOSK_MODEL_PATH``.
+- ``sphinx``: offline CMU PocketSphinx; needs ``pip install pocketsphinx``.
+- ``fixed``: a local stand-in for tests and benchmarks that returns
+  ``RECOGNIZER_TEXT`` for any audio louder than silence.
+
+Backends are created once per process and reused; offline models are loaded
+on first use, under a lock, and shared by all requests.
+"""
+import json
+import os
+import threading
+
+import speech_recognition as sr
+
+from vad import rms
+
+# Offline engines are configured for this rate and audio is converted to it.
+MODEL_SAMPLE_RATE = 16000
+
+
+class BaseRecognizer:
+    name = None
+
+    def recognize(self, audio_data):
+        """Return the transcript of ``audio_data`` (an ``sr.AudioData``).
+
+        Raises ``sr.UnknownValueError`` when nothing was understood and
+        ``sr.RequestError`` when the engine itself failed.
+        """
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Load anything expensive ahead of the first request."""
+
+
+class GoogleRecognizer(BaseRecognizer):
+    name = 'google'
+
+    def __init__(self):
+        self._recognizer = sr.Recognizer()
+
+    def recognize(self, audio_data):
+        return self._recognizer.recognize_google(audio_data)
+
+
+class _ModelRecognizer(BaseRecognizer):
+    """Backend whose model is loaded once and shared by all threads."""
+
+    def __init__(self):
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load_model(self):
+        raise NotImplementedError
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    def warm_up(self):
+        self.model
+
+    @staticmethod
+    def _pcm(audio_data):
+        return audio_data.get_raw_data(convert_rate=MODEL_SAMPLE_RATE, convert_width=2)
+
+
+class VoskRecognizer(_ModelRecognizer):
+    name = 'vosk'
+
+    def __init__(self, model_path=None):
+        super().__init__()
+        self.model_path = model_path or os.getenv('VOSK_MODEL_PATH', 'model')
+
+    def _load_model(self):
+        try:
+            import vosk
+        except ImportError:
+            raise sr.RequestError('The vosk backend needs the vosk package: pip install vosk')
+        if not os.path.isdir(self.model_path):
+            raise sr.RequestError(f'Vosk model not found at {self.model_path}; set VOSK_MODEL_PATH.')
+        vosk.SetLogLevel(-1)
+        return vosk.Model(self.model_path)
+
+    def recognize(self, audio_data):
+        import vosk
+
+        recognizer = vosk.KaldiRecognizer(self.model, MODEL_SAMPLE_RATE)
+        recognizer.AcceptWaveform(self._pcm(audio_data))
+        text = json.loads(recognizer.FinalResult()).get('text', '')
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class SphinxRecognizer(_ModelRecognizer):
+    name = 'sphinx'
+
+    def _load_model(self):
+        try:
+            from pocketsphinx import Decoder
+        except ImportError:
+            raise sr.RequestError('The sphinx backend needs the pocketsphinx package: pip install pocketsphinx')
+        return Decoder(samprate=MODEL_SAMPLE_RATE)
+
+    def recognize(self, audio_data):
+        decoder = self.model
+        # A decoder holds one utterance at a time.
+        with self._lock:
+            decoder.start_utt()
+            decoder.process_raw(self._pcm(audio_data), full_utt=True)
+            decoder.end_utt()
+            hypothesis = decoder.hyp()
+        if hypothesis is None or not hypothesis.hypstr:
+            raise sr.UnknownValueError()
+        return hypothesis.hypstr
+
+
+class FixedRecognizer(BaseRecognizer):
+    name = 'fixed'
+
+    def __init__(self, text=None, min_rms=300):
+        self.text = text if text is not None else os.getenv('RECOGNIZER_TEXT', 'hello')
+        self.min_rms = min_rms
+
+    def recognize(self, audio_data):
+        if rms(audio_data.get_raw_data(convert_width=2), 2) < self.min_rms:
+            raise sr.UnknownValueError()
+        return self.text
+
+
+RECOGNIZERS = {cls.name: cls for cls in (GoogleRecognizer, VoskRecognizer, SphinxRecognizer, FixedRecognizer)}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_recognizer(name):
+    """Return the shared backend instance called ``name``."""
+    if name not in RECOGNIZERS:
+        raise ValueError(f'Unknown speech recognizer {name!r}; choose from {", ".join(sorted(RECOGNIZERS))}.')
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = RECOGNIZERS[name]()
+        return _instances[name]
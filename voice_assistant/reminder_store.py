@@ -0,0 +1,118 @@
+"""SQLite-backed reminder storage.
+
+Replaces rewriting the whole ``reminders.json`` on every insert. Each insert
+is a single-row transaction, reads are paginated through an index on the
+reminder time, and every thread gets its own connection so the threaded
+development server can write concurrently without losing reminders.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    text TEXT NOT NULL,
+    time TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reminders_time ON reminders (time, id);
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    imported_at TEXT NOT NULL
+);
+'''
+
+
+class ReminderStore:
+    def __init__(self, path, logger=None):
+        self.path = path
+        self.logger = logger
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    def add(self, text, time=None):
+        """Store a reminder and return it as a dict."""
+        time = time or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._transaction() as conn:
+            cursor = conn.execute('INSERT INTO reminders (text, time) VALUES (?, ?)', (text, time))
+        return {'id': cursor.lastrowid, 'text': text, 'time': time}
+
+    def list(self, limit=100, offset=0):
+        """Return reminders ordered by time, oldest first."""
+        rows = self._connection().execute(
+            'SELECT id, text, time FROM reminders ORDER BY time, id LIMIT ? OFFSET ?',
+            (limit, offset),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        return self._connection().execute('SELECT COUNT(*) FROM reminders').fetchone()[0]
+
+    def clear(self):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM reminders')
+
+    def import_json(self, json_path):
+        """Import reminders from the old JSON file once; return how many were added.
+
+        The file is left in place and recorded as imported, so restarting the
+        app does not duplicate its reminders. A file that cannot be read, is
+        not a list, or holds entries that are not reminder objects is logged
+        and skipped rather than stopping the app from starting.
+        """
+        if not os.path.exists(json_path):
+            return 0
+        key = os.path.abspath(json_path)
+        try:
+            with open(json_path, 'r') as f:
+                reminders = json.load(f)
+        except (OSError, ValueError) as e:
+            self._warn(f"Could not read reminders from {json_path}: {str(e)}")
+            reminders = []
+        if not isinstance(reminders, list):
+            self._warn(f"Ignoring {json_path}: expected a list of reminders, got {type(reminders).__name__}")
+            reminders = []
+        rows = [(r['text'], r['time']) for r in reminders
+                if isinstance(r, dict) and r.get('text') and r.get('time')]
+        if len(rows) < len(reminders):
+            self._warn(f"Skipped {len(reminders) - len(rows)} malformed reminders in {json_path}")
+        with self._transaction() as conn:
+            if conn.execute('SELECT 1 FROM imports WHERE path = ?', (key,)).fetchone():
+                return 0
+            conn.executemany('INSERT INTO reminders (text, time) VALUES (?, ?)', rows)
+            conn.execute('INSERT INTO imports (path, imported_at) VALUES (?, ?)',
+                         (key, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        return len(rows)
+
+    def _warn(self, message):
+        if self.logger:
+            self.logger.warning(message)
+
+
+class _Transaction:
+    """``with`` block that runs its statements in one immediate transaction."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
@@ -0,0 +1,887 @@
+"""Tests for the voice assistant.
+
+Run from this directory with ``python -m unittest tests``. External APIs are
+replaced by a stub HTTP server on localhost, and speech recognition by the
+local ``fixed`` backend.
+"""
+import json
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+import unittest
+import wave
+from io import BytesIO
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault('PRERENDER_AUDIO', '0')
+os.environ.setdefault('REMINDERS_DB', os.path.join(_tmp, 'reminders.db'))
+os.environ.setdefault('WEATHER_API_KEY', 'test')
+os.environ.setdefault('NEWS_API_KEY', 'test')
+os.environ.setdefault('SPEECH_RECOGNIZER', 'fixed')
+os.environ.setdefault('TIMING_LOG', '0')
+
+import app  # noqa: E402
+import metrics  # noqa: E402
+import tts  # noqa: E402
+from audio_cache import AudioCache  # noqa: E402
+from fetchers import CachedFetcher, TTLCache  # noqa: E402
+from intents import IntentMatcher  # noqa: E402
+from jobs import DONE, FAILED, JobQueue, Scheduler  # noqa: E402
+from recognizers import RECOGNIZERS, FixedRecognizer, VoskRecognizer, _ModelRecognizer, get_recognizer  # noqa: E402
+from reminder_store import ReminderStore  # noqa: E402
+from vad import RingBuffer, VoiceActivityDetector, open_pcm_stream  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with server.lock:
+            server.requests.append((url.path, query))
+            server.clients.add(self.client_address)
+        time.sleep(server.delay)
+        status, body = server.routes.get(url.path, (404, {'message': 'not found'}))
+        if callable(body):
+            body = body(query)
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """Local stand-in for OpenWeatherMap and NewsAPI."""
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.httpd.lock = threading.Lock()
+        self.httpd.requests = []
+        self.httpd.clients = set()
+        self.httpd.delay = 0
+        self.httpd.routes = {
+            '/weather': (200, lambda q: {
+                'cod': 200,
+                'weather': [{'description': 'clear sky'}],
+                'main': {'temp': 30, 'feels_like': 33},
+                'name': q.get('q'),
+            }),
+            '/news': (200, {'status': 'ok', 'articles': [{'title': 'First'}, {'title': 'Second'}]}),
+            '/broken': (500, {'message': 'boom'}),
+        }
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def url(self, path):
+        host, port = self.httpd.server_address
+        return f'http://{host}:{port}{path}'
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class StubServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.addCleanup(self.server.close)
+
+
+class AudioCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def writer(self, content=b'x' * 10, delay=0):
+        calls = []
+
+        def synthesize(path):
+            calls.append(path)
+            time.sleep(delay)
+            with open(path, 'wb') as f:
+                f.write(content)
+        return synthesize, calls
+
+    def test_concurrent_misses_synthesize_once(self):
+        cache = AudioCache(self.directory, max_bytes=1000, max_age=3600)
+        synthesize, calls = self.writer(delay=0.1)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_create('hello', 'en', synthesize)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({filename for filename, _ in results}, {AudioCache.filename('hello', 'en')})
+        self.assertEqual(sorted(cached for _, cached in results), [False] + [True] * 7)
+        self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (7, 1))
+        self.assertEqual(os.listdir(self.directory), [AudioCache.filename('hello', 'en')])
+
+    def test_failed_synthesis_is_not_cached(self):
+        cache = AudioCache(self.directory, max_bytes=1000, max_age=3600)
+
+        def fail(path):
+            with open(path, 'wb') as f:
+                f.write(b'partial')
+            raise RuntimeError('tts down')
+        with self.assertRaises(RuntimeError):
+            cache.get_or_create('hello', 'en', fail)
+        self.assertEqual(os.listdir(self.directory), [])
+        synthesize, calls = self.writer()
+        self.assertEqual(cache.get_or_create('hello', 'en', synthesize)[1], False)
+        self.assertEqual(len(calls), 1)
+
+    def test_least_recently_used_clips_are_evicted_over_max_bytes(self):
+        cache = AudioCache(self.directory, max_bytes=25, max_age=3600)
+        synthesize, _ = self.writer()
+        cache.get_or_create('one', 'en', synthesize)
+        cache.get_or_create('two', 'en', synthesize)
+        cache.get('one')
+        cache.get_or_create('three', 'en', synthesize)
+        self.assertIsNone(cache.get('two'))
+        self.assertIsNotNone(cache.get('one'))
+        self.assertEqual(cache.stats()['bytes'], 20)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertFalse(os.path.exists(cache.path(AudioCache.filename('two', 'en'))))
+
+    def test_clips_unused_for_max_age_are_evicted(self):
+        cache = AudioCache(self.directory, max_bytes=1000, max_age=60)
+        synthesize, _ = self.writer()
+        cache.get_or_create('old', 'en', synthesize)
+        cache.get_or_create('new', 'en', synthesize)
+        cache._index[AudioCache.filename('old', 'en')][1] -= 120
+        self.assertEqual(cache.evict(), [AudioCache.filename('old', 'en')])
+        self.assertEqual(len(cache.evict(now=time.time() + 61)), 1)
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_add_replaces_the_size_of_a_rewritten_clip(self):
+        cache = AudioCache(self.directory, max_bytes=1000, max_age=3600)
+        filename = AudioCache.filename('hello', 'en')
+        for size in (10, 30):
+            with open(cache.path(filename), 'wb') as f:
+                f.write(b'x' * size)
+            cache.add(filename)
+        self.assertEqual(cache.stats(), {'entries': 1, 'bytes': 30, 'hits': 0, 'misses': 0, 'evictions': 0})
+        self.assertEqual(AudioCache(self.directory, 1000, 3600).get('hello'), filename)
+
+
+class CannedResponseTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = AudioCache(tempfile.mkdtemp(), 10 ** 6, 3600)
+        self.render = mock.Mock(side_effect=lambda text, lang: text.encode('utf-8'))
+        patches = [mock.patch.object(app, 'audio_cache', self.cache), mock.patch.object(tts, '_render', self.render)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client = app.app.test_client()
+
+    def test_prerender_caches_every_canned_response(self):
+        app.prerender_canned_responses()
+        for text in app.CANNED_RESPONSES:
+            self.assertIsNotNone(self.cache.get(text), text)
+        response = self.client.post('/respond', json={'text': 'Hello!'})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['response'], app.GREETING_RESPONSE)
+        self.assertTrue(data['cached'])
+        self.assertEqual(data['audio_url'], f"static/audio/{AudioCache.filename(app.GREETING_RESPONSE, 'en')}")
+
+    def test_respond_synthesizes_uncached_replies(self):
+        data = self.client.post('/respond', json={'text': 'what is the date'}).get_json()
+        self.assertTrue(data['response'].startswith('Today is'))
+        self.assertFalse(data['cached'])
+        self.assertTrue(os.path.exists(self.cache.path(data['audio_url'].rsplit('/', 1)[1])))
+        again = self.client.post('/respond', json={'text': 'what is the date'}).get_json()
+        self.assertTrue(again['cached'])
+
+    def test_respond_requires_text(self):
+        self.assertEqual(self.client.post('/respond', json={}).status_code, 400)
+        self.assertEqual(self.client.post('/respond', json={'text': '  '}).status_code, 400)
+
+
+class IntentMatcherTests(unittest.TestCase):
+    def test_phrases_match_whole_words_only(self):
+        for text in ('this is it', 'which one', 'hill walking', 'thistle'):
+            self.assertIsNone(app.INTENTS.match(text), text)
+        self.assertEqual(app.INTENTS.match('oh hi there').intent, 'greeting')
+        self.assertEqual(app.INTENTS.match("Hi, what's new?").intent, 'greeting')
+
+    def test_priority_beats_position(self):
+        self.assertEqual(app.INTENTS.match("hello what's the weather").intent, 'weather')
+        self.assertEqual(app.INTENTS.match('hi remind me to stretch').intent, 'reminder')
+        self.assertEqual(app.INTENTS.match('thanks, and what time is it').intent, 'time')
+
+    def test_equal_priorities_prefer_earliest_then_longest(self):
+        matcher = IntentMatcher()
+        matcher.add('a', ['red'], priority=1)
+        matcher.add('b', ['blue', 'blue sky'], priority=1)
+        self.assertEqual(matcher.match('blue then red').intent, 'b')
+        self.assertEqual(matcher.match('red then blue').intent, 'a')
+        self.assertEqual(matcher.match('a blue sky').phrase, 'blue sky')
+
+    def test_offsets_and_overlapping_phrases(self):
+        matcher = IntentMatcher()
+        matcher.add('x', ['set a reminder', 'a reminder to'])
+        matches = matcher.find_all('Set a set a Reminder to go')
+        self.assertEqual(sorted((m.phrase, m.start, m.end) for m in matches),
+                         [('a reminder to', 10, 23), ('set a reminder', 6, 20)])
+
+    def test_phrase_without_words_is_rejected(self):
+        with self.assertRaises(ValueError):
+            IntentMatcher().add('x', ['...'])
+
+    def test_unmatched_command_gets_the_fallback_reply(self):
+        self.assertIn("not sure how to help", app.handle_command('which is this'))
+
+
+class SetReminderTests(unittest.TestCase):
+    def setUp(self):
+        store = ReminderStore(os.path.join(tempfile.mkdtemp(), 'reminders.db'))
+        patch = mock.patch.object(app, 'reminder_store', store)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.store = store
+
+    def stored(self):
+        return [r['text'] for r in self.store.list()]
+
+    def test_longest_prefix_is_stripped(self):
+        for command, expected in [
+            ('please remind me to call mom', 'call mom'),
+            ('Remind me the oven is on', 'the oven is on'),
+            ('set a reminder for the dentist', 'the dentist'),
+            ('create a reminder to water plants', 'water plants'),
+        ]:
+            self.assertEqual(app.handle_command(command), f'Reminder set successfully: {expected}')
+        self.assertEqual(sorted(self.stored()), sorted(['call mom', 'the oven is on', 'the dentist', 'water plants']))
+
+    def test_reminder_word_fallback(self):
+        self.assertEqual(app.set_reminder('add a reminder about taxes'), 'Reminder set successfully: taxes')
+
+    def test_missing_text_is_not_stored(self):
+        self.assertIn("couldn't understand", app.handle_command('remind me'))
+        self.assertEqual(self.stored(), [])
+
+
+class ReminderStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.logger = mock.Mock()
+        self.store = ReminderStore(os.path.join(self.directory, 'reminders.db'), self.logger)
+        self.json_path = os.path.join(self.directory, 'reminders.json')
+
+    def write_json(self, content):
+        with open(self.json_path, 'w') as f:
+            f.write(content if isinstance(content, str) else json.dumps(content))
+
+    def test_list_is_ordered_by_time_and_paginated(self):
+        for text, when in [('c', '2024-01-03 09:00:00'), ('a', '2024-01-01 09:00:00'),
+                           ('b2', '2024-01-02 09:00:00'), ('b1', '2024-01-02 09:00:00')]:
+            self.store.add(text, when)
+        # Equal times keep insertion order.
+        self.assertEqual([r['text'] for r in self.store.list()], ['a', 'b2', 'b1', 'c'])
+        self.assertEqual([r['text'] for r in self.store.list(limit=2, offset=1)], ['b2', 'b1'])
+        self.assertEqual(self.store.list(limit=2, offset=4), [])
+        self.assertEqual(self.store.count(), 4)
+
+    def test_json_is_imported_once(self):
+        reminders = [{'text': 'call mom', 'time': '2024-01-01 09:00:00'},
+                     {'text': 'buy milk', 'time': '2024-01-02 09:00:00'}]
+        self.write_json(reminders)
+        self.assertEqual(self.store.import_json(self.json_path), 2)
+        self.assertEqual(self.store.import_json(self.json_path), 0)
+        restarted = ReminderStore(self.store.path)
+        self.assertEqual(restarted.import_json(self.json_path), 0)
+        self.assertTrue(os.path.exists(self.json_path))
+        self.assertEqual([(r['text'], r['time']) for r in restarted.list()],
+                         [(r['text'], r['time']) for r in reminders])
+        self.assertEqual(self.store.import_json(os.path.join(self.directory, 'missing.json')), 0)
+
+    def test_malformed_entries_are_skipped_with_a_warning(self):
+        self.write_json([{'text': 'call mom', 'time': '2024-01-01 09:00:00'}, 'buy milk', ['x'], {'text': ''}])
+        self.assertEqual(self.store.import_json(self.json_path), 1)
+        self.assertEqual([r['text'] for r in self.store.list()], ['call mom'])
+        self.logger.warning.assert_called_once()
+
+    def test_top_level_that_is_not_a_list_is_ignored(self):
+        for content in ({'text': 'call mom', 'time': '2024-01-01 09:00:00'}, ['a', 'b'], 'not json', '"text"'):
+            store = ReminderStore(os.path.join(tempfile.mkdtemp(), 'reminders.db'), self.logger)
+            self.write_json(content)
+            self.assertEqual(store.import_json(self.json_path), 0)
+            self.assertEqual(store.count(), 0)
+        self.assertTrue(self.logger.warning.called)
+
+
+class TTLCacheTests(unittest.TestCase):
+    def test_fresh_entries_are_served_from_cache(self):
+        cache = TTLCache(ttl=60)
+        calls = []
+        loader = lambda: calls.append(1) or len(calls)
+        self.assertEqual(cache.get('a', loader), 1)
+        self.assertEqual(cache.get('a', loader), 1)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_stale_entry_is_returned_while_refreshing(self):
+        cache = TTLCache(ttl=0.05, stale_ttl=60)
+        refreshed = threading.Event()
+        values = iter(['old', 'new'])
+
+        def loader():
+            value = next(values)
+            if value == 'new':
+                refreshed.set()
+            return value
+
+        cache.get('a', loader)
+        time.sleep(0.06)
+        self.assertEqual(cache.get('a', loader), 'old')
+        self.assertTrue(refreshed.wait(2))
+        for _ in range(100):
+            if cache.get('a', loader) == 'new':
+                break
+            time.sleep(0.01)
+        self.assertEqual(cache.get('a', loader), 'new')
+        self.assertGreaterEqual(cache.stats()['stale_hits'], 1)
+
+    def test_expired_entry_is_reloaded(self):
+        cache = TTLCache(ttl=0.01)
+        calls = []
+        cache.get('a', lambda: calls.append(1))
+        time.sleep(0.02)
+        cache.get('a', lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+
+    def test_concurrent_misses_share_one_load(self):
+        cache = TTLCache(ttl=60)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'value'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('a', loader))) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 10)
+
+    def test_errors_are_not_cached(self):
+        cache = TTLCache(ttl=60)
+
+        def failing():
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            cache.get('a', failing)
+        self.assertEqual(cache.get('a', lambda: 'ok'), 'ok')
+
+
+class CachedFetcherTests(StubServerTestCase):
+    def test_repeated_queries_hit_the_api_once(self):
+        fetcher = CachedFetcher(self.server.url('/weather'), ttl=60, params={'appid': 'key'})
+        first = fetcher.fetch(q='Pune')
+        second = fetcher.fetch(q='Pune')
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.requests, [('/weather', {'appid': 'key', 'q': 'Pune'})])
+
+    def test_queries_are_cached_separately(self):
+        fetcher = CachedFetcher(self.server.url('/weather'), ttl=60)
+        self.assertEqual(fetcher.fetch(q='Pune')['name'], 'Pune')
+        self.assertEqual(fetcher.fetch(q='Surat')['name'], 'Surat')
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_connections_are_reused(self):
+        fetcher = CachedFetcher(self.server.url('/weather'), ttl=60)
+        for city in ['Pune', 'Surat', 'Delhi']:
+            fetcher.fetch(q=city)
+        self.assertEqual(len(self.server.httpd.clients), 1)
+
+    def test_concurrent_misses_send_one_request(self):
+        self.server.httpd.delay = 0.1
+        fetcher = CachedFetcher(self.server.url('/news'), ttl=60)
+        threads = [threading.Thread(target=fetcher.fetch, kwargs={'country': 'us'}) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_http_errors_raise_and_are_not_cached(self):
+        fetcher = CachedFetcher(self.server.url('/broken'), ttl=60)
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                fetcher.fetch()
+        self.assertEqual(len(self.server.requests), 2)
+
+
+class WeatherAndNewsTests(StubServerTestCase):
+    def setUp(self):
+        super().setUp()
+        for name, path in [('weather_fetcher', '/weather'), ('news_fetcher', '/news')]:
+            fetcher = getattr(app, name)
+            original = fetcher.url
+            fetcher.url = self.server.url(path)
+            fetcher.cache.clear()
+            self.addCleanup(setattr, fetcher, 'url', original)
+            self.addCleanup(fetcher.cache.clear)
+
+    def test_weather_reply_is_cached(self):
+        reply = app.get_weather('Pune')
+        self.assertEqual(reply, 'The weather in Pune is clear sky with a temperature of 30°C, feels like 33°C.')
+        self.assertEqual(app.get_weather('Pune'), reply)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_news_reply(self):
+        self.assertEqual(app.get_news(), 'Here are the top headlines: First ... Second')
+
+    def test_api_failure_reply(self):
+        app.weather_fetcher.url = self.server.url('/broken')
+        self.assertEqual(app.get_weather('Pune'), "Couldn't fetch the weather information.")
+
+
+class SplitTextTests(unittest.TestCase):
+    def test_short_text_is_one_part(self):
+        self.assertEqual(tts.split_text('Hi there!'), ['Hi there!'])
+
+    def test_sentences_and_headlines_are_split(self):
+        self.assertEqual(
+            tts.split_text('Hi there! How are you? Here: First ... Second'),
+            ['Hi there!', 'How are you?', 'Here: First', 'Second'],
+        )
+
+    def test_parts_respect_the_limit(self):
+        text = ' '.join(['word'] * 100)
+        parts = tts.split_text(text, max_chars=30)
+        self.assertTrue(all(len(part) <= 30 for part in parts))
+        self.assertEqual(' '.join(parts), text)
+
+
+def tone(seconds, amplitude=8000, rate=16000, frequency=440):
+    count = int(seconds * rate)
+    return struct.pack(f'<{count}h', *(int(amplitude * math.sin(2 * math.pi * frequency * i / rate)) for i in range(count)))
+
+
+def silence(seconds, rate=16000):
+    return bytes(int(seconds * rate) * 2)
+
+
+def wav_header(rate=16000):
+    return (b'RIFF' + struct.pack('<I', 0) + b'WAVE' + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 1, rate, rate * 2, 2, 16)
+            + b'data' + struct.pack('<I', 0))
+
+
+def wav_file(pcm, rate=16000):
+    buffer = BytesIO()
+    with wave.open(buffer, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class PipelineTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        patches = [
+            mock.patch.object(app, 'audio_cache', AudioCache(directory, 10 ** 6, 3600)),
+            mock.patch.object(tts, '_render', side_effect=lambda text, lang: text.encode('utf-8')),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client = app.app.test_client()
+
+    def post(self, data=None):
+        data = wav_file(silence(0.3) + tone(0.5)) if data is None else data
+        return self.client.post('/pipeline', data={'audio_data': (BytesIO(data), 'audio.wav')})
+
+    def test_reply_includes_synthesized_audio(self):
+        with mock.patch.object(app, 'speech_recognizer', FixedRecognizer('Hello there')):
+            response = self.post()
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['recognized_text'], 'Hello there')
+        self.assertEqual(data['response'], app.GREETING_RESPONSE)
+        self.assertFalse(data['cached'])
+        path = os.path.join(app.audio_cache.directory, os.path.basename(data['audio_url']))
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'Hi there!How can I help you today?')
+
+    def test_repeated_reply_is_cached(self):
+        with mock.patch.object(app, 'speech_recognizer', FixedRecognizer('thanks')):
+            self.post()
+            self.assertTrue(self.post().get_json()['cached'])
+
+    def test_unrecognized_audio(self):
+        response = self.post(wav_file(silence(1)))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Could not understand audio', response.get_json()['response'])
+
+    def test_missing_audio(self):
+        self.assertEqual(self.client.post('/pipeline').status_code, 400)
+        self.assertEqual(self.post(b'').status_code, 400)
+
+
+class RingBufferTests(unittest.TestCase):
+    def test_keeps_the_most_recent_bytes(self):
+        ring = RingBuffer(5)
+        ring.write(b'abc')
+        ring.write(b'defg')
+        self.assertEqual(len(ring), 5)
+        self.assertEqual(ring.read(), b'cdefg')
+        self.assertEqual(ring.read(), b'')
+
+    def test_oversized_write(self):
+        ring = RingBuffer(3)
+        ring.write(b'abcdef')
+        self.assertEqual(ring.read(), b'def')
+
+
+class VoiceActivityDetectorTests(unittest.TestCase):
+    def test_speech_segments_are_separated_by_silence(self):
+        vad = VoiceActivityDetector(16000)
+        audio = silence(0.5) + tone(0.6) + silence(1.0) + tone(0.4) + silence(0.2)
+        segments = []
+        for i in range(0, len(audio), 1000):
+            segments.extend(vad.feed(audio[i:i + 1000]))
+        final = vad.flush()
+        if final:
+            segments.append(final)
+        self.assertEqual(len(segments), 2)
+        # Each segment carries pre-roll before the speech and hangover after it.
+        self.assertGreater(len(segments[0]), len(tone(0.6)))
+        self.assertLess(len(segments[0]), len(tone(0.6) + silence(1.0)))
+        self.assertAlmostEqual(vad.speech_seconds, 1.0, delta=0.1)
+
+    def test_silence_produces_no_segments(self):
+        vad = VoiceActivityDetector(16000)
+        self.assertEqual(vad.feed(silence(2)), [])
+        self.assertIsNone(vad.flush())
+
+    def test_long_speech_is_split(self):
+        vad = VoiceActivityDetector(16000, max_segment_seconds=1)
+        self.assertEqual(len(vad.feed(silence(0.3) + tone(2.5))), 2)
+
+    def test_empty_frames_are_rejected(self):
+        with self.assertRaises(ValueError):
+            VoiceActivityDetector(20)
+        with self.assertRaises(ValueError):
+            VoiceActivityDetector(-16000)
+
+    def test_wav_header_is_detected(self):
+        stream = BytesIO(wav_header(8000) + b'\x01\x02')
+        self.assertEqual(open_pcm_stream(stream, 16000), (8000, 2, 1, b''))
+        self.assertEqual(stream.read(), b'\x01\x02')
+
+    def test_raw_pcm_keeps_the_first_bytes(self):
+        self.assertEqual(open_pcm_stream(BytesIO(b'\x00' * 20), 16000), (16000, 2, 1, b'\x00' * 12))
+
+
+class StreamAudioTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app.app.test_client()
+
+    def test_each_speech_segment_is_recognized(self):
+        audio = wav_header() + silence(0.4) + tone(0.5) + silence(1.0) + tone(0.5)
+        with mock.patch.object(app, 'recognize_segment', side_effect=['what', 'time is it']) as recognize:
+            response = self.client.post('/stream_audio', data=audio, content_type='audio/wav')
+        data = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['recognized_text'], 'what time is it')
+        self.assertTrue(data['response'].startswith('The current time is'))
+        self.assertEqual(data['segments'], 2)
+        self.assertEqual(recognize.call_count, 2)
+
+    def test_silence_is_not_understood(self):
+        with mock.patch.object(app, 'recognize_segment') as recognize:
+            response = self.client.post('/stream_audio?rate=16000', data=silence(1))
+        self.assertEqual(response.status_code, 400)
+        recognize.assert_not_called()
+
+    def test_segments_use_the_configured_backend(self):
+        audio = silence(0.4) + tone(0.5) + silence(0.2)
+        with mock.patch.object(app, 'speech_recognizer', FixedRecognizer('what time is it')):
+            response = self.client.post('/stream_audio?rate=16000', data=audio)
+        self.assertEqual(response.get_json()['recognized_text'], 'what time is it')
+
+    def test_stereo_is_rejected(self):
+        header = wav_header().replace(struct.pack('<HH', 1, 1), struct.pack('<HH', 1, 2), 1)
+        self.assertEqual(self.client.post('/stream_audio', data=header).status_code, 400)
+
+
+    def test_bad_sample_rates_are_rejected(self):
+        with mock.patch.object(app, 'recognize_segment') as recognize:
+            for query in ('rate=20', 'rate=-16000', 'rate=96000'):
+                response = self.client.post(f'/stream_audio?{query}', data=tone(0.5))
+                self.assertEqual(response.status_code, 400, query)
+            response = self.client.post('/stream_audio', data=wav_header(20) + tone(0.5))
+            self.assertEqual(response.status_code, 400)
+        recognize.assert_not_called()
+
+
+class CountingRecognizer(_ModelRecognizer):
+    loads = 0
+
+    def _load_model(self):
+        CountingRecognizer.loads += 1
+        time.sleep(0.05)
+        return object()
+
+
+class RecognizerTests(unittest.TestCase):
+    def test_backends_are_shared(self):
+        self.assertIs(get_recognizer('fixed'), get_recognizer('fixed'))
+        self.assertIs(app.speech_recognizer, get_recognizer('fixed'))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_recognizer('nope')
+
+    def test_offline_backends_are_registered(self):
+        self.assertTrue({'google', 'vosk', 'sphinx', 'fixed'} <= set(RECOGNIZERS))
+
+    def test_model_is_loaded_once(self):
+        CountingRecognizer.loads = 0
+        recognizer = CountingRecognizer()
+        threads = [threading.Thread(target=recognizer.warm_up) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        recognizer.model
+        self.assertEqual(CountingRecognizer.loads, 1)
+
+    def test_missing_vosk_model_is_a_request_error(self):
+        recognizer = VoskRecognizer(model_path=os.path.join(_tmp, 'missing-model'))
+        with self.assertRaises(app.sr.RequestError):
+            recognizer.warm_up()
+
+    def test_fixed_backend_ignores_silence(self):
+        recognizer = FixedRecognizer('hi')
+        self.assertEqual(recognizer.recognize(app.sr.AudioData(tone(0.2), 16000, 2)), 'hi')
+        with self.assertRaises(app.sr.UnknownValueError):
+            recognizer.recognize(app.sr.AudioData(silence(0.2), 16000, 2))
+
+
+class JobQueueTests(unittest.TestCase):
+    def test_job_result_can_be_awaited(self):
+        jobs = JobQueue(workers=2)
+        job = jobs.submit(lambda x: x * 2, 21)
+        self.assertTrue(job.wait(2))
+        self.assertEqual((job.status, job.result), (DONE, 42))
+        self.assertIs(jobs.get(job.id), job)
+
+    def test_pending_jobs_with_the_same_key_are_shared(self):
+        jobs = JobQueue(workers=1)
+        release = threading.Event()
+        first = jobs.submit(release.wait, 2, key='a')
+        self.assertIs(jobs.submit(release.wait, 2, key='a'), first)
+        release.set()
+        first.wait(2)
+        self.assertIsNot(jobs.submit(release.wait, 2, key='a'), first)
+
+    def test_failures_are_recorded(self):
+        jobs = JobQueue(workers=1)
+
+        def fail():
+            raise RuntimeError('boom')
+
+        job = jobs.submit(fail)
+        job.wait(2)
+        self.assertEqual((job.status, job.error), (FAILED, 'boom'))
+
+    def test_finished_jobs_expire(self):
+        jobs = JobQueue(workers=1, ttl=60)
+        job = jobs.submit(lambda: None)
+        job.wait(2)
+        self.assertEqual(jobs.prune(), 0)
+        self.assertEqual(jobs.prune(now=time.time() + 61), 1)
+        self.assertIsNone(jobs.get(job.id))
+
+
+class SchedulerTests(unittest.TestCase):
+    def test_tasks_run_periodically(self):
+        scheduler = Scheduler()
+        calls = []
+        scheduler.every(0.02, lambda: calls.append(1))
+        scheduler.start()
+        self.addCleanup(scheduler.stop)
+        time.sleep(0.15)
+        self.assertGreaterEqual(len(calls), 3)
+
+
+class AudioCacheSweepTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def write(self, filename, size, age=0):
+        path = os.path.join(self.directory, filename)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+
+    def test_files_added_behind_the_cache_count_towards_the_quota(self):
+        cache = AudioCache(self.directory, max_bytes=25, max_age=3600)
+        self.write('new.mp3', 10)
+        self.write('old.mp3', 10, age=60)
+        self.write('older.mp3', 10, age=120)
+        self.assertEqual(cache.sweep(), ['older.mp3'])
+        self.assertEqual(sorted(os.listdir(self.directory)), ['new.mp3', 'old.mp3'])
+        self.assertEqual(cache.stats()['bytes'], 20)
+
+    def test_deleted_files_leave_the_index(self):
+        self.write('a.mp3', 10)
+        cache = AudioCache(self.directory, max_bytes=100, max_age=3600)
+        os.remove(os.path.join(self.directory, 'a.mp3'))
+        cache.sweep()
+        self.assertEqual(cache.stats()['entries'], 0)
+        self.assertEqual(cache.stats()['bytes'], 0)
+
+    def test_stale_temp_files_are_removed(self):
+        cache = AudioCache(self.directory, max_bytes=100, max_age=3600)
+        self.write('a.mp3.1.tmp', 10, age=7200)
+        self.write('b.mp3.2.tmp', 10)
+        cache.sweep()
+        self.assertEqual(os.listdir(self.directory), ['b.mp3.2.tmp'])
+
+
+class SpeakJobTests(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(app, 'audio_cache', AudioCache(tempfile.mkdtemp(), 10 ** 6, 3600)),
+            mock.patch.object(app, 'tts_jobs', JobQueue(workers=2)),
+            mock.patch.object(tts, '_render', side_effect=lambda text, lang: text.encode('utf-8')),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client = app.app.test_client()
+
+    def test_uncached_text_is_queued_and_can_be_long_polled(self):
+        response = self.client.post('/speak', json={'text': 'Queued speech'})
+        self.assertEqual(response.status_code, 202)
+        job = response.get_json()
+        self.assertIn(job['status'], ['queued', 'running', 'done'])
+
+        data = self.client.get(f"{job['status_url']}?wait=5").get_json()
+        self.assertEqual(data['status'], 'done')
+        self.assertTrue(data['audio_url'].startswith('static/audio/'))
+
+        cached = self.client.post('/speak', json={'text': 'Queued speech'})
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(cached.get_json(), {'audio_url': data['audio_url'], 'cached': True})
+
+    def test_failed_job(self):
+        with mock.patch.object(tts, '_render', side_effect=RuntimeError('offline')):
+            job = self.client.post('/speak', json={'text': 'Broken'}).get_json()
+            data = self.client.get(f"{job['status_url']}?wait=5").get_json()
+        self.assertEqual(data['status'], 'failed')
+        self.assertEqual(data['error'], 'Failed to generate speech')
+
+    def test_cached_speech_counts_as_a_hit(self):
+        job = self.client.post('/speak', json={'text': 'Counted speech'}).get_json()
+        self.client.get(f"{job['status_url']}?wait=5")
+        for _ in range(3):
+            self.assertEqual(self.client.post('/speak', json={'text': 'Counted speech'}).status_code, 200)
+
+        stats = self.client.get('/audio_cache').get_json()
+        self.assertEqual((stats['hits'], stats['misses']), (3, 1))
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get('/speak/jobs/nope').status_code, 404)
+
+    def test_bad_wait(self):
+        job = self.client.post('/speak', json={'text': 'Wait'}).get_json()
+        self.assertEqual(self.client.get(f"{job['status_url']}?wait=soon").status_code, 400)
+
+
+class MetricsTests(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(app, 'audio_cache', AudioCache(tempfile.mkdtemp(), 10 ** 6, 3600)),
+            mock.patch.object(tts, '_render', side_effect=lambda text, lang: text.encode('utf-8')),
+            mock.patch.object(app, 'speech_recognizer', FixedRecognizer('what time is it')),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client = app.app.test_client()
+
+    def post_audio(self, endpoint, pcm):
+        return self.client.post(endpoint, data={'audio_data': (BytesIO(wav_file(pcm)), 'audio.wav')})
+
+    def test_timing_log_breaks_the_request_into_stages(self):
+        with self.assertLogs('voice_assistant.timing', 'INFO') as logs:
+            self.post_audio('/process_audio', silence(0.3) + tone(0.5))
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((entry['endpoint'], entry['status']), ('process_audio', 200))
+        self.assertEqual(set(entry['stages_ms']), {'upload', 'calibrate', 'record', 'recognize', 'command'})
+        self.assertGreaterEqual(entry['ms'], max(entry['stages_ms'].values()))
+
+    def test_async_pipeline_stages_are_attributed_to_the_request(self):
+        with self.assertLogs('voice_assistant.timing', 'INFO') as logs:
+            self.post_audio('/pipeline', silence(0.3) + tone(0.5))
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertTrue({'recognize', 'command', 'synthesize'} <= set(entry['stages_ms']))
+
+    def test_request_and_failure_counters(self):
+        requests_before = metrics.REQUESTS.value(endpoint='process_audio', method='POST', status=400)
+        failures_before = metrics.RECOGNITION_FAILURES.value(backend=app.SPEECH_RECOGNIZER, reason='not_understood')
+        self.post_audio('/process_audio', silence(1))
+        self.assertEqual(metrics.REQUESTS.value(endpoint='process_audio', method='POST', status=400), requests_before + 1)
+        self.assertEqual(
+            metrics.RECOGNITION_FAILURES.value(backend=app.SPEECH_RECOGNIZER, reason='not_understood'),
+            failures_before + 1,
+        )
+
+    def test_metrics_endpoint(self):
+        self.client.get('/reminders')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        body = response.get_data(as_text=True)
+        for name in ['voice_requests_total{endpoint="get_reminders",method="GET",status="200"}',
+                     'voice_request_duration_seconds_bucket{endpoint="get_reminders",le="+Inf"}',
+                     'voice_audio_cache_events_total{event="hits"}',
+                     'voice_fetch_cache_events_total{api="weather",event="misses"}',
+                     'voice_tts_jobs{state="backlog"}']:
+            self.assertIn(name, body)
+
+
+class ExternalApiMetricsTests(StubServerTestCase):
+    def test_api_latency_is_recorded_for_misses_only(self):
+        fetcher = CachedFetcher(self.server.url('/weather'), ttl=60, name='stub')
+        fetcher.fetch(q='Pune')
+        fetcher.fetch(q='Pune')
+        self.assertEqual(metrics.EXTERNAL_SECONDS.count(api='stub', outcome='200'), 1)
+        with self.assertRaises(Exception):
+            CachedFetcher(self.server.url('/broken'), ttl=60, name='stub').fetch()
+        self.assertEqual(metrics.EXTERNAL_SECONDS.count(api='stub', outcome='500'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Text-to-speech with the parts of long replies synthesized in parallel.
+
+gTTS splits text longer than ``GOOGLE_TTS_MAX_CHARS`` into pieces and fetches
+them one after another. Here the text is split at sentence and word
+boundaries up front and the pieces are requested concurrently, then the MP3
+streams are joined, so a long reply costs about one round-trip instead of
+one per piece.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from gtts import gTTS
+
+MAX_CHARS = gTTS.GOOGLE_TTS_MAX_CHARS
+MAX_PARALLEL = 8
+
+_SENTENCE_END = re.compile(r'(?<=[.!?…])\s+|\s+\.\.\.\s+')
+
+_executor = ThreadPoolExecutor(max_workers=MAX_PARALLEL, thread_name_prefix='tts')
+
+
+def split_text(text, max_chars=MAX_CHARS):
+    """Split ``text`` into pieces of at most ``max_chars``, preferring sentence ends."""
+    parts = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        current = ''
+        for word in sentence.split():
+            if current and len(current) + 1 + len(word) > max_chars:
+                parts.append(current)
+                current = word
+            else:
+                current = f'{current} {word}' if current else word
+        if current:
+            parts.append(current)
+    return parts
+
+
+def _render(text, lang):
+    buffer = BytesIO()
+    gTTS(text=text, lang=lang).write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def save(text, lang, path):
+    """Synthesize ``text`` into an MP3 file at ``path``."""
+    parts = split_text(text) or [text]
+    if len(parts) == 1:
+        audio = [_render(parts[0], lang)]
+    else:
+        audio = list(_executor.map(_render, parts, [lang] * len(parts)))
+    with open(path, 'wb') as f:
+        for chunk in audio:
+            f.write(chunk)
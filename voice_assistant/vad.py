@@ -0,0 +1,178 @@
+"""Energy-based voice activity detection over a stream of PCM audio.
+
+Audio arrives in arbitrary chunks and is cut into fixed frames. A frame
+counts as speech when its RMS energy exceeds a threshold derived from the
+noise floor measured over the first frames. A short ring buffer keeps the
+audio just before speech starts so word onsets are not clipped, and a
+segment ends after ``hangover_ms`` of silence. Only speech segments are
+kept in memory; silence is dropped as it streams past.
+"""
+import math
+import struct
+import sys
+from array import array
+
+SAMPLE_TYPES = {2: 'h', 4: 'i'}
+
+
+class RingBuffer:
+    """Fixed-capacity byte buffer that keeps the most recent bytes written."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def write(self, data):
+        if len(data) >= self.capacity:
+            self._buffer[:] = data[-self.capacity:]
+            self._start = 0
+            self._size = self.capacity
+            return
+        end = (self._start + self._size) % self.capacity
+        first = min(len(data), self.capacity - end)
+        self._buffer[end:end + first] = data[:first]
+        self._buffer[:len(data) - first] = data[first:]
+        overflow = max(0, self._size + len(data) - self.capacity)
+        self._start = (self._start + overflow) % self.capacity
+        self._size = min(self.capacity, self._size + len(data))
+
+    def read(self):
+        """Return the buffered bytes, oldest first, and empty the buffer."""
+        end = self._start + self._size
+        if end <= self.capacity:
+            data = bytes(self._buffer[self._start:end])
+        else:
+            data = bytes(self._buffer[self._start:] + self._buffer[:end - self.capacity])
+        self._start = 0
+        self._size = 0
+        return data
+
+
+def _read_exact(stream, size):
+    data = b''
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            raise ValueError('Audio stream ended inside the WAV header.')
+        data += chunk
+    return data
+
+
+def open_pcm_stream(stream, sample_rate, sample_width=2, channels=1):
+    """Detect a WAV header at the start of ``stream``.
+
+    Returns ``(sample_rate, sample_width, channels, head)`` where ``head`` is
+    any audio already read past the header. Streams without a RIFF header
+    are taken as raw PCM in the given format. WAV sizes are ignored, since
+    streamed files often do not know them up front.
+    """
+    head = b''
+    while len(head) < 12:
+        chunk = stream.read(12 - len(head))
+        if not chunk:
+            break
+        head += chunk
+    if head[:4] != b'RIFF' or head[8:12] != b'WAVE':
+        return sample_rate, sample_width, channels, head
+    while True:
+        chunk_id, size = struct.unpack('<4sI', _read_exact(stream, 8))
+        if chunk_id == b'data':
+            return sample_rate, sample_width, channels, b''
+        body = _read_exact(stream, size + size % 2)
+        if chunk_id == b'fmt ':
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', body[:16])
+            if audio_format != 1:
+                raise ValueError('Only uncompressed PCM WAV audio is supported.')
+            sample_width = bits // 8
+
+
+def rms(frame, sample_width):
+    samples = array(SAMPLE_TYPES[sample_width])
+    samples.frombytes(frame)
+    if sample_width > 1 and sys.byteorder == 'big':
+        samples.byteswap()
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class VoiceActivityDetector:
+    def __init__(self, sample_rate, sample_width=2, frame_ms=30, padding_ms=300,
+                 hangover_ms=600, calibration_ms=300, threshold_factor=3.0,
+                 min_threshold=300, max_segment_seconds=30):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.frame_bytes = sample_rate * frame_ms // 1000 * sample_width
+        if self.frame_bytes <= 0:
+            raise ValueError(f'A {frame_ms} ms frame at {sample_rate} Hz holds no samples.')
+        self.frame_ms = frame_ms
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.calibration_frames = calibration_ms // frame_ms
+        self.threshold_factor = threshold_factor
+        self.min_threshold = min_threshold
+        self.max_segment_bytes = max_segment_seconds * sample_rate * sample_width
+        self.threshold = min_threshold
+        self._pending = bytearray()
+        self._preroll = RingBuffer(max(self.frame_bytes, sample_rate * padding_ms // 1000 * sample_width))
+        self._segment = None
+        self._silent_frames = 0
+        self._calibration = []
+        self.frames = 0
+        self.speech_frames = 0
+
+    def feed(self, data):
+        """Consume PCM bytes and return the speech segments completed by them."""
+        self._pending.extend(data)
+        segments = []
+        while len(self._pending) >= self.frame_bytes:
+            frame = bytes(self._pending[:self.frame_bytes])
+            del self._pending[:self.frame_bytes]
+            segment = self._process(frame)
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def flush(self):
+        """Return the segment in progress when the stream ends, if any."""
+        segment, self._segment = self._segment, None
+        return bytes(segment) if segment else None
+
+    def _process(self, frame):
+        self.frames += 1
+        energy = rms(frame, self.sample_width)
+        if len(self._calibration) < self.calibration_frames:
+            self._calibration.append(energy)
+            floor = sum(self._calibration) / len(self._calibration)
+            self.threshold = max(self.min_threshold, floor * self.threshold_factor)
+
+        speech = energy > self.threshold
+        if speech:
+            self.speech_frames += 1
+
+        if self._segment is None:
+            if speech:
+                self._segment = bytearray(self._preroll.read())
+                self._segment.extend(frame)
+                self._silent_frames = 0
+            else:
+                self._preroll.write(frame)
+            return None
+
+        self._segment.extend(frame)
+        self._silent_frames = 0 if speech else self._silent_frames + 1
+        if self._silent_frames >= self.hangover_frames or len(self._segment) >= self.max_segment_bytes:
+            return self.flush()
+        return None
+
+    @property
+    def audio_seconds(self):
+        return self.frames * self.frame_ms / 1000
+
+    @property
+    def speech_seconds(self):
+        return self.speech_frames * self.frame_ms / 1000